@@ -4,6 +4,8 @@ This extension introspects uclchemwrap at build time to generate
 comprehensive parameter documentation from the compiled Fortran modules.
 """
 
+import json
+import math
 import os
 from typing import Any, Dict
 
@@ -13,9 +15,24 @@ from sphinx.util import logging
 logger = logging.getLogger(__name__)
 
 
+# Builders whose output renders the generated pages; other builders
+# (linkcheck, gettext, ...) skip the uclchem import entirely
+DEFAULT_BUILDERS = ['html', 'dirhtml', 'singlehtml', 'latex', 'epub', 'text', 'man', 'texinfo']
+
+# Machine-readable catalog of every module setting, written next to the HTML.
+# Bump CATALOG_SCHEMA whenever CATALOG_FIELDS or the layout changes.
+CATALOG_FILE = 'parameter-catalog.json'
+CATALOG_SCHEMA = 1
+CATALOG_FIELDS = ['dtype', 'shape', 'default', 'is_parameter', 'is_internal']
+
+
 def generate_parameter_docs(app: Sphinx) -> None:
     """Generate parameter documentation from uclchemwrap at build time."""
     
+    if app.builder.name not in app.config.fortran_params_builders:
+        logger.info(f"Skipping parameter docs generation for the {app.builder.name} builder")
+        return
+    
     logger.info(f"Source directory: {app.srcdir}")
     logger.info(f"Build directory: {app.outdir if hasattr(app, 'outdir') else 'N/A'}")
     
@@ -58,6 +75,13 @@ def generate_parameter_docs(app: Sphinx) -> None:
         f.write("For more detailed examples of interacting with Fortran parameters, see:\n")
         f.write("- [Advanced Settings](../../tutorials/6_advanced_settings.html): Parameter modification examples\n")
         f.write("- [Heating & Cooling Settings](../../tutorials/7_heating_cooling_settings.html): Physical parameter tuning\n\n")
+        f.write("Every module setting (name, type, shape, default and flags) is also published as ")
+        f.write(f"`{CATALOG_FILE}` at the root of this version of the documentation, for validating ")
+        f.write("`param_dict` configurations without importing uclchem.\n\n")
+        if app.config.fortran_params_snapshot:
+            # Multi-version build: the snapshot feeds the site-wide changes page
+            f.write('Settings added, removed or changed between documented versions are listed on the ')
+            f.write('<a href="/parameter-changes/">parameter changes</a> page.\n\n')
         
         # List all modules
         f.write("## Available Modules\n\n")
@@ -191,6 +215,112 @@ def generate_parameter_docs(app: Sphinx) -> None:
             f.write("on the main Fortran API page for examples.\n\n")
     
     logger.info(f"Generated Fortran parameter docs in {output_dir}")
+    
+    modules = collect_setting_records(settings)
+    if app.builder.format == 'html':
+        write_parameter_catalog(modules, app.outdir, app.config.release)
+    if app.config.fortran_params_snapshot:
+        write_parameter_snapshot(modules, app.config.fortran_params_snapshot, app.config.release)
+
+
+def _snapshot_value(value: Any) -> Any:
+    """Convert a setting value to plain, strict JSON data."""
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace').strip()
+    if hasattr(value, 'tolist'):  # numpy array or scalar
+        value = value.tolist()
+    if isinstance(value, list):
+        return [_snapshot_value(item) for item in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        # Strict JSON has no NaN/Infinity; keep the value readable and comparable
+        return str(value)
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _setting_record(setting: Any) -> Dict[str, Any]:
+    """Describe one module setting as plain JSON data."""
+    dtype = setting.dtype
+    return {
+        'dtype': getattr(dtype, 'name', None) or getattr(dtype, '__name__', None) or str(dtype),
+        'shape': list(setting.shape) if isinstance(setting.shape, tuple) else setting.shape,
+        'default': _snapshot_value(setting.current_value),
+        'is_parameter': bool(setting.is_parameter),
+        'is_internal': bool(setting.is_internal),
+    }
+
+
+def collect_setting_records(settings: Any) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Describe the settings of every module as plain JSON data.
+    
+    Args:
+        settings: uclchem.advanced.GeneralSettings instance
+        
+    Returns:
+        Module name -> setting name -> record (see _setting_record)
+    """
+    modules = {}
+    for module_name in sorted(settings._modules.keys()):
+        all_settings = settings._modules[module_name].list_settings(
+            include_internal=True,
+            include_parameters=True
+        )
+        modules[module_name] = {
+            name: _setting_record(setting) for name, setting in sorted(all_settings.items())
+        }
+    return modules
+
+
+def write_parameter_snapshot(modules: Dict[str, Dict[str, Dict[str, Any]]], path: str, release: str) -> None:
+    """
+    Write the introspected settings of every module to a JSON snapshot.
+    
+    The multi-version build keeps one snapshot per version and diffs them
+    into the "parameter changes between versions" page.
+    
+    Args:
+        modules: Result of collect_setting_records
+        path: Snapshot file to write
+        release: Version the settings were introspected from
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'release': release, 'modules': modules}, f, separators=(',', ':'), allow_nan=False)
+    logger.info(f"Wrote parameter snapshot to {path}")
+
+
+def write_parameter_catalog(modules: Dict[str, Dict[str, Dict[str, Any]]], outdir: str, release: str) -> None:
+    """
+    Publish the machine-readable parameter catalog next to the HTML.
+    
+    Records are stored as arrays in CATALOG_FIELDS order, keyed by module and
+    setting name, so tooling can validate a param_dict with dictionary
+    lookups and without importing the Fortran wrapper.
+    
+    Args:
+        modules: Result of collect_setting_records
+        outdir: Builder output directory
+        release: Version the settings were introspected from
+    """
+    catalog = {
+        'schema': CATALOG_SCHEMA,
+        'release': release,
+        'fields': CATALOG_FIELDS,
+        'modules': {
+            module_name: {
+                name: [record[field] for field in CATALOG_FIELDS]
+                for name, record in module_settings.items()
+            }
+            for module_name, module_settings in modules.items()
+        },
+    }
+    os.makedirs(outdir, exist_ok=True)
+    path = os.path.join(outdir, CATALOG_FILE)
+    with open(path, 'w') as f:
+        json.dump(catalog, f, separators=(',', ':'), allow_nan=False)
+    logger.info(f"Wrote parameter catalog to {path}")
 
 
 def _format_value(value: Any) -> str:
@@ -243,8 +373,12 @@ def _format_type(dtype: Any, shape: Any) -> str:
 def setup(app: Sphinx) -> Dict[str, Any]:
     """Setup the Sphinx extension."""
     
-    # Generate docs at config-inited (before builder-inited)
-    app.connect('config-inited', lambda app, config: generate_parameter_docs(app))
+    app.add_config_value('fortran_params_builders', DEFAULT_BUILDERS, 'env')
+    # Set by build_docs.py to collect per-version snapshots for the diff page
+    app.add_config_value('fortran_params_snapshot', os.environ.get('DOCS_PARAMS_SNAPSHOT', ''), '')
+    
+    # Generate docs once the builder is known (before source files are discovered)
+    app.connect('builder-inited', generate_parameter_docs)
     
     return {
         'version': '1.0',
@@ -0,0 +1,117 @@
+// Sharded Search Index Loader
+//
+// The post-build search sharding stage (scripts/postbuild_utils.py) replaces
+// each version's searchindex.js with a small stub that calls
+// SearchShards.install(manifest, indexUrl). The stub carries the shard
+// manifest; this loader fetches the base shard (documents, titles, objects)
+// once and only the term shards whose prefixes occur in a query, then hands
+// the merged index to Sphinx's searchtools.
+(function() {
+    'use strict';
+
+    const SearchShards = {
+        manifest: null,
+        baseUrl: null,
+        index: null,
+        basePromise: null,
+        loadedShards: {},
+
+        // Called by the searchindex.js stub once searchtools.js is loaded
+        install: function(manifest, indexUrl) {
+            if (typeof Search === 'undefined' || this.manifest) return;
+
+            this.manifest = manifest;
+            this.baseUrl = new URL('.', indexUrl);
+
+            // Every query goes through Search.query, either directly or from
+            // Search.setIndex for a query made before the index was ready
+            const originalQuery = Search.query;
+            Search.query = (query) => {
+                this.ensure(query)
+                    .then(() => originalQuery(query))
+                    .catch(error => console.error('Failed to load search index:', error));
+            };
+
+            this.loadBase()
+                .then(index => Search.setIndex(index))
+                .catch(error => console.error('Failed to load search index:', error));
+        },
+
+        fetchJson: function(file) {
+            return fetch(new URL(file, this.baseUrl)).then(response => {
+                if (!response.ok) throw new Error(`Failed to load ${file}`);
+                return response.json();
+            });
+        },
+
+        loadBase: function() {
+            if (!this.basePromise) {
+                this.basePromise = this.fetchJson(this.manifest.base).then(index => {
+                    index.terms = index.terms || {};
+                    index.titleterms = index.titleterms || {};
+                    this.index = index;
+                    return index;
+                });
+            }
+            return this.basePromise;
+        },
+
+        // Shard covering a prefix: the last shard whose first prefix is <= it
+        shardFor: function(prefix) {
+            const shards = this.manifest.shards;
+            let low = 0;
+            let high = shards.length - 1;
+            let found = null;
+            while (low <= high) {
+                const mid = (low + high) >> 1;
+                if (shards[mid][0] <= prefix) {
+                    found = shards[mid][1];
+                    low = mid + 1;
+                } else {
+                    high = mid - 1;
+                }
+            }
+            return found;
+        },
+
+        // Shard files needed for the words of a query. The index holds
+        // stemmed terms and Search.query looks words up by their stem, so
+        // the stem picks the shard ("ties" -> "ti"); the word as typed is
+        // kept too, for the partial matches searchtools makes against it.
+        shardsFor: function(query) {
+            const words = typeof splitQuery === 'function' ? splitQuery(query) : query.split(/\s+/);
+            const stemmer = typeof Stemmer === 'function' ? new Stemmer() : null;
+            const prefixLength = this.manifest.prefix_length;
+            const files = new Set();
+            words.forEach(word => {
+                word = word.toLowerCase().replace(/^-/, '');
+                if (!word) return;
+                const forms = stemmer ? [word, stemmer.stemWord(word)] : [word];
+                forms.forEach(form => {
+                    const file = this.shardFor(Array.from(form).slice(0, prefixLength).join(''));
+                    if (file) files.add(file);
+                });
+            });
+            return Array.from(files);
+        },
+
+        loadShard: function(file) {
+            if (!this.loadedShards[file]) {
+                this.loadedShards[file] = this.fetchJson(file).then(shard => {
+                    Object.assign(this.index.terms, shard.terms);
+                    Object.assign(this.index.titleterms, shard.titleterms);
+                });
+            }
+            return this.loadedShards[file];
+        },
+
+        // Load the base shard and every term shard a query needs
+        ensure: function(query) {
+            return this.loadBase().then(() =>
+                Promise.all(this.shardsFor(query).map(file => this.loadShard(file)))
+            );
+        }
+    };
+
+    window.SearchShards = SearchShards;
+})();
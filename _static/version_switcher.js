@@ -47,58 +47,99 @@
         return select;
     }
     
+    // Page index written by the build next to versions.json
+    const PAGE_INDEX_URL = '/page-index.json';
+    
     const versionSwitcher = {
         versionsData: null,
         currentVersion: null,
         selectElement: null,
+        pageIndexPromise: null,
         
         init: function() {
-            // Create banner and get select element
-            this.selectElement = createVersionBanner();
-            
-            // Detect current version
-            this.detectCurrentVersion();
+            // Use the banner from _templates/layout.html, or create one
+            this.selectElement = document.getElementById('version-select') || createVersionBanner();
             
-            // Load versions data
+            // Load versions data, then detect current version from it
             this.loadVersions();
             
             // Add change handler
             this.selectElement.addEventListener('change', (e) => {
                 this.switchVersion(e.target.value);
             });
+            
+            // Fetch the page index as soon as the user reaches for the dropdown
+            ['focus', 'pointerenter'].forEach(type => {
+                this.selectElement.addEventListener(type, () => this.loadPageIndex(), { once: true });
+            });
         },
         
-        detectCurrentVersion: function() {
-            const path = window.location.pathname;
-            const match = path.match(/\/(develop|v[\d.]+)\//);
-            this.currentVersion = match ? match[1] : null;
-            console.log('Current version:', this.currentVersion);
+        // Versions manifest inlined by layout.html, or null if absent
+        inlineVersions: function() {
+            const element = document.getElementById('versions-manifest');
+            if (!element) return null;
+            try {
+                const data = JSON.parse(element.textContent);
+                return Array.isArray(data) && data.length ? data : null;
+            } catch (error) {
+                return null;
+            }
         },
         
         loadVersions: function() {
-            fetch('/versions.json')
+            const inline = this.inlineVersions();
+            if (inline) {
+                this.setVersions(inline);
+                return;
+            }
+            
+            // Pages built without the inline manifest: fetch the hashed copy
+            // configured for the theme switcher, or the stable URL
+            const options = window.DOCUMENTATION_OPTIONS || {};
+            fetch(options.theme_switcher_json_url || '/versions.json')
                 .then(response => {
                     if (!response.ok) throw new Error('Failed to load versions.json');
                     return response.json();
                 })
-                .then(data => {
-                    // Handle both array format (new) and object format (old)
-                    this.versionsData = Array.isArray(data) ? data : data.versions;
-                    this.populateDropdown();
-                })
+                .then(data => this.setVersions(data))
                 .catch(error => {
                     console.error('Failed to load versions:', error);
                     this.selectElement.innerHTML = '<option>Version info unavailable</option>';
                 });
         },
         
+        setVersions: function(data) {
+            this.versionsData = data;
+            this.detectCurrentVersion();
+            this.populateDropdown();
+        },
+        
+        // Path prefix a version is served under, e.g. '/v3.5.5/'
+        versionPath: function(version) {
+            const path = new URL(version.url, window.location.origin).pathname;
+            return path.endsWith('/') ? path : path + '/';
+        },
+        
+        // The current version is the one whose URL is the longest prefix of this page
+        detectCurrentVersion: function() {
+            const path = window.location.pathname;
+            let best = null;
+            this.versionsData.forEach(version => {
+                const prefix = this.versionPath(version);
+                if ((path + '/').startsWith(prefix) && (!best || prefix.length > this.versionPath(best).length)) {
+                    best = version;
+                }
+            });
+            this.currentVersion = best ? best.version : null;
+        },
+        
         populateDropdown: function() {
             this.selectElement.innerHTML = '';
             
             this.versionsData.forEach(version => {
                 const option = document.createElement('option');
                 option.value = version.version;
-                option.textContent = version.name;
+                option.textContent = version.name + (version.preferred ? ' ⭐' : '');
                 
                 if (version.version === this.currentVersion) {
                     option.selected = true;
@@ -108,30 +149,97 @@
             });
         },
         
+        // Load the page index once; resolves to null if it is unavailable
+        loadPageIndex: function() {
+            if (!this.pageIndexPromise) {
+                this.pageIndexPromise = fetch(PAGE_INDEX_URL)
+                    .then(response => {
+                        if (!response.ok) throw new Error('Failed to load page index');
+                        return response.json();
+                    })
+                    .then(data => ({ data: data, pages: {} }))
+                    .catch(error => {
+                        console.warn('Version switcher page index unavailable:', error);
+                        return null;
+                    });
+            }
+            return this.pageIndexPromise;
+        },
+        
+        // Set of docnames of a version, decoded from its front-coded list on first use
+        versionPages: function(pageIndex, version) {
+            if (!(version in pageIndex.data.versions)) return null;
+            if (!pageIndex.pages[version]) {
+                const names = new Set();
+                let previous = '';
+                pageIndex.data.lists[pageIndex.data.versions[version]].forEach(([shared, suffix]) => {
+                    previous = previous.slice(0, shared) + suffix;
+                    names.add(previous);
+                });
+                pageIndex.pages[version] = names;
+            }
+            return pageIndex.pages[version];
+        },
+        
+        // Docname for a path relative to a version root ('' -> 'index', 'a/' -> 'a/index')
+        docname: function(pagePath) {
+            pagePath = pagePath.split('?')[0];
+            if (pagePath === '' || pagePath.endsWith('/')) return pagePath + 'index';
+            return pagePath.replace(/\.html$/, '');
+        },
+        
+        // The page itself, a renamed counterpart, or the nearest existing parent
+        resolvePage: function(pageIndex, version, docname) {
+            const pages = this.versionPages(pageIndex, version);
+            if (!pages || pages.has(docname)) return docname;
+            
+            for (const [from, to] of pageIndex.data.renames) {
+                if (from === docname && pages.has(to)) return to;
+                if (to === docname && pages.has(from)) return from;
+            }
+            
+            const parts = docname.split('/');
+            parts.pop();
+            while (parts.length) {
+                const parent = parts.join('/') + '/index';
+                if (pages.has(parent)) return parent;
+                parts.pop();
+            }
+            return 'index';
+        },
+        
         switchVersion: function(newVersion) {
             if (!newVersion || newVersion === this.currentVersion) {
                 return;
             }
             
-            let currentPath = window.location.pathname;
+            const target = this.versionsData.find(version => version.version === newVersion);
+            const current = this.versionsData.find(version => version.version === this.currentVersion);
+            if (!target) return;
             
-            // Remove current version from path
-            if (this.currentVersion) {
-                currentPath = currentPath.replace(new RegExp('/' + this.currentVersion + '(/|$)'), '/');
-            }
-            
-            // Ensure path starts with /
-            if (!currentPath.startsWith('/')) {
-                currentPath = '/' + currentPath;
+            // Page path relative to the current version's root
+            let pagePath = '';
+            const path = window.location.pathname;
+            if (current && (path + '/').startsWith(this.versionPath(current))) {
+                pagePath = path.slice(this.versionPath(current).length);
             }
             
-            // Build new URL
-            const newUrl = window.location.origin + '/' + newVersion + currentPath;
-            console.log('Switching to:', newUrl);
-            window.location.href = newUrl;
+            this.loadPageIndex().then(pageIndex => {
+                let suffix = pagePath + window.location.hash;
+                if (pageIndex) {
+                    const docname = this.docname(pagePath);
+                    const resolved = this.resolvePage(pageIndex, target.version, docname);
+                    if (resolved !== docname) {
+                        suffix = resolved === 'index' ? '' : resolved + '.html';
+                    }
+                }
+                window.location.href = window.location.origin + this.versionPath(target) + suffix;
+            });
         }
     };
     
+    window.versionSwitcher = versionSwitcher;
+    
     // Initialize when DOM is ready
     if (document.readyState === 'loading') {
         document.addEventListener('DOMContentLoaded', () => versionSwitcher.init());
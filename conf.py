@@ -11,6 +11,8 @@ from pathlib import Path
 
 # Add _ext directory for custom extensions
 sys.path.insert(0, os.path.abspath('_ext'))
+# Build scripts shared with the docs configuration (versions manifest)
+sys.path.insert(0, os.path.abspath('scripts'))
 
 # -- Project information -----------------------------------------------------
 # https://www.sphinx-doc.org/en/master/usage/configuration.html#project-information
@@ -24,29 +26,40 @@ author = 'UCLCHEM Team'
 docs_version = os.environ.get('DOCS_VERSION', None)
 docs_display_name = os.environ.get('DOCS_DISPLAY_NAME', None)
 
+
+def _resolve_release() -> str:
+    """
+    Find the release for a single (non multi-version) build without importing uclchem.
+    
+    The installed distribution's metadata is read directly. Without an
+    installed package, `git describe` is run in the directory of this file.
+    """
+    import importlib.metadata
+    import subprocess
+    
+    try:
+        return importlib.metadata.version('uclchem')
+    except importlib.metadata.PackageNotFoundError:
+        pass
+    
+    try:
+        return subprocess.check_output(
+            ['git', 'describe', '--tags', '--abbrev=0'],
+            cwd=Path(__file__).resolve().parent,
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return 'development'
+
+
 if docs_version:
     # Building as part of multi-version build
     release = docs_version
-    version = '.'.join(release.split('.')[:2]) if '.' in release else release
 else:
-    # Single build: Dynamic version detection from installed package
-    try:
-        import importlib.metadata
-
-        import uclchem
-        release = importlib.metadata.version('uclchem')
-    except (ImportError, importlib.metadata.PackageNotFoundError):
-        # Fallback: try git tag
-        import subprocess
-        try:
-            release = subprocess.check_output(
-                ['git', 'describe', '--tags', '--abbrev=0'],
-                stderr=subprocess.DEVNULL
-            ).decode().strip()
-        except Exception:
-            release = 'development'
+    # Single build: version from installed package metadata or git tags
+    release = _resolve_release()
 
-    version = '.'.join(release.split('.')[:2]) if '.' in release else release
+version = '.'.join(release.split('.')[:2]) if '.' in release else release
 
 # -- General configuration ---------------------------------------------------
 # https://www.sphinx-doc.org/en/master/usage/configuration.html#general-configuration
@@ -88,6 +101,30 @@ exclude_patterns = [
 if Path('notebooks/1_first_model_object.ipynb').exists():
     exclude_patterns.append('notebooks/1_first_model.ipynb')
 
+# The blog is not versioned. build_docs.py builds it once per run at /blog/
+# (DOCS_BLOG_MODE=only, with blog/ as source dir and this conf.py via -c) and
+# the version builds (DOCS_BLOG_MODE=external) skip the posts and ablog, and
+# render blog/index as a link to the shared blog. Unset: blog built inline.
+docs_blog_mode = os.environ.get('DOCS_BLOG_MODE', '')
+if docs_blog_mode == 'external':
+    extensions.remove('ablog')
+    exclude_patterns.extend(
+        f"blog/{post.name}" for post in Path('blog').glob('*.md') if post.name != 'index.md'
+    )
+elif docs_blog_mode == 'only':
+    # Posts need neither the API reference nor the parameter pages
+    extensions = [
+        ext for ext in extensions if ext not in ('autoapi.extension', 'fortran_params_doc')
+    ]
+
+# Site-wide pages outside any version (e.g. "parameter-changes"), generated
+# and built by build_docs.py from their own source directory with this conf.py
+docs_site_page = os.environ.get('DOCS_SITE_PAGE', '')
+if docs_site_page:
+    extensions = [
+        ext for ext in extensions if ext not in ('autoapi.extension', 'ablog', 'fortran_params_doc')
+    ]
+
 # -- Options for HTML output -------------------------------------------------
 # https://www.sphinx-doc.org/en/master/usage/configuration.html#options-for-html-output
 
@@ -95,6 +132,17 @@ html_theme = 'pydata_sphinx_theme'
 html_static_path = ['_static']
 html_css_files = ['custom.css']
 
+# Canonical versions manifest (scripts/versions_manifest.py). It is inlined into
+# every page by _templates/layout.html, and the pydata-sphinx-theme switcher
+# reads the content-hashed copy written by build_docs.py, which can be cached
+# indefinitely.
+try:
+    from versions_manifest import hashed_manifest_name, load_versions_manifest
+    versions_manifest = load_versions_manifest()
+except ImportError:
+    versions_manifest = None
+switcher_json_url = f"/{hashed_manifest_name(versions_manifest)}" if versions_manifest else "/versions.json"
+
 # Leiden University Blue branding
 html_theme_options = {
     "logo": {
@@ -126,14 +174,22 @@ html_theme_options = {
     "navigation_with_keys": True,
     # Version switcher configuration
     "switcher": {
-        "json_url": "/versions.json",
+        "json_url": switcher_json_url,
         "version_match": docs_version if docs_version else version,
     },
 }
 
+# Multi-version builds (build_docs.py) publish the parameter changes between
+# versions at the site root; link it from every page
+if os.environ.get('DOCS_VERSIONS_CONFIG'):
+    html_theme_options["external_links"] = [
+        {"name": "Parameter Changes", "url": "/parameter-changes/"},
+    ]
+
 # Custom colors - Leiden University Blue
 html_context = {
-    "default_mode": "light"
+    "default_mode": "light",
+    "versions_manifest": versions_manifest or [],
 }
 
 # -- Extension configuration -------------------------------------------------
@@ -210,12 +266,18 @@ autoapi_keep_files = False
 suppress_warnings = ['autoapi.python_import_resolution']
 
 # Intersphinx configuration - link to other projects
-intersphinx_mapping = {
-    'python': ('https://docs.python.org/3', None),
-    'numpy': ('https://numpy.org/doc/stable/', None),
-    'pandas': ('https://pandas.pydata.org/docs/', None),
-    'matplotlib': ('https://matplotlib.org/stable/', None),
-}
+# Inventories are read from the shared cache filled by build_docs.py
+# (scripts/intersphinx_cache.py), falling back to the remote objects.inv
+try:
+    from intersphinx_cache import intersphinx_mapping
+    intersphinx_mapping = intersphinx_mapping()
+except ImportError:
+    intersphinx_mapping = {
+        'python': ('https://docs.python.org/3/', None),
+        'numpy': ('https://numpy.org/doc/stable/', None),
+        'pandas': ('https://pandas.pydata.org/docs/', None),
+        'matplotlib': ('https://matplotlib.org/stable/', None),
+    }
 
 # Copy button configuration
 copybutton_prompt_text = r">>> |\.\.\. |\$ "
@@ -241,8 +303,15 @@ napoleon_attr_annotations = True
 # https://ablog.readthedocs.io/
 
 blog_title = "UCLCHEM Blog"
-blog_path = "blog"
-blog_post_pattern = "blog/*.md"
+if docs_blog_mode == 'only':
+    # blog/ is the source directory and is published at /blog/. ablog writes
+    # its all-posts page to <blog_path>.html and archive, tag and author pages
+    # under <blog_path>/, so "blog" would publish them under /blog/blog/
+    blog_path = "posts"
+    blog_post_pattern = "*.md"
+else:
+    blog_path = "blog"
+    blog_post_pattern = "blog/*.md"
 blog_feed_fulltext = True
 blog_feed_length = 10
 post_auto_excerpt = 1  # Use first paragraph as excerpt
@@ -274,8 +343,27 @@ def _ensure_docwriter(app):
             pass
 
 
+# Stands in for blog/index in version builds when the blog is built separately
+_EXTERNAL_BLOG_INDEX = """# Blog
+
+```{raw} html
+<p>News, updates and announcements are published on the
+<a href="/blog/">UCLCHEM blog</a>, shared by all documentation versions.</p>
+<meta http-equiv="refresh" content="0; url=/blog/">
+```
+"""
+
+
+def _link_external_blog(app, docname, source):
+    if docname == 'blog/index':
+        source[0] = _EXTERNAL_BLOG_INDEX
+
+
 def setup(app):
-    app.connect("builder-inited", _ensure_docwriter)
+    if docs_blog_mode == 'external':
+        app.connect("source-read", _link_external_blog)
+    if 'ablog' in extensions:
+        app.connect("builder-inited", _ensure_docwriter)
     return {"version": "0.1"}
 
 # ---------------------------------------------------------------------------
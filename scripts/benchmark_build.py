@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the documentation build pipeline.
+Times the main build phases against synthetic inputs, fully offline, using
+local stand-ins for the GitHub API and the uclchemwrap-backed settings.
+
+Usage:
+    python scripts/benchmark_build.py --output bench.json
+    python scripts/benchmark_build.py --output bench.json --compare baseline.json
+    python scripts/benchmark_build.py --only git_extract parse_artifact_name
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+import build_utils
+from build_utils import (
+    ArtifactCatalog,
+    BuildError,
+    LogLevel,
+    _parse_artifact_name,
+    check_notebook_artifacts,
+    convert_jupytext_notebooks,
+    get_python_paths,
+    git_extract,
+    log,
+    run_sphinx_build,
+)
+from check_links import check_site_links
+
+DOCS_ROOT = Path(__file__).resolve().parent.parent
+
+
+class BenchmarkSkipped(Exception):
+    """Raised when a benchmark cannot run in the current environment."""
+    pass
+
+
+def _measure(fn: Callable[[], None], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict:
+    """
+    Time a callable over several runs.
+
+    Args:
+        fn: Callable to time
+        repeat: Number of timed runs
+        setup: Optional untimed callable run before each timed run
+
+    Returns:
+        Dict with min/median/mean and the individual run times in seconds
+    """
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+
+    return {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.mean(runs),
+        "runs": runs,
+    }
+
+
+# =============================================================================
+# Synthetic inputs and local stand-ins
+# =============================================================================
+
+def _make_synthetic_repo(repo_dir: Path, n_files: int) -> None:
+    """Create a git repository with a package layout and a notebooks/ folder."""
+    (repo_dir / "src" / "uclchem").mkdir(parents=True)
+    (repo_dir / "notebooks").mkdir()
+    (repo_dir / "pyproject.toml").write_text("[project]\nname = \"uclchem\"\nversion = \"0.0.0\"\n")
+
+    for i in range(n_files):
+        (repo_dir / "src" / "uclchem" / f"module_{i}.py").write_text(
+            f'"""Synthetic module {i}."""\n\n' + "x = 1\n" * 200
+        )
+    for i in range(max(1, n_files // 10)):
+        (repo_dir / "notebooks" / f"{i}_tutorial.py").write_text(_jupytext_source(i))
+
+    git_env = {
+        "GIT_AUTHOR_NAME": "bench", "GIT_AUTHOR_EMAIL": "bench@localhost",
+        "GIT_COMMITTER_NAME": "bench", "GIT_COMMITTER_EMAIL": "bench@localhost",
+    }
+    for cmd in (
+        ["git", "init", "-q"],
+        ["git", "add", "-A"],
+        ["git", "commit", "-q", "-m", "synthetic"],
+        ["git", "tag", "v0.0.0"],
+    ):
+        subprocess.run(cmd, cwd=repo_dir, env={**os.environ, **git_env}, check=True)
+
+
+def _jupytext_source(index: int) -> str:
+    """Return a small percent-format Jupytext notebook."""
+    cells = [
+        "# ---\n"
+        "# jupyter:\n"
+        "#   jupytext:\n"
+        "#     text_representation:\n"
+        "#       extension: .py\n"
+        "#       format_name: percent\n"
+        "#   kernelspec:\n"
+        "#     display_name: Python 3\n"
+        "#     language: python\n"
+        "#     name: python3\n"
+        "# ---\n",
+        f"# %% [markdown]\n# # Tutorial {index}\n#\n# Synthetic notebook for benchmarking.\n",
+    ]
+    for j in range(10):
+        cells.append(f"# %%\nimport math\nvalue_{j} = math.sqrt({j})\nprint(value_{j})\n")
+    return "\n".join(cells)
+
+
+class _FakeSetting:
+    """Stand-in for a uclchem.advanced setting backed by uclchemwrap."""
+
+    def __init__(self, index: int):
+        kind = index % 3
+        self.is_parameter = kind == 0
+        self.is_internal = kind == 1
+        self.current_value = float(index) * 1.5e-3 if index % 2 else index
+        self.dtype = float if index % 2 else int
+        self.shape = None
+        self.description = f"Synthetic setting {index}"
+
+
+class _FakeModule:
+    """Stand-in for a wrapped Fortran module."""
+
+    def __init__(self, n_settings: int):
+        self._settings = {f"setting_{i}": _FakeSetting(i) for i in range(n_settings)}
+
+    def list_settings(self, include_internal: bool = False, include_parameters: bool = False) -> Dict:
+        return dict(self._settings)
+
+
+def _install_fake_uclchem(n_modules: int, n_settings: int) -> None:
+    """Register a fake `uclchem` package exposing `advanced.GeneralSettings`."""
+    modules = {f"module_{i}": _FakeModule(n_settings) for i in range(n_modules)}
+
+    class GeneralSettings:
+        def __init__(self):
+            self._modules = modules
+
+    uclchem = SimpleNamespace(__name__="uclchem")
+    uclchem.advanced = SimpleNamespace(__name__="uclchem.advanced", GeneralSettings=GeneralSettings)
+
+    for name in [m for m in sys.modules if m == "uclchem" or m.startswith("uclchem.")]:
+        del sys.modules[name]
+    sys.modules["uclchem"] = uclchem
+    sys.modules["uclchem.advanced"] = uclchem.advanced
+
+
+def _make_sphinx_project(source_dir: Path, n_pages: int) -> None:
+    """Write a minimal self-contained Sphinx project."""
+    source_dir.mkdir(parents=True)
+    (source_dir / "conf.py").write_text("project = 'bench'\nextensions = []\n")
+
+    toctree = "\n".join(f"   page_{i}" for i in range(n_pages))
+    (source_dir / "index.rst").write_text(f"Benchmark\n=========\n\n.. toctree::\n\n{toctree}\n")
+
+    for i in range(n_pages):
+        body = "\n\n".join(f"Paragraph {j} of page {i} with ``code`` and *emphasis*." for j in range(50))
+        (source_dir / f"page_{i}.rst").write_text(f"Page {i}\n{'=' * (5 + len(str(i)))}\n\n{body}\n")
+
+
+class _GitHubStandIn(BaseHTTPRequestHandler):
+    """Serve canned GitHub API responses for artifact lookups."""
+
+    n_artifacts = 100
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path.endswith("/actions/runs"):
+            body = {"workflow_runs": [{
+                "id": 1,
+                "name": "Execute notebooks",
+                "conclusion": "success",
+                "created_at": "2026-01-01T00:00:00Z",
+            }]}
+        elif path.endswith("/actions/runs/1/artifacts"):
+            body = {"artifacts": [{
+                "name": f"executed_notebooks-v4.{i % 10}.{i}-abc{i:04d}-2026{(i % 12) + 1:02d}01",
+                "archive_download_url": f"http://{self.headers['Host']}/download/{i}",
+            } for i in range(self.n_artifacts)]}
+        elif path.endswith("/releases"):
+            body = []
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _LinkStandIn(BaseHTTPRequestHandler):
+    """Answer external link checks: /<host>/broken* is 404, HEAD to /<host>/nohead* is 405."""
+
+    delay = 0.01
+
+    def _respond(self):
+        time.sleep(self.delay)
+        path = self.path.split("?", 1)[0]
+        if "/broken" in path:
+            code = 404
+        elif "/nohead" in path and self.command == "HEAD":
+            code = 405
+        else:
+            code = 200
+        self.send_response(code)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._respond()
+
+    def do_GET(self):
+        self._respond()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _make_linked_site(root: Path, n_versions: int, n_pages: int, n_urls: int) -> None:
+    """Write version trees whose pages share external URLs and link across versions."""
+    hosts = ["arxiv.org", "ui.adsabs.harvard.edu", "github.com", "doi.org"]
+    for v in range(n_versions):
+        version_dir = root / f"v{v}"
+        version_dir.mkdir(parents=True)
+        for p in range(n_pages):
+            # Every tenth URL is served by a host that rejects HEAD
+            links = [
+                f'<a href="https://{hosts[(p + i) % len(hosts)]}/{"nohead" if i == 9 else "paper"}/'
+                f'{(p * 7 + i) % n_urls}">ref</a>'
+                for i in range(10)
+            ]
+            links.append(f'<a href="page_{(p + 1) % n_pages}.html#section">next</a>')
+            links.append(f'<a href="/v{(v + 1) % n_versions}/page_{p}.html">other version</a>')
+            (version_dir / f"page_{p}.html").write_text(
+                f'<html><body><h1 id="section">Page {p}</h1>{"".join(links)}</body></html>'
+            )
+        (version_dir / "index.html").write_text('<a href="page_0.html">start</a>')
+
+
+# =============================================================================
+# Benchmarks
+# =============================================================================
+
+def bench_git_extract(workdir: Path, args: argparse.Namespace) -> Dict:
+    """Time git_extract of a full tag and of the notebooks/ subpath."""
+    repo = workdir / "repo"
+    repo.mkdir()
+    _make_synthetic_repo(repo, args.files)
+    target = workdir / "extract"
+
+    result = _measure(
+        lambda: git_extract(repo, "v0.0.0", target),
+        args.repeat,
+        setup=lambda: shutil.rmtree(target, ignore_errors=True),
+    )
+    result["params"] = {"files": args.files}
+    return result
+
+
+def bench_convert_jupytext_notebooks(workdir: Path, args: argparse.Namespace) -> Dict:
+    """Time conversion of N Jupytext notebooks to .ipynb."""
+    # Conversion runs in-process through the jupytext API; the CLI isn't needed
+    if importlib.util.find_spec("jupytext") is None:
+        raise BenchmarkSkipped("jupytext not installed")
+
+    nb_dir = workdir / "notebooks"
+    nb_dir.mkdir()
+    for i in range(args.notebooks):
+        (nb_dir / f"{i}_tutorial.py").write_text(_jupytext_source(i))
+
+    def reset():
+        for ipynb in nb_dir.glob("*.ipynb"):
+            ipynb.unlink()
+
+    result = _measure(lambda: convert_jupytext_notebooks(nb_dir), args.repeat, setup=reset)
+    result["params"] = {"notebooks": args.notebooks}
+    return result
+
+
+def bench_generate_parameter_docs(workdir: Path, args: argparse.Namespace) -> Dict:
+    """Time Fortran parameter page generation against a fake GeneralSettings."""
+    try:
+        sys.path.insert(0, str(DOCS_ROOT / "_ext"))
+        import fortran_params_doc
+    except ImportError as e:
+        raise BenchmarkSkipped(f"cannot import fortran_params_doc: {e}")
+
+    _install_fake_uclchem(args.modules, args.settings)
+    app = SimpleNamespace(
+        srcdir=str(workdir),
+        outdir=str(workdir / "_build"),
+        builder=SimpleNamespace(name="html", format="html"),
+        config=SimpleNamespace(
+            fortran_params_builders=fortran_params_doc.DEFAULT_BUILDERS,
+            fortran_params_snapshot="",
+            release="bench",
+        ),
+    )
+
+    result = _measure(lambda: fortran_params_doc.generate_parameter_docs(app), args.repeat)
+    result["params"] = {"modules": args.modules, "settings_per_module": args.settings}
+    return result
+
+
+def _bench_sphinx(workdir: Path, args: argparse.Namespace, warm: bool) -> Dict:
+    """Time run_sphinx_build with a fresh or a reused output directory."""
+    _, _, sphinx_build_path = get_python_paths()
+    if not shutil.which(str(sphinx_build_path)):
+        raise BenchmarkSkipped("sphinx-build not found")
+
+    if args.sphinx_source:
+        source_dir = args.sphinx_source.resolve()
+    else:
+        source_dir = workdir / "source"
+        _make_sphinx_project(source_dir, args.pages)
+    build_dir = workdir / "html"
+    log_file = workdir / "sphinx.log"
+
+    def build():
+        if not run_sphinx_build(source_dir, build_dir, sphinx_build_path, log_file=log_file):
+            raise BuildError(f"Sphinx build failed, see {log_file}")
+
+    if warm:
+        build()
+        result = _measure(build, args.repeat)
+    else:
+        result = _measure(build, args.repeat, setup=lambda: shutil.rmtree(build_dir, ignore_errors=True))
+    result["params"] = {"source": str(args.sphinx_source or "synthetic"), "pages": args.pages}
+    return result
+
+
+def bench_sphinx_cold(workdir: Path, args: argparse.Namespace) -> Dict:
+    """Time a Sphinx build from an empty output directory."""
+    return _bench_sphinx(workdir, args, warm=False)
+
+
+def bench_sphinx_warm(workdir: Path, args: argparse.Namespace) -> Dict:
+    """Time a Sphinx rebuild with an up-to-date doctree cache."""
+    return _bench_sphinx(workdir, args, warm=True)
+
+
+def bench_parse_artifact_name(workdir: Path, args: argparse.Namespace) -> Dict:
+    """Time _parse_artifact_name over a bulk list of artifact names."""
+    names = [
+        f"executed_notebooks-feature-branch-{i}-abc{i:04x}-2026{(i % 12) + 1:02d}{(i % 28) + 1:02d}.zip"
+        for i in range(args.artifacts)
+    ]
+
+    def parse_all():
+        for name in names:
+            _parse_artifact_name(name)
+
+    result = _measure(parse_all, args.repeat)
+    result["params"] = {"artifacts": args.artifacts}
+    return result
+
+
+def bench_select_artifact(workdir: Path, args: argparse.Namespace) -> Dict:
+    """Time building an ArtifactCatalog and selecting artifacts by commit and version."""
+    artifacts = [
+        {"name": f"executed_notebooks-v4.{i % 10}.{i % 50}-{i:07x}-2026{(i % 12) + 1:02d}{(i % 28) + 1:02d}.zip"}
+        for i in range(args.artifacts)
+    ]
+    queries = [(f"v4.{i % 10}.{i % 50}", f"{i * 7:07x}" + "0" * 33) for i in range(1000)]
+
+    def select_all():
+        catalog = ArtifactCatalog(artifacts)
+        for version, commit in queries:
+            catalog.select(version, commit)
+
+    result = _measure(select_all, args.repeat)
+    result["params"] = {"artifacts": args.artifacts, "queries": len(queries)}
+    return result
+
+
+def bench_check_notebook_artifacts(workdir: Path, args: argparse.Namespace) -> Dict:
+    """Time artifact lookup and ranking against a local GitHub API stand-in."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _GitHubStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    original_api = build_utils.GITHUB_API
+    build_utils.GITHUB_API = f"http://127.0.0.1:{server.server_port}/repos/uclchem/UCLCHEM"
+    try:
+        result = _measure(lambda: check_notebook_artifacts("v4.0.0", "stand-in-token"), args.repeat)
+    finally:
+        build_utils.GITHUB_API = original_api
+        server.shutdown()
+        server.server_close()
+
+    result["params"] = {"artifacts": _GitHubStandIn.n_artifacts}
+    return result
+
+
+def bench_check_links(workdir: Path, args: argparse.Namespace) -> Dict:
+    """Time a cold and a cached link check of a multi-version site against a local stand-in."""
+    site = workdir / "site"
+    _make_linked_site(site, n_versions=4, n_pages=args.pages, n_urls=args.urls)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _LinkStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stand_in = f"http://127.0.0.1:{server.server_port}"
+    cache_path = workdir / "linkcheck_cache.json"
+
+    def check():
+        report = check_site_links(site, cache_path, stand_in=stand_in)
+        if report["internal"]["broken"] or report["external"]["broken"]:
+            raise BuildError("Unexpected broken links in synthetic site")
+
+    try:
+        result = _measure(check, args.repeat, setup=lambda: cache_path.unlink(missing_ok=True))
+        result["cached"] = _measure(check, args.repeat)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    result["params"] = {"versions": 4, "pages": args.pages, "urls": args.urls, "delay": _LinkStandIn.delay}
+    return result
+
+
+BENCHMARKS: Dict[str, Callable[[Path, argparse.Namespace], Dict]] = {
+    "git_extract": bench_git_extract,
+    "convert_jupytext_notebooks": bench_convert_jupytext_notebooks,
+    "generate_parameter_docs": bench_generate_parameter_docs,
+    "sphinx_cold": bench_sphinx_cold,
+    "sphinx_warm": bench_sphinx_warm,
+    "parse_artifact_name": bench_parse_artifact_name,
+    "select_artifact": bench_select_artifact,
+    "check_notebook_artifacts": bench_check_notebook_artifacts,
+    "check_links": bench_check_links,
+}
+
+
+# =============================================================================
+# Reporting
+# =============================================================================
+
+def _git_commit() -> str:
+    """Return the docs repository HEAD commit, or 'unknown'."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=DOCS_ROOT,
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmarks(names: List[str], args: argparse.Namespace) -> Dict:
+    """
+    Run the selected benchmarks, each in its own temporary directory.
+
+    Args:
+        names: Benchmark names from BENCHMARKS
+        args: Parsed command line arguments
+
+    Returns:
+        Results dict ready to be written as JSON
+    """
+    results = {}
+    for name in names:
+        log(f"Running benchmark: {name}")
+        with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as tmp:
+            try:
+                results[name] = BENCHMARKS[name](Path(tmp), args)
+                log(f"  median {results[name]['median']:.4f}s over {args.repeat} runs", LogLevel.SUCCESS)
+            except BenchmarkSkipped as e:
+                results[name] = {"skipped": str(e)}
+                log(f"  skipped: {e}", LogLevel.WARNING)
+            except (BuildError, subprocess.CalledProcessError) as e:
+                results[name] = {"error": str(e)}
+                log(f"  failed: {e}", LogLevel.ERROR)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "benchmarks": results,
+    }
+
+
+def compare_results(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Compare medians against a stored baseline.
+
+    Args:
+        current: Results from run_benchmarks
+        baseline: Previously stored results
+        threshold: Allowed relative slowdown (0.1 = 10%)
+
+    Returns:
+        Names of benchmarks that regressed beyond the threshold
+    """
+    regressions = []
+    log("")
+    log(f"{'benchmark':<28} {'baseline':>10} {'current':>10} {'change':>8}")
+
+    for name, result in current["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name, {})
+        if "median" not in result or "median" not in base:
+            log(f"{name:<28} {'-':>10} {'-':>10} {'n/a':>8}")
+            continue
+
+        change = result["median"] / base["median"] - 1 if base["median"] else 0.0
+        level = LogLevel.INFO
+        if change > threshold:
+            regressions.append(name)
+            level = LogLevel.ERROR
+        elif change < -threshold:
+            level = LogLevel.SUCCESS
+        log(f"{name:<28} {base['median']:>9.4f}s {result['median']:>9.4f}s {change:>+7.1%}", level)
+
+    return regressions
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the UCLCHEM documentation build pipeline"
+    )
+    parser.add_argument("--output", type=Path, help="Write results JSON to this file")
+    parser.add_argument("--compare", type=Path, help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown reported as a regression (default: 0.10)")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--files", type=int, default=200, help="Files in the synthetic git repository")
+    parser.add_argument("--notebooks", type=int, default=20, help="Jupytext notebooks to convert")
+    parser.add_argument("--modules", type=int, default=10, help="Fake Fortran modules")
+    parser.add_argument("--settings", type=int, default=100, help="Settings per fake Fortran module")
+    parser.add_argument("--pages", type=int, default=30, help="Pages in the synthetic Sphinx project")
+    parser.add_argument("--sphinx-source", type=Path,
+                        help="Time this Sphinx source tree instead of the synthetic project")
+    parser.add_argument("--artifacts", type=int, default=100000, help="Artifact names to parse")
+    parser.add_argument("--urls", type=int, default=200, help="Unique external URLs in the link check site")
+
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.only or list(BENCHMARKS), args)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        log(f"Results written to {args.output}", LogLevel.SUCCESS)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            log(f"Regressions beyond {args.threshold:.0%}: {', '.join(regressions)}", LogLevel.ERROR)
+            sys.exit(1)
+        log("No regressions against baseline", LogLevel.SUCCESS)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,37 +5,119 @@ Builds documentation for multiple UCLCHEM versions from different git refs.
 """
 
 import argparse
+import hashlib
 import json
 import os
+import shutil
 import sys
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 import yaml
 from build_utils import (
     BuildError,
+    CheckpointJournal,
     LogLevel,
-    check_fortran_available,
     check_notebook_artifacts,
     clean_directory,
+    clear_venv_ready,
+    compare_notebook_sources,
     convert_jupytext_notebooks,
     create_symlink,
     detect_environment,
     download_notebook_artifacts,
+    ensure_version_venv,
+    evict_venv_cache,
     get_python_paths,
+    get_venv_paths,
     git_extract,
+    git_resolve_commit,
     install_package,
+    jupytext_sources,
     log,
+    mark_venv_ready,
+    probe_installation,
     run_sphinx_build,
+    sync_mirror,
     trigger_notebook_action,
     validate_prerequisites,
+    venv_cache_key,
 )
+from check_links import LINKCHECK_CACHE, check_site_links, log_report
+from intersphinx_cache import INTERSPHINX_CACHE_ENV, fill_inventory_cache, log_inventory_report
+from postbuild_utils import (
+    DEPLOY_MANIFEST,
+    PAGE_INDEX,
+    break_hardlinks,
+    build_deploy_manifest,
+    create_alias_output,
+    diff_deploy_manifests,
+    diff_param_snapshots,
+    hardlink_identical_files,
+    load_deploy_manifest,
+    load_param_snapshots,
+    precompress_output,
+    restore_search_index,
+    share_identical_assets,
+    shard_search_index,
+    write_delta_bundle,
+    write_page_index,
+    write_param_changes_source,
+)
+from scheduler import Resource, Scheduler, Task, TaskGraph, TaskStatus
+from versions_manifest import (
+    BLOG_DIR,
+    PARAM_CHANGES_DIR,
+    VERSIONS_MANIFEST,
+    build_versions_manifest,
+    hashed_manifest_name,
+    manifest_bytes,
+)
+
+# Watch mode: docs source files that trigger a rebuild, and generated or
+# external directories (relative to the docs root) that are never watched
+WATCH_SUFFIXES = {'.md', '.rst', '.py', '.ipynb', '.html', '.css', '.js', '.yml', '.yaml', '.png', '.svg'}
+WATCH_EXCLUDE_DIRS = {'_build', 'api', 'notebooks', 'scripts'}
+
+# Build scripts conf.py imports, and process environment it reads, both of
+# which change the Sphinx output alongside the watched sources
+CONF_SCRIPT_MODULES = ('versions_manifest.py', 'intersphinx_cache.py')
+CONF_ENV_VARS = ('UCLCHEM_EXECUTE_NOTEBOOKS', 'UCLCHEM_NB_TIMEOUT', 'SITE_VERSION')
+
+
+class _QuietHTTPRequestHandler(SimpleHTTPRequestHandler):
+    """Static file handler for watch mode that doesn't log every request."""
+    
+    def log_message(self, format, *args):
+        pass
 
 
 class MultiVersionBuilder:
     """Orchestrates multi-version documentation builds."""
     
-    def __init__(self, config_path: Path, uclchem_repo: Optional[Path] = None, github_token: Optional[str] = None):
+    def __init__(
+        self,
+        config_path: Path,
+        uclchem_repo: Optional[Path] = None,
+        github_token: Optional[str] = None,
+        compress: bool = False,
+        dedup: bool = False,
+        share_assets: bool = False,
+        previous_manifest: Optional[str] = None,
+        delta_dir: Optional[Path] = None,
+        isolated_envs: bool = False,
+        parallel: bool = False,
+        resume: bool = False,
+        verbose: bool = False,
+        shard_search: bool = False,
+        linkcheck: bool = False,
+        mirror: bool = False,
+        offline: bool = False
+    ):
         """
         Initialize builder.
         
@@ -43,20 +125,80 @@ class MultiVersionBuilder:
             config_path: Path to versions.yaml configuration file
             uclchem_repo: Optional path to UCLCHEM repository (auto-detect if not provided)
             github_token: Optional GitHub token for artifact access
+            compress: Write .gz/.br siblings after the build (also enabled by build.compress in config)
+            dedup: Hardlink identical files across versions (also enabled by build.dedup in config)
+            share_assets: Serve identical assets from /_shared/<hash> (implies dedup)
+            previous_manifest: Path or URL of the deployed manifest to diff against
+            delta_dir: Where to write the delta bundle (default: _build/deploy_delta)
+            isolated_envs: Install each uclchem commit into its own cached venv
+                (also enabled by build.venvs in config)
+            parallel: Run version stages concurrently through the task scheduler
+                (also enabled by build.scheduler in config)
+            resume: Keep the previous build and skip stages recorded as complete
+                in the checkpoint journal whose inputs are unchanged
+            verbose: Echo pip and Sphinx output to the console as well as the logs
+            shard_search: Split search indexes into shards loaded on demand
+                (also enabled by build.search.shard in config)
+            linkcheck: Check internal and external links of the finished site
+                (also enabled by build.linkcheck in config)
+            mirror: Read UCLCHEM from a persistent bare mirror that is fetched
+                incrementally (also enabled by build.mirror in config)
+            offline: Use the mirror without contacting the remote
         """
         self.config_path = config_path.resolve()
         self.config = self._load_config()
         self.github_token = github_token or os.getenv('GITHUB_TOKEN')
+        self.compress_config = self.config.get('build', {}).get('compress', {})
+        self.compress = compress or self.compress_config.get('enabled', False)
+        dedup_config = self.config.get('build', {}).get('dedup', {})
+        self.share_assets = share_assets or dedup_config.get('shared_assets', False)
+        self.dedup = dedup or self.share_assets or dedup_config.get('enabled', False)
+        deploy_config = self.config.get('build', {}).get('deploy', {})
+        self.previous_manifest = previous_manifest or deploy_config.get('previous_manifest')
+        self.venv_config = self.config.get('build', {}).get('venvs', {})
+        self.isolated_envs = isolated_envs or self.venv_config.get('enabled', False)
+        self.parallel = parallel or self.config.get('build', {}).get('scheduler', {}).get('enabled', False)
+        self.resume = resume
+        self.verbose = verbose
+        self.search_config = self.config.get('build', {}).get('search', {})
+        self.shard_search = shard_search or self.search_config.get('shard', False)
+        self.linkcheck_config = self.config.get('build', {}).get('linkcheck', {})
+        self.linkcheck = linkcheck or self.linkcheck_config.get('enabled', False)
+        self.intersphinx_config = self.config.get('build', {}).get('intersphinx', {})
+        self.mirror_config = self.config.get('build', {}).get('mirror', {})
+        self.separate_blog = self.config.get('build', {}).get('blog', {}).get('separate', True)
+        self.use_mirror = mirror or offline or self.mirror_config.get('enabled', False)
+        self.offline = offline
         
         # Determine paths
         self.docs_root = self.config_path.parent.parent  # scripts/versions.yaml -> repo root
-        self.uclchem_repo = uclchem_repo or (self.docs_root.parent / "uclchem")
+        if self.use_mirror:
+            default_repo = Path(os.path.expanduser(
+                self.mirror_config.get('path', '~/.cache/uclchem-docs/uclchem.git')
+            ))
+        else:
+            default_repo = self.docs_root.parent / "uclchem"
+        self.uclchem_repo = uclchem_repo or default_repo
         
         # Resolve all paths to absolute
         self.docs_root = self.docs_root.resolve()
         self.uclchem_repo = self.uclchem_repo.resolve()
         self.build_root = self.docs_root / "_build" / "html"
         self.temp_dir = self.docs_root / "_build" / "multiversion_temp"
+        self.delta_dir = (delta_dir or self.docs_root / "_build" / "deploy_delta").resolve()
+        self.venv_cache_dir = Path(os.path.expanduser(
+            self.venv_config.get('cache_dir', '~/.cache/uclchem-docs/venvs')
+        )).resolve()
+        self.active_venvs: List[str] = []
+        self.intersphinx_cache_dir = Path(os.path.expanduser(
+            self.intersphinx_config.get('cache_dir', '~/.cache/uclchem-docs/intersphinx')
+        )).resolve()
+        self.trace_path = self.docs_root / "_build" / "logs" / "build_trace.json"
+        self.param_snapshot_dir = self.docs_root / "_build" / "param_snapshots"
+        self.blog_cache_dir = self.docs_root / "_build" / "blog_html"
+        self.search_backup_dir = self.docs_root / "_build" / "search_index"
+        self.checkpoints = CheckpointJournal(self.docs_root / "_build" / "checkpoints.json")
+        self._docs_digest: Optional[str] = None
         
         # Get Python environment paths
         self.python_path, self.pip_path, self.sphinx_build_path = get_python_paths()
@@ -91,8 +233,24 @@ class MultiVersionBuilder:
         
         return config
     
+    def sync_mirror(self) -> None:
+        """Create or incrementally update the UCLCHEM mirror for the configured refs."""
+        remote = self.mirror_config.get('remote', 'https://github.com/uclchem/UCLCHEM.git')
+        start = time.time()
+        summary = sync_mirror(
+            self.uclchem_repo,
+            remote,
+            [v['git_ref'] for v in self.config['versions']],
+            fetch=not self.offline
+        )
+        source = "offline" if self.offline else f"from {remote}"
+        log(f"Mirror ready {source} in {time.time() - start:.1f}s "
+            f"({summary['fetched']} refs fetched, {summary['current']} up to date)", LogLevel.SUCCESS)
+    
     def validate_prerequisites(self) -> None:
         """Validate all prerequisites before building."""
+        if self.use_mirror:
+            self.sync_mirror()
         log("Validating prerequisites...")
         validate_prerequisites(self.uclchem_repo, self.docs_root)
     
@@ -106,9 +264,67 @@ class MultiVersionBuilder:
         if self.temp_dir.exists():
             clean_directory(self.temp_dir)
         
+        if self.param_snapshot_dir.exists():
+            clean_directory(self.param_snapshot_dir)
+        
+        if self.search_backup_dir.exists():
+            clean_directory(self.search_backup_dir)
+        
         self.temp_dir.mkdir(parents=True, exist_ok=True)
         log("Cleanup complete", LogLevel.SUCCESS)
     
+    def _artifact_matches_ref(self, git_ref: str, artifact_info: Dict, notebooks_temp: Path) -> bool:
+        """
+        Check that downloaded notebooks were executed from the ref's sources.
+        
+        Artifacts built from the exact commit are accepted as they are. Any
+        other artifact is accepted only if the source cells of every notebook
+        in the ref's notebooks/ tree hash the same as in the artifact. A ref
+        whose notebooks cannot be extracted or converted rejects the artifact.
+        
+        Args:
+            git_ref: Git reference
+            artifact_info: Result of check_notebook_artifacts
+            notebooks_temp: Directory the artifact was extracted to
+            
+        Returns:
+            True if the artifact's notebooks can be used for git_ref
+        """
+        if artifact_info['artifacts'][0].get('match') == 'commit':
+            return True
+        
+        log(f"Verifying artifact notebook sources against {git_ref}...")
+        reference_temp = notebooks_temp.with_name(f"{notebooks_temp.name}_reference")
+        reference_dir = reference_temp / "notebooks"
+        clean_directory(reference_temp)
+        # Without a complete reference nothing vouches for the artifact
+        problem = None
+        try:
+            git_extract(self.uclchem_repo, git_ref, reference_temp, subpath="notebooks")
+            sources = jupytext_sources(reference_dir)
+            if convert_jupytext_notebooks(reference_dir) < len(sources):
+                problem = f"not all notebooks of {git_ref} could be converted"
+            elif not any(reference_dir.glob("*.ipynb")):
+                problem = f"{git_ref} has no notebooks to compare against"
+            else:
+                mismatched = compare_notebook_sources(notebooks_temp / "notebooks", reference_dir)
+                if mismatched:
+                    problem = f"artifact notebooks differ from {git_ref}: {', '.join(mismatched)}"
+        except BuildError as e:
+            problem = f"cannot extract the notebooks of {git_ref}: {e}"
+        finally:
+            if reference_temp.exists():
+                clean_directory(reference_temp)
+                reference_temp.rmdir()
+        
+        if problem:
+            log(f"Rejecting artifact: {problem}", LogLevel.WARNING)
+            clean_directory(notebooks_temp)
+            return False
+        
+        log(f"Artifact notebook sources match {git_ref}", LogLevel.SUCCESS)
+        return True
+    
     def _handle_notebooks(self, git_ref: str, version_name: str, notebooks_temp: Path) -> bool:
         """
         Handle notebook acquisition - try artifacts first, fallback to git extraction.
@@ -125,7 +341,8 @@ class MultiVersionBuilder:
         
         if self.github_token:
             # Try to get pre-executed notebooks from artifacts
-            artifact_info = check_notebook_artifacts(git_ref, self.github_token)
+            commit = git_resolve_commit(self.uclchem_repo, git_ref)
+            artifact_info = check_notebook_artifacts(git_ref, self.github_token, commit)
             
             if artifact_info:
                 # Show which artifact was selected
@@ -133,28 +350,35 @@ class MultiVersionBuilder:
                 parsed = best_artifact.get('parsed_info', {})
                 artifact_version = parsed.get('version', 'unknown')
                 artifact_commit = parsed.get('commit', 'unknown')
+                match = best_artifact.get('match')
                 
-                if artifact_version == git_ref:
+                if match == 'commit':
+                    log(f"Found artifact built from commit {artifact_commit} for {git_ref}", LogLevel.SUCCESS)
+                elif match in ('version', 'release'):
                     log(f"Found exact match artifact for {git_ref} (commit: {artifact_commit})", LogLevel.SUCCESS)
-                elif git_ref in artifact_version or artifact_version in git_ref:
+                elif match == 'partial':
                     log(f"Found partial match artifact: {artifact_version} for {git_ref} (commit: {artifact_commit})", LogLevel.INFO)
                 else:
                     log(f"Using closest available artifact: {artifact_version} for {git_ref} (commit: {artifact_commit})", LogLevel.WARNING)
                 
                 # Download existing artifacts
-                if download_notebook_artifacts(artifact_info, notebooks_temp, self.github_token):
+                if not download_notebook_artifacts(artifact_info, notebooks_temp, self.github_token):
+                    log("Failed to download artifacts, trying to trigger action...", LogLevel.WARNING)
+                elif self._artifact_matches_ref(git_ref, artifact_info, notebooks_temp):
                     log("Using pre-executed notebooks from artifacts", LogLevel.SUCCESS)
                     return True
                 else:
-                    log("Failed to download artifacts, trying to trigger action...", LogLevel.WARNING)
+                    log("Stale artifact rejected, trying to trigger action...", LogLevel.WARNING)
             else:
                 log("No matching artifacts found, attempting to trigger notebook execution...", LogLevel.WARNING)
             
             # Try to trigger notebook execution action
             if trigger_notebook_action(git_ref, self.github_token, wait_for_completion=True):
                 # Try downloading again after trigger
-                artifact_info = check_notebook_artifacts(git_ref, self.github_token)
-                if artifact_info and download_notebook_artifacts(artifact_info, notebooks_temp, self.github_token):
+                artifact_info = check_notebook_artifacts(git_ref, self.github_token, commit)
+                if (artifact_info
+                        and download_notebook_artifacts(artifact_info, notebooks_temp, self.github_token)
+                        and self._artifact_matches_ref(git_ref, artifact_info, notebooks_temp)):
                     log("Successfully obtained fresh notebook artifacts", LogLevel.SUCCESS)
                     return True
         
@@ -180,111 +404,423 @@ class MultiVersionBuilder:
             log("Failed to extract notebooks", LogLevel.ERROR)
             return False
     
-    def build_version(self, version_config: Dict) -> bool:
+    def _prepare_environment(self, git_ref: str) -> Tuple[Path, Path, Path, Optional[Path], bool]:
         """
-        Build documentation for a single version.
+        Select the Python environment a version is installed into and built with.
+        
+        With isolated environments enabled, each uclchem commit gets its own
+        venv under the cache directory, layered on the base environment via
+        --system-site-packages. Otherwise the shared base environment is used.
         
         Args:
-            version_config: Version configuration dict from YAML
+            git_ref: Git reference being built
             
         Returns:
-            True if build succeeded
+            Tuple of (python_path, pip_path, sphinx_build_path, venv_dir, installed)
+            where venv_dir is None for the base environment and installed is
+            True if a cached venv already has this commit installed
         """
-        git_ref = version_config['git_ref']
-        version_name = version_config['version_name']
-        display_name = version_config.get('display_name', version_name)
+        if not self.isolated_envs:
+            return self.python_path, self.pip_path, self.sphinx_build_path, None, False
         
-        log("=" * 60)
-        log(f"Building version: {display_name}")
-        log(f"Git ref: {git_ref}")
-        log("=" * 60)
+        commit = git_resolve_commit(self.uclchem_repo, git_ref) or git_ref
+        key = venv_cache_key(commit, self.docs_root / "requirements.txt", self.python_path)
+        venv_dir = self.venv_cache_dir / key
+        self.active_venvs.append(key)
         
-        # Create temp directories for this version
-        notebooks_temp = self.temp_dir / f"notebooks_{version_name}"
-        source_temp = self.temp_dir / f"source_{version_name}"
-        output_dir = self.build_root / version_name
+        installed = ensure_version_venv(venv_dir, self.python_path)
+        python_path, pip_path, sphinx_build_path = get_venv_paths(venv_dir)
+        return python_path, pip_path, sphinx_build_path, venv_dir, installed
+    
+    def fill_intersphinx_cache(self) -> None:
+        """Fetch expired intersphinx inventories once for all version builds."""
+        log(f"Preparing intersphinx inventories in {self.intersphinx_cache_dir}...")
+        start = time.time()
+        fallbacks = {
+            name: Path(os.path.expanduser(path))
+            for name, path in self.intersphinx_config.get('fallbacks', {}).items()
+        }
+        results = fill_inventory_cache(
+            self.intersphinx_cache_dir,
+            ttl_hours=self.intersphinx_config.get('ttl_hours', 24),
+            timeout=self.intersphinx_config.get('timeout', 15),
+            fallbacks=fallbacks
+        )
+        log_inventory_report(results, time.time() - start)
+    
+    def evict_environments(self) -> None:
+        """Trim the venv cache to its configured size budget."""
+        max_bytes = int(self.venv_config.get('max_size_gb', 10) * 1024 ** 3)
+        removed = evict_venv_cache(self.venv_cache_dir, max_bytes, keep=self.active_venvs)
+        if removed:
+            log(f"Evicted {removed} cached environments", LogLevel.SUCCESS)
+    
+    def _version_temp_dirs(self, version_config: Dict) -> Tuple[Path, Path]:
+        """Return the (notebooks_temp, source_temp) directories for a version."""
+        version_name = version_config['version_name']
+        return (
+            self.temp_dir / f"notebooks_{version_name}",
+            self.temp_dir / f"source_{version_name}",
+        )
+    
+    def acquire_notebooks(self, version_config: Dict, reuse_existing: bool = False) -> None:
+        """
+        Step 1: Acquire notebooks (artifacts or git extraction).
         
-        try:
-            # Step 1: Handle notebooks (artifacts or git extraction)
-            if not self._handle_notebooks(git_ref, version_name, notebooks_temp):
-                raise BuildError(f"Failed to acquire notebooks for {git_ref}")
-            
-            # Verify notebooks directory exists
-            if not (notebooks_temp / "notebooks").exists():
-                raise BuildError(f"No notebooks directory found after acquisition")
-            
-            # Count notebooks
-            notebook_files = list((notebooks_temp / "notebooks").glob("*.ipynb"))
-            log(f"Found {len(notebook_files)} notebook files", LogLevel.SUCCESS)
-            
-            # Step 2: Extract full repository for installation
-            log(f"Extracting repository from {git_ref}...")
-            source_temp.mkdir(parents=True, exist_ok=True)
+        Args:
+            version_config: Version configuration dict from YAML
+            reuse_existing: Keep notebooks extracted by a previous run
             
-            git_extract(
-                self.uclchem_repo,
-                git_ref,
-                source_temp
-            )
+        Raises:
+            BuildError if no notebooks could be acquired
+        """
+        git_ref = version_config['git_ref']
+        notebooks_temp, _ = self._version_temp_dirs(version_config)
+        
+        if reuse_existing and (notebooks_temp / "notebooks").exists():
+            log(f"Reusing notebooks in {notebooks_temp}", LogLevel.SUCCESS)
+        elif not self._handle_notebooks(git_ref, version_config['version_name'], notebooks_temp):
+            raise BuildError(f"Failed to acquire notebooks for {git_ref}")
+        
+        # Verify notebooks directory exists
+        if not (notebooks_temp / "notebooks").exists():
+            raise BuildError(f"No notebooks directory found after acquisition")
+        
+        # Count notebooks
+        notebook_files = list((notebooks_temp / "notebooks").glob("*.ipynb"))
+        log(f"Found {len(notebook_files)} notebook files", LogLevel.SUCCESS)
+    
+    def extract_source(self, version_config: Dict, reuse_existing: bool = False) -> None:
+        """
+        Step 2: Extract the full repository for installation.
+        
+        Args:
+            version_config: Version configuration dict from YAML
+            reuse_existing: Keep a source tree extracted by a previous run
             
-            if not (source_temp / "pyproject.toml").exists():
-                raise BuildError(f"No pyproject.toml found in {git_ref}")
+        Raises:
+            BuildError if extraction fails
+        """
+        git_ref = version_config['git_ref']
+        _, source_temp = self._version_temp_dirs(version_config)
+        
+        if reuse_existing and (source_temp / "pyproject.toml").exists():
+            log(f"Reusing extracted repository in {source_temp}", LogLevel.SUCCESS)
+            return
+        
+        log(f"Extracting repository from {git_ref}...")
+        source_temp.mkdir(parents=True, exist_ok=True)
+        
+        git_extract(
+            self.uclchem_repo,
+            git_ref,
+            source_temp
+        )
+        
+        if not (source_temp / "pyproject.toml").exists():
+            raise BuildError(f"No pyproject.toml found in {git_ref}")
+        
+        log("Repository extracted", LogLevel.SUCCESS)
+    
+    def install_version(self, version_config: Dict, reuse_existing: bool = False) -> Path:
+        """
+        Step 3: Install UCLCHEM for a version.
+        
+        An environment the checkpoint journal records for the same commit is
+        reused with --resume or reuse_existing (watch mode), as long as the
+        probe still imports uclchem from it; otherwise it is reinstalled.
+        
+        Args:
+            version_config: Version configuration dict from YAML
+            reuse_existing: Reuse the recorded installation even without --resume
             
-            log("Repository extracted", LogLevel.SUCCESS)
+        Returns:
+            Path to the sphinx-build executable of the environment it was installed into
             
-            # Step 3: Install UCLCHEM
+        Raises:
+            BuildError if installation fails
+        """
+        git_ref = version_config['git_ref']
+        version_name = version_config['version_name']
+        _, source_temp = self._version_temp_dirs(version_config)
+        
+        python_path, pip_path, sphinx_build_path, venv_dir, installed = self._prepare_environment(git_ref)
+        commit = git_resolve_commit(self.uclchem_repo, git_ref) or git_ref
+        install_log = self.build_root.parent / "logs" / f"install_{version_name}.log"
+        install_log.parent.mkdir(parents=True, exist_ok=True)
+        
+        def install() -> None:
             log(f"Installing UCLCHEM from {git_ref}...")
-            install_log = self.build_root.parent / "logs" / f"install_{version_name}.log"
-            install_log.parent.mkdir(parents=True, exist_ok=True)
-            
-            if not install_package(source_temp, self.python_path, self.pip_path, install_log):
+            if not install_package(source_temp, pip_path, install_log, tee=self.verbose):
                 raise BuildError("UCLCHEM installation failed")
+        
+        reused = installed
+        if installed:
+            log(f"Reusing cached environment for {git_ref}: {venv_dir}", LogLevel.SUCCESS)
+        elif (self.resume or reuse_existing) and self.checkpoints.installed_commit(python_path) == commit:
+            log(f"Reusing the installation of {git_ref} in {python_path}", LogLevel.SUCCESS)
+            reused = True
+        else:
+            install()
+        
+        # One probe for the uclchem import, version and Fortran wrapper
+        probe = probe_installation(python_path)
+        if reused and not probe['uclchem']:
+            log(f"Recorded installation of {git_ref} no longer imports uclchem - reinstalling", LogLevel.WARNING)
+            installed = False
+            install()
+            probe = probe_installation(python_path)
+        probe_log = install_log.with_name(f"probe_{version_name}.json")
+        with open(probe_log, 'w') as f:
+            json.dump(probe, f, indent=2)
+        
+        if not probe['uclchem']:
+            # Never let a broken environment be reused or resumed
+            if venv_dir:
+                clear_venv_ready(venv_dir)
+            self.checkpoints.forget_install(python_path)
+            error = probe['errors'].get('uclchem') or probe['errors'].get('probe')
+            raise BuildError(f"Failed to import uclchem after installation: {error}")
+        
+        # Only an environment that imports uclchem counts as installed
+        if venv_dir and not installed:
+            mark_venv_ready(venv_dir, commit)
+        self.checkpoints.record_install(python_path, commit)
+        
+        timings = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in probe['import_seconds'].items())
+        if probe['fortran']:
+            fortran_status = f"with Fortran wrapper, {len(probe['modules'])} modules"
+        else:
+            fortran_status = "Fortran wrapper not available"
+        log(f"UCLCHEM {version_name} installed: {probe['version']} ({fortran_status}; import {timings})",
+            LogLevel.SUCCESS)
+        
+        return sphinx_build_path
+    
+    def link_notebooks(self, version_config: Dict) -> Dict[str, str]:
+        """
+        Step 4: Point the docs notebooks symlink at a version's notebooks.
+        
+        Args:
+            version_config: Version configuration dict from YAML
             
-            # Check for Fortran wrapper
-            has_fortran = check_fortran_available(self.python_path)
-            fortran_status = "with Fortran wrapper" if has_fortran else "Fortran wrapper not available"
-            log(f"UCLCHEM {version_name} installed ({fortran_status})", LogLevel.SUCCESS)
-            
-            # Step 4: Set up notebooks symlink
-            log("Setting up notebooks symlink...")
-            notebooks_link = self.docs_root / "notebooks"
-            create_symlink(notebooks_temp / "notebooks", notebooks_link)
-            log("Notebooks symlink created", LogLevel.SUCCESS)
-            
-            # Step 5: Build Sphinx documentation
-            log("Building Sphinx documentation...")
+        Returns:
+            Environment variables for the version-aware Sphinx build
+        """
+        notebooks_temp, _ = self._version_temp_dirs(version_config)
+        
+        log("Setting up notebooks symlink...")
+        notebooks_link = self.docs_root / "notebooks"
+        create_symlink(notebooks_temp / "notebooks", notebooks_link)
+        log("Notebooks symlink created", LogLevel.SUCCESS)
+        
+        return self._sphinx_env(version_config)
+    
+    def _sphinx_env(self, version_config: Dict) -> Dict[str, str]:
+        """Environment variables for a version's Sphinx build, read by conf.py."""
+        version_name = version_config['version_name']
+        notebooks_temp, source_temp = self._version_temp_dirs(version_config)
+        return {
+            "DOCS_BLOG_MODE": "external" if self.separate_blog else "",
+            "DOCS_VERSION": version_name,
+            "DOCS_DISPLAY_NAME": version_config.get('display_name', version_name),
+            "DOCS_VERSIONS_CONFIG": str(self.config_path),
+            INTERSPHINX_CACHE_ENV: str(self.intersphinx_cache_dir),
+            "DOCS_PARAMS_SNAPSHOT": str(self.param_snapshot_dir / f"{version_name}.json"),
+            "NOTEBOOKS_PATH": str(notebooks_temp / "notebooks"),
+            "UCLCHEM_SOURCE_PATH": str(source_temp / "src")  # Point to src directory, not src/uclchem
+        }
+    
+    def build_sphinx(self, version_config: Dict, sphinx_build_path: Path) -> None:
+        """
+        Steps 4-5: Link notebooks and run Sphinx for an installed version.
+        
+        Args:
+            version_config: Version configuration dict from YAML
+            sphinx_build_path: sphinx-build of the environment the version is installed in
             
-            # Set environment variables for version-aware build
-            env_vars = {
-                "DOCS_VERSION": version_name,
-                "DOCS_DISPLAY_NAME": display_name,
-                "NOTEBOOKS_PATH": str(notebooks_temp / "notebooks"),
-                "UCLCHEM_SOURCE_PATH": str(source_temp / "src")  # Point to src directory, not src/uclchem
-            }
+        Raises:
+            BuildError if the Sphinx build fails
+        """
+        version_name = version_config['version_name']
+        display_name = version_config.get('display_name', version_name)
+        output_dir = self.build_root / version_name
+        
+        env_vars = self.link_notebooks(version_config)
+        
+        # Step 5: Build Sphinx documentation
+        log("Building Sphinx documentation...")
+        
+        build_log = self.build_root.parent / "logs" / f"build_{version_name}.log"
+        
+        if not run_sphinx_build(
+            self.docs_root,
+            output_dir,
+            sphinx_build_path,
+            env_vars=env_vars,
+            log_file=build_log,
+            tee=self.verbose
+        ):
+            raise BuildError("Sphinx build failed")
+        
+        log(f"Successfully built version {display_name}", LogLevel.SUCCESS)
+        log(f"Output: {output_dir}")
+        
+        # Clean up api/fortran and api/site-packages to prevent cross-contamination
+        api_fortran = self.docs_root / "api" / "fortran"
+        if api_fortran.exists():
+            clean_directory(api_fortran)
+        
+        api_site_packages = self.docs_root / "api" / "site-packages"
+        if api_site_packages.exists():
+            clean_directory(api_site_packages)
+    
+    def _docs_source_digest(self) -> str:
+        """Hash the contents of every docs source file and the scripts conf.py imports (computed once per run)."""
+        if self._docs_digest is None:
+            digest = hashlib.sha256()
+            scripts = [str(self.docs_root / "scripts" / name) for name in CONF_SCRIPT_MODULES]
+            for path in sorted(self._snapshot_sources()) + scripts:
+                digest.update(os.path.relpath(path, self.docs_root).encode())
+                try:
+                    with open(path, 'rb') as f:
+                        digest.update(hashlib.sha256(f.read()).digest())
+                except OSError:
+                    pass
+            self._docs_digest = digest.hexdigest()
+        return self._docs_digest
+    
+    def _stage_inputs(self, version_config: Dict, stage: str) -> str:
+        """
+        Hash the inputs of a build stage for the checkpoint journal.
+        
+        Every stage depends on the commit its git ref resolves to. Notebook
+        acquisition also depends on whether artifacts can be downloaded, and
+        the Sphinx build on the docs sources, the version's display settings,
+        the versions manifest and the environment conf.py reads.
+        
+        Args:
+            version_config: Version configuration dict from YAML
+            stage: Stage name ('notebooks', 'extract' or 'sphinx')
             
-            build_log = self.build_root.parent / "logs" / f"build_{version_name}.log"
+        Returns:
+            Hex digest of the stage inputs
+        """
+        git_ref = version_config['git_ref']
+        inputs = [stage, git_ref, git_resolve_commit(self.uclchem_repo, git_ref) or git_ref]
+        if stage == 'notebooks':
+            inputs.append('artifacts' if self.github_token else 'git')
+        elif stage == 'sphinx':
+            inputs += [
+                version_config.get('display_name'),
+                self._docs_source_digest(),
+                # Every page inlines the versions manifest
+                hashed_manifest_name(build_versions_manifest(self.config['versions'])),
+                sorted(self._sphinx_env(version_config).items()),
+                [os.environ.get(name) for name in CONF_ENV_VARS],
+            ]
+        return hashlib.sha256(json.dumps(inputs).encode()).hexdigest()
+    
+    def _stage_outputs_intact(self, version_config: Dict, stage: str) -> bool:
+        """Check that the outputs of a completed stage are still on disk."""
+        notebooks_temp, source_temp = self._version_temp_dirs(version_config)
+        if stage == 'notebooks':
+            return any((notebooks_temp / "notebooks").glob("*.ipynb"))
+        if stage == 'extract':
+            return (source_temp / "pyproject.toml").exists()
+        return (self.build_root / version_config['version_name'] / "index.html").exists()
+    
+    def stage_complete(self, version_config: Dict, stage: str) -> bool:
+        """
+        Check whether a resumed build can skip a stage.
+        
+        Args:
+            version_config: Version configuration dict from YAML
+            stage: Stage name
             
-            if not run_sphinx_build(
-                self.docs_root,
-                output_dir,
-                self.sphinx_build_path,
-                env_vars=env_vars,
-                log_file=build_log
-            ):
-                raise BuildError("Sphinx build failed")
+        Returns:
+            True if resuming, the journal records the stage as complete with
+            the same inputs, and its outputs are intact
+        """
+        return (
+            self.resume
+            and self.checkpoints.is_complete(
+                version_config['version_name'], stage, self._stage_inputs(version_config, stage)
+            )
+            and self._stage_outputs_intact(version_config, stage)
+        )
+    
+    def run_stage(self, version_config: Dict, stage: str, func: Callable, *args) -> None:
+        """
+        Run a build stage unless a resumed build can skip it, then record it.
+        
+        Args:
+            version_config: Version configuration dict from YAML
+            stage: Stage name used in the checkpoint journal
+            func: Stage method to call
+            *args: Arguments for func
             
-            log(f"Successfully built version {display_name}", LogLevel.SUCCESS)
-            log(f"Output: {output_dir}")
+        Raises:
+            BuildError if the stage fails
+        """
+        version_name = version_config['version_name']
+        if self.stage_complete(version_config, stage):
+            log(f"Resuming: {stage} for {version_name} already complete", LogLevel.SUCCESS)
+            return
+        
+        func(*args)
+        self.checkpoints.record(version_name, stage, self._stage_inputs(version_config, stage))
+    
+    def prepare_version(self, version_config: Dict, reuse_existing: bool = False) -> Tuple[Dict[str, str], Path]:
+        """
+        Acquire notebooks and source for a version and install its UCLCHEM.
+        
+        Args:
+            version_config: Version configuration dict from YAML
+            reuse_existing: Keep notebooks and source already extracted to the
+                temp directory by a previous run instead of fetching them again,
+                and the installation the checkpoint journal records for the commit
             
-            # Clean up api/fortran and api/site-packages to prevent cross-contamination
-            api_fortran = self.docs_root / "api" / "fortran"
-            if api_fortran.exists():
-                clean_directory(api_fortran)
+        Returns:
+            Tuple of (Sphinx environment variables, sphinx-build path)
             
-            api_site_packages = self.docs_root / "api" / "site-packages"
-            if api_site_packages.exists():
-                clean_directory(api_site_packages)
+        Raises:
+            BuildError if any step fails
+        """
+        self.acquire_notebooks(version_config, reuse_existing)
+        self.extract_source(version_config, reuse_existing)
+        sphinx_build_path = self.install_version(version_config, reuse_existing)
+        env_vars = self.link_notebooks(version_config)
+        return env_vars, sphinx_build_path
+    
+    def build_version(self, version_config: Dict) -> bool:
+        """
+        Build documentation for a single version.
+        
+        Args:
+            version_config: Version configuration dict from YAML
             
+        Returns:
+            True if build succeeded
+        """
+        git_ref = version_config['git_ref']
+        version_name = version_config['version_name']
+        display_name = version_config.get('display_name', version_name)
+        
+        log("=" * 60)
+        log(f"Building version: {display_name}")
+        log(f"Git ref: {git_ref}")
+        log("=" * 60)
+        
+        if self.stage_complete(version_config, 'sphinx'):
+            log(f"Resuming: {display_name} was already built", LogLevel.SUCCESS)
+            return True
+        
+        try:
+            self.run_stage(version_config, 'notebooks', self.acquire_notebooks, version_config)
+            self.run_stage(version_config, 'extract', self.extract_source, version_config)
+            sphinx_build_path = self.install_version(version_config)
+            self.run_stage(version_config, 'sphinx', self.build_sphinx, version_config, sphinx_build_path)
             return True
             
         except BuildError as e:
@@ -294,24 +830,399 @@ class MultiVersionBuilder:
             log(f"Unexpected error building {display_name}: {e}", LogLevel.ERROR)
             return False
     
+    def _snapshot_sources(self) -> Dict[str, float]:
+        """Map every watched docs source file to its modification time."""
+        snapshot = {}
+        for dirpath, dirnames, filenames in os.walk(self.docs_root):
+            rel_dir = Path(dirpath).relative_to(self.docs_root)
+            # Prune build output, generated API pages and the notebooks symlink
+            dirnames[:] = [
+                d for d in dirnames
+                if not d.startswith('.') and str(rel_dir / d) not in WATCH_EXCLUDE_DIRS
+            ]
+            for filename in filenames:
+                if Path(filename).suffix in WATCH_SUFFIXES:
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        snapshot[path] = os.stat(path).st_mtime
+                    except OSError:
+                        pass
+        return snapshot
+    
+    def watch_version(self, version_name: str, port: int = 8000, interval: float = 1.0) -> int:
+        """
+        Serve one version and rebuild it incrementally when docs sources change.
+        
+        The version's notebooks, extracted source and installed environment
+        are prepared once (reused from a previous build or watch session when
+        present; the installation when the checkpoint journal records its
+        commit and it still imports), and the Sphinx doctree cache in the
+        output directory is kept, so each change only costs an incremental
+        Sphinx pass.
+        
+        Args:
+            version_name: version_name from versions.yaml to watch
+            port: Port for the local HTTP server
+            interval: Seconds between source polls
+            
+        Returns:
+            Exit code
+        """
+        version_config = next(
+            (v for v in self.config['versions'] if v['version_name'] == version_name), None
+        )
+        if version_config is None:
+            names = ', '.join(v['version_name'] for v in self.config['versions'])
+            raise BuildError(f"Unknown version '{version_name}' (available: {names})")
+        
+        self.validate_prerequisites()
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        
+        env_vars, sphinx_build_path = self.prepare_version(version_config, reuse_existing=True)
+        output_dir = self.build_root / version_name
+        build_log = self.build_root.parent / "logs" / f"watch_{version_name}.log"
+        # A deduplicated output shares inodes with the other versions, and a
+        # sharded one holds a search stub Sphinx cannot extend
+        break_hardlinks(output_dir)
+        self.restore_search_indexes([output_dir])
+        
+        def rebuild() -> None:
+            start = time.perf_counter()
+            if run_sphinx_build(self.docs_root, output_dir, sphinx_build_path,
+                                env_vars=env_vars, log_file=build_log):
+                log(f"Rebuilt {version_name} in {time.perf_counter() - start:.1f}s", LogLevel.SUCCESS)
+            else:
+                log(f"Rebuild failed, see {build_log}", LogLevel.ERROR)
+        
+        rebuild()
+        self.generate_manifest()
+        
+        handler = partial(_QuietHTTPRequestHandler, directory=str(self.build_root))
+        server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        log(f"Serving http://127.0.0.1:{port}/{version_name}/ (Ctrl+C to stop)", LogLevel.SUCCESS)
+        
+        snapshot = self._snapshot_sources()
+        try:
+            while True:
+                time.sleep(interval)
+                current = self._snapshot_sources()
+                if current == snapshot:
+                    continue
+                
+                changed = sorted(p for p in set(current) | set(snapshot) if current.get(p) != snapshot.get(p))
+                for path in changed[:5]:
+                    log(f"Changed: {Path(path).relative_to(self.docs_root)}")
+                
+                rebuild()
+                # Pick up edits made while Sphinx was running on the next poll
+                snapshot = current
+        except KeyboardInterrupt:
+            log("Stopping watch mode")
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        return 0
+    
+    def build_scheduled(self) -> Tuple[int, List[str]]:
+        """
+        Build all versions as a task graph so stages of different versions overlap.
+        
+        Each version becomes notebooks (network), extract (disk), install (cpu)
+        and sphinx (cpu) tasks, plus one alias task (disk) per alias. Sphinx
+        tasks share the docs source directory (notebooks symlink, generated
+        api/ pages) and hold an exclusive lock on it. Without isolated
+        environments all versions also share one Python environment, so each
+        install waits for the previous version's Sphinx build to finish
+        (whether or not it succeeded).
+        
+        Returns:
+            Tuple of (success_count, failed_version_names)
+        """
+        graph = TaskGraph()
+        version_tasks: Dict[str, str] = {}
+        sphinx_paths: Dict[str, Path] = {}
+        previous_sphinx = None
+        
+        def install(config: Dict) -> None:
+            sphinx_paths[config['version_name']] = self.install_version(config)
+        
+        def sphinx(config: Dict) -> None:
+            self.run_stage(config, 'sphinx', self.build_sphinx, config, sphinx_paths[config['version_name']])
+        
+        def alias(primary: Dict, config: Dict) -> None:
+            if not self.build_alias(primary, config):
+                raise BuildError(f"Failed to create alias {config['version_name']}")
+        
+        for primary, aliases in self.group_versions_by_commit():
+            name = primary['version_name']
+            version_tasks[name] = f"{name}:sphinx"
+            
+            if self.stage_complete(primary, 'sphinx'):
+                # Keep a placeholder so alias tasks can depend on it
+                graph.add(Task(f"{name}:sphinx", Resource.DISK, partial(
+                    log, f"Resuming: {name} was already built", LogLevel.SUCCESS
+                )))
+            else:
+                graph.add(Task(f"{name}:notebooks", Resource.NETWORK, partial(
+                    self.run_stage, primary, 'notebooks', self.acquire_notebooks, primary
+                )))
+                graph.add(Task(f"{name}:extract", Resource.DISK, partial(
+                    self.run_stage, primary, 'extract', self.extract_source, primary
+                )))
+                
+                # A shared environment must not be reinstalled while another
+                # version's Sphinx build is using it
+                install_after = [previous_sphinx] if previous_sphinx and not self.isolated_envs else []
+                graph.add(Task(
+                    f"{name}:install", Resource.CPU, partial(install, primary),
+                    deps=[f"{name}:extract"], after=install_after
+                ))
+                
+                graph.add(Task(
+                    f"{name}:sphinx", Resource.CPU, partial(sphinx, primary),
+                    deps=[f"{name}:notebooks", f"{name}:install"],
+                    locks=("docs_source",)
+                ))
+                previous_sphinx = f"{name}:sphinx"
+            
+            for alias_config in aliases:
+                alias_name = alias_config['version_name']
+                graph.add(Task(
+                    f"{alias_name}:alias", Resource.DISK, partial(alias, primary, alias_config),
+                    deps=[f"{name}:sphinx"]
+                ))
+                version_tasks[alias_name] = f"{alias_name}:alias"
+        
+        scheduler_config = self.config.get('build', {}).get('scheduler', {})
+        scheduler = Scheduler({
+            Resource.NETWORK: scheduler_config.get('network', 4),
+            Resource.CPU: scheduler_config.get('cpu', max(1, (os.cpu_count() or 2) // 2)),
+            Resource.DISK: scheduler_config.get('disk', 2),
+        })
+        statuses = scheduler.run(graph)
+        
+        scheduler.write_chrome_trace(self.trace_path)
+        log(f"Build timeline written to {self.trace_path} (open in https://ui.perfetto.dev)")
+        
+        failed_versions = [
+            config['version_name'] for config in self.config['versions']
+            if statuses.get(version_tasks.get(config['version_name'])) != TaskStatus.SUCCESS
+        ]
+        return len(self.config['versions']) - len(failed_versions), failed_versions
+    
+    def group_versions_by_commit(self) -> List[Tuple[Dict, List[Dict]]]:
+        """
+        Group configured versions that resolve to the same commit.
+        
+        Each commit is built once. Within a group the entry whose
+        version_name equals its git_ref (the pinned tag) is built, and the
+        others (e.g. the 'main' alias) are derived from its output.
+        
+        Returns:
+            List of (primary_config, alias_configs) in configuration order
+        """
+        groups: Dict[str, List[Dict]] = {}
+        for version_config in self.config['versions']:
+            git_ref = version_config['git_ref']
+            commit = git_resolve_commit(self.uclchem_repo, git_ref) or git_ref
+            groups.setdefault(commit, []).append(version_config)
+        
+        result = []
+        for commit, configs in groups.items():
+            primary = next((c for c in configs if c['version_name'] == c['git_ref']), configs[0])
+            aliases = [c for c in configs if c is not primary]
+            if aliases:
+                log(f"{primary['version_name']} ({commit[:12]}) also serves: "
+                    f"{', '.join(a['version_name'] for a in aliases)}")
+            result.append((primary, aliases))
+        
+        return result
+    
+    def build_alias(self, primary_config: Dict, alias_config: Dict) -> bool:
+        """
+        Produce an alias version from the output of a version at the same commit.
+        
+        Args:
+            primary_config: Version configuration that was built
+            alias_config: Version configuration to derive from it
+            
+        Returns:
+            True if the alias output was created
+        """
+        source_dir = self.build_root / primary_config['version_name']
+        alias_dir = self.build_root / alias_config['version_name']
+        # An alias is current if it was derived from the current primary build
+        inputs = self._stage_inputs(primary_config, 'sphinx')
+        
+        if (self.resume and (alias_dir / "index.html").exists()
+                and self.checkpoints.is_complete(alias_config['version_name'], 'alias', inputs)):
+            log(f"Resuming: alias {alias_config['version_name']} already created", LogLevel.SUCCESS)
+            return True
+        
+        log(f"Creating {alias_config.get('display_name', alias_config['version_name'])} "
+            f"from {primary_config['version_name']} build...")
+        
+        try:
+            rewritten = create_alias_output(
+                source_dir,
+                alias_dir,
+                primary_config['version_name'],
+                alias_config['version_name']
+            )
+        except OSError as e:
+            log(f"Failed to create alias {alias_config['version_name']}: {e}", LogLevel.ERROR)
+            return False
+        
+        self.checkpoints.record(alias_config['version_name'], 'alias', inputs)
+        log(f"Alias {alias_config['version_name']} created ({rewritten} files retargeted)", LogLevel.SUCCESS)
+        return True
+    
+    def _blog_source_digest(self) -> str:
+        """Hash everything the blog build reads: posts, templates, static files and configuration."""
+        digest = hashlib.sha256()
+        paths = [self.docs_root / "conf.py", self.config_path]
+        for directory in (BLOG_DIR, "_templates", "_static"):
+            paths.extend(sorted(p for p in (self.docs_root / directory).rglob("*") if p.is_file()))
+        for path in paths:
+            digest.update(os.path.relpath(path, self.docs_root).encode())
+            try:
+                digest.update(hashlib.sha256(path.read_bytes()).digest())
+            except OSError:
+                pass
+        return digest.hexdigest()
+    
+    def build_blog(self) -> bool:
+        """
+        Build the blog once, unversioned, and publish it at /blog/.
+        
+        The output is kept in _build/blog_html between runs and Sphinx (with
+        ablog's post collection and feeds) only runs when the blog sources
+        have changed.
+        
+        Returns:
+            True if the blog was published
+        """
+        digest_file = self.blog_cache_dir / ".blog-digest"
+        digest = self._blog_source_digest()
+        
+        if (digest_file.exists() and digest_file.read_text() == digest
+                and (self.blog_cache_dir / "index.html").exists()):
+            log("Blog sources unchanged - reusing the previous blog build", LogLevel.SUCCESS)
+        else:
+            log("Building blog...")
+            built = run_sphinx_build(
+                self.docs_root / BLOG_DIR,
+                self.blog_cache_dir,
+                self.sphinx_build_path,
+                env_vars={
+                    "DOCS_BLOG_MODE": "only",
+                    "DOCS_VERSIONS_CONFIG": str(self.config_path),
+                    INTERSPHINX_CACHE_ENV: str(self.intersphinx_cache_dir),
+                },
+                log_file=self.build_root.parent / "logs" / "build_blog.log",
+                tee=self.verbose,
+                config_dir=self.docs_root
+            )
+            if not built:
+                log("Blog build failed - version pages link to a missing /blog/", LogLevel.ERROR)
+                return False
+            digest_file.write_text(digest)
+        
+        self._publish_section(self.blog_cache_dir, BLOG_DIR)
+        log(f"Blog published at {self.build_root / BLOG_DIR}/", LogLevel.SUCCESS)
+        return True
+    
+    def _publish_section(self, output_dir: Path, name: str) -> None:
+        """Copy a standalone Sphinx output into the site as /<name>/."""
+        section_dir = self.build_root / name
+        if section_dir.exists():
+            shutil.rmtree(section_dir)
+        shutil.copytree(
+            output_dir,
+            section_dir,
+            ignore=shutil.ignore_patterns(".doctrees", ".buildinfo", ".blog-digest")
+        )
+    
     def generate_manifest(self) -> None:
-        """Generate versions.json manifest for version switcher."""
+        """
+        Write the versions manifest for the version switchers.
+        
+        Pages inline the same manifest (see conf.py); the pydata theme switcher
+        fetches the content-hashed copy, and versions.json stays available at
+        its stable URL.
+        """
         log("Creating versions manifest...")
         
-        manifest = []
-        for version_config in self.config['versions']:
-            manifest.append({
-                "name": version_config.get('display_name', version_config['version_name']),
-                "version": version_config['version_name'],
-                "url": version_config['url_path'],
-                "preferred": version_config.get('preferred', False)
-            })
+        manifest = build_versions_manifest(self.config['versions'])
+        data = manifest_bytes(manifest)
+        hashed_name = hashed_manifest_name(manifest)
+        
+        (self.build_root / VERSIONS_MANIFEST).write_bytes(data)
+        (self.build_root / hashed_name).write_bytes(data)
+        
+        log(f"Created {VERSIONS_MANIFEST} and {hashed_name}", LogLevel.SUCCESS)
+    
+    def generate_page_index(self) -> None:
+        """Write the per-version page index the version switcher checks before navigating."""
+        log("Creating cross-version page index...")
         
-        manifest_path = self.build_root / "versions.json"
-        with open(manifest_path, 'w') as f:
-            json.dump(manifest, f, indent=2)
+        summary = write_page_index(
+            self.build_root,
+            [v['version_name'] for v in self.config['versions']],
+            renames=self.config.get('page_renames', [])
+        )
+        log(f"Created {PAGE_INDEX}: {summary['versions']} versions, {summary['lists']} distinct page lists, "
+            f"{summary['bytes'] / 1024:.1f} KB", LogLevel.SUCCESS)
+    
+    def generate_param_changes(self) -> bool:
+        """
+        Diff the per-version parameter snapshots into the parameter changes page.
+        
+        The page is generated as MyST and built with the docs configuration,
+        like the blog, so it has the site theme, navigation and version
+        switcher. It is published at /parameter-changes/, which every version
+        links to from its navigation bar.
+        
+        Returns:
+            True if the page was published
+        """
+        snapshots = load_param_snapshots(
+            self.param_snapshot_dir,
+            [v['version_name'] for v in self.config['versions']]
+        )
+        if len(snapshots) < 2:
+            log("Fewer than two parameter snapshots - the parameter changes page has nothing to compare")
+        
+        log("Creating parameter changes page...")
+        source_dir = self.docs_root / "_build" / "param_changes_src"
+        output_dir = self.docs_root / "_build" / "param_changes_html"
+        summary = write_param_changes_source(
+            source_dir,
+            diff_param_snapshots(snapshots) if len(snapshots) >= 2 else []
+        )
+        built = run_sphinx_build(
+            source_dir,
+            output_dir,
+            self.sphinx_build_path,
+            env_vars={
+                "DOCS_SITE_PAGE": PARAM_CHANGES_DIR,
+                "DOCS_VERSIONS_CONFIG": str(self.config_path),
+                INTERSPHINX_CACHE_ENV: str(self.intersphinx_cache_dir),
+            },
+            log_file=self.build_root.parent / "logs" / "build_param_changes.log",
+            tee=self.verbose,
+            config_dir=self.docs_root
+        )
+        if not built:
+            log("Parameter changes page build failed", LogLevel.ERROR)
+            return False
         
-        log("Created versions.json", LogLevel.SUCCESS)
+        self._publish_section(output_dir, PARAM_CHANGES_DIR)
+        log(f"Created /{PARAM_CHANGES_DIR}/: {summary['changes']} changes across {summary['pairs']} version pairs",
+            LogLevel.SUCCESS)
+        return True
     
     def create_root_redirect(self) -> None:
         """Create root index.html that redirects to default version."""
@@ -376,12 +1287,143 @@ class MultiVersionBuilder:
         
         log("Created root index.html", LogLevel.SUCCESS)
     
-    def cleanup_temp_files(self, keep_logs: bool = True) -> None:
-        """Clean up temporary files after build."""
+    def compress_output(self) -> None:
+        """Write precompressed .gz/.br siblings for large text assets."""
+        log("Precompressing build output...")
+        
+        summary = precompress_output(
+            self.build_root,
+            min_size=self.compress_config.get('min_size', 1024),
+            formats=tuple(self.compress_config.get('formats', ['gzip', 'brotli']))
+        )
+        
+        for key, value in summary.items():
+            if key.endswith('_saved'):
+                fmt = key[:-len('_saved')]
+                log(f"  {fmt}: {value / 1024 / 1024:.1f} MB saved "
+                    f"of {summary['original_bytes'] / 1024 / 1024:.1f} MB")
+        
+        log(f"Precompressed {summary['files']} files", LogLevel.SUCCESS)
+    
+    def shard_search_indexes(self) -> None:
+        """Split every version's search index into prefix shards."""
+        log("Sharding search indexes...")
+        
+        prefix_length = self.search_config.get('prefix_length', 2)
+        for version_dir in sorted(p for p in self.build_root.iterdir() if p.is_dir()):
+            summary = shard_search_index(
+                version_dir,
+                prefix_length=prefix_length,
+                target_shard_bytes=self.search_config.get('shard_size_kb', 64) * 1024,
+                backup_path=self.search_backup_dir / f"{version_dir.name}.js"
+            )
+            if summary is None:
+                continue
+            log(f"  {version_dir.name}: {summary['original_bytes'] / 1024:.0f} KB index -> "
+                f"{summary['base_bytes'] / 1024:.0f} KB base + {summary['shards']} shards "
+                f"(largest {summary['largest_shard_bytes'] / 1024:.0f} KB)")
+        
+        log("Search indexes sharded", LogLevel.SUCCESS)
+    
+    def restore_search_indexes(self, version_dirs: List[Path]) -> int:
+        """Give sharded versions their full Sphinx index back before rebuilding them in place."""
+        return sum(
+            restore_search_index(version_dir, self.search_backup_dir / f"{version_dir.name}.js")
+            for version_dir in version_dirs
+        )
+    
+    def share_assets_across_versions(self) -> None:
+        """Move assets identical across versions to the shared directory."""
+        log("Sharing identical assets across versions...")
+        
+        summary = share_identical_assets(self.build_root)
+        log(f"Shared {summary['assets']} assets, rewrote {summary['references']} references", LogLevel.SUCCESS)
+    
+    def deduplicate_output(self) -> None:
+        """Hardlink identical files across all version directories."""
+        log("Deduplicating build output...")
+        
+        summary = hardlink_identical_files(self.build_root)
+        log(f"Hardlinked {summary['files']} duplicate files "
+            f"({summary['bytes_saved'] / 1024 / 1024:.1f} MB saved)", LogLevel.SUCCESS)
+    
+    def write_deploy_manifest(self) -> Dict:
+        """Hash the build output and write the deploy manifest into it."""
+        log("Writing deploy manifest...")
+        
+        manifest = build_deploy_manifest(self.build_root)
+        with open(self.build_root / DEPLOY_MANIFEST, 'w') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        
+        log(f"Created {DEPLOY_MANIFEST} ({len(manifest['files'])} files)", LogLevel.SUCCESS)
+        return manifest
+    
+    def write_deploy_delta(self, manifest: Dict) -> None:
+        """Diff against the previously deployed manifest and write a delta bundle."""
+        log(f"Computing deploy delta against {self.previous_manifest}...")
+        
+        previous = load_deploy_manifest(self.previous_manifest)
+        if previous is None:
+            log("No previous manifest - delta bundle will contain the full site", LogLevel.WARNING)
+        
+        diff = diff_deploy_manifests(previous, manifest)
+        summary = write_delta_bundle(self.build_root, manifest, diff, self.delta_dir)
+        
+        # Per-version breakdown of what changed
+        changed_versions: Dict[str, int] = {}
+        for rel_path in diff['added'] + diff['changed'] + diff['removed']:
+            top = rel_path.split('/', 1)[0] if '/' in rel_path else '(root)'
+            changed_versions[top] = changed_versions.get(top, 0) + 1
+        for top, count in sorted(changed_versions.items()):
+            log(f"  {top}: {count} files changed")
+        
+        log(f"Delta bundle: {summary['uploaded']} files to upload "
+            f"({summary['upload_bytes'] / 1024 / 1024:.1f} of {summary['total_bytes'] / 1024 / 1024:.1f} MB), "
+            f"{summary['removed']} to delete, {summary['unchanged']} unchanged", LogLevel.SUCCESS)
+        log(f"  {self.delta_dir}")
+    
+    def check_links(self) -> bool:
+        """
+        Check links across all built versions.
+        
+        Returns:
+            False if broken links were found and build.linkcheck.fail_on_broken is set
+        """
+        log("Checking links...")
+        
+        report = check_site_links(
+            self.build_root,
+            self.docs_root / "_build" / LINKCHECK_CACHE,
+            site_url=self.linkcheck_config.get('site_url'),
+            ignore=tuple(self.linkcheck_config.get('ignore', [])),
+            max_workers=self.linkcheck_config.get('workers', 16),
+            per_host=self.linkcheck_config.get('per_host', 2),
+            ttl_hours=self.linkcheck_config.get('ttl_hours', 168),
+            timeout=self.linkcheck_config.get('timeout', 15)
+        )
+        log_report(report)
+        
+        report_path = self.build_root.parent / "logs" / "linkcheck.json"
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        log(f"Link report written to {report_path}")
+        
+        has_broken = bool(report['internal']['broken'] or report['external']['broken'])
+        return not (has_broken and self.linkcheck_config.get('fail_on_broken', False))
+    
+    def cleanup_temp_files(self, keep_logs: bool = True, keep_temp: bool = False) -> None:
+        """
+        Clean up temporary files after build.
+        
+        Args:
+            keep_logs: Keep the build logs
+            keep_temp: Keep extracted notebooks and sources for a --resume run
+        """
         log("Cleaning up temporary files...")
         
         # Remove temp directory
-        if self.temp_dir.exists():
+        if self.temp_dir.exists() and not keep_temp:
             clean_directory(self.temp_dir)
         
         # Remove notebooks symlink
@@ -415,28 +1457,82 @@ class MultiVersionBuilder:
             log(f"Prerequisites validation failed: {e}", LogLevel.ERROR)
             return 1
         
-        # Clean previous builds
-        self.clean_previous_builds()
+        # Clean previous builds, or keep them and continue from the journal
+        if self.resume:
+            log(f"Resuming from {self.checkpoints.path}")
+            self.temp_dir.mkdir(parents=True, exist_ok=True)
+            # Kept output is rebuilt in place, so it must not share inodes (--dedup)
+            unlinked = break_hardlinks(self.build_root)
+            if unlinked:
+                log(f"Unlinked {unlinked} deduplicated files before rebuilding")
+            if self.build_root.exists():
+                restored = self.restore_search_indexes([p for p in self.build_root.iterdir() if p.is_dir()])
+                if restored:
+                    log(f"Restored {restored} full search indexes before rebuilding")
+        else:
+            self.clean_previous_builds()
+            self.checkpoints.reset()
+        
+        self.fill_intersphinx_cache()
         
         # Build each version
         log("")
         success_count = 0
         failed_versions = []
         
-        for version_config in self.config['versions']:
-            if self.build_version(version_config):
-                success_count += 1
-            else:
-                failed_versions.append(version_config['version_name'])
-            log("")  # Blank line between versions
+        if self.parallel:
+            success_count, failed_versions = self.build_scheduled()
+        else:
+            for primary, aliases in self.group_versions_by_commit():
+                built = self.build_version(primary)
+                if built:
+                    success_count += 1
+                else:
+                    failed_versions.append(primary['version_name'])
+                
+                for alias_config in aliases:
+                    if built and self.build_alias(primary, alias_config):
+                        success_count += 1
+                    else:
+                        failed_versions.append(alias_config['version_name'])
+                log("")  # Blank line between versions
         
         # Generate manifest and root redirect
+        links_ok = True
+        blog_ok = True
+        changes_ok = True
         if success_count > 0:
+            if self.separate_blog:
+                blog_ok = self.build_blog()
+            
             self.generate_manifest()
+            self.generate_page_index()
+            changes_ok = self.generate_param_changes()
             self.create_root_redirect()
+            
+            if self.shard_search:
+                self.shard_search_indexes()
+            
+            if self.share_assets:
+                self.share_assets_across_versions()
+            
+            if self.compress:
+                self.compress_output()
+            
+            if self.dedup:
+                self.deduplicate_output()
+            
+            manifest = self.write_deploy_manifest()
+            if self.previous_manifest:
+                self.write_deploy_delta(manifest)
+            
+            if self.linkcheck:
+                links_ok = self.check_links()
         
-        # Cleanup
-        self.cleanup_temp_files(keep_logs=True)
+        # Cleanup (failed builds keep their sources so --resume can reuse them)
+        self.cleanup_temp_files(keep_logs=True, keep_temp=bool(failed_versions))
+        if self.isolated_envs:
+            self.evict_environments()
         
         # Summary
         log("=" * 60)
@@ -447,6 +1543,7 @@ class MultiVersionBuilder:
         
         if failed_versions:
             log(f"Failed versions: {', '.join(failed_versions)}", LogLevel.WARNING)
+            log("Rerun with --resume to retry only the failed stages", LogLevel.WARNING)
         
         built_versions = [v for v in self.config['versions'] if v['version_name'] not in failed_versions]
         if built_versions:
@@ -464,7 +1561,7 @@ class MultiVersionBuilder:
         log(f"  cd {self.build_root} && python3 -m http.server 8000")
         log("Then open: http://localhost:8000")
         
-        return 0 if not failed_versions else 1
+        return 0 if not failed_versions and links_ok and blog_ok and changes_ok else 1
 
 
 def main():
@@ -481,12 +1578,87 @@ def main():
     parser.add_argument(
         "--uclchem-repo",
         type=Path,
-        help="Path to UCLCHEM repository (auto-detected if not provided)"
+        help="Path to UCLCHEM repository, or of the mirror with --mirror (auto-detected if not provided)"
+    )
+    parser.add_argument(
+        "--mirror",
+        action="store_true",
+        help="Use a persistent bare mirror of UCLCHEM, fetching only the configured refs (see build.mirror)"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Use the mirror without contacting the remote (implies --mirror)"
     )
     parser.add_argument(
         "--github-token",
         help="GitHub API token for accessing artifacts (or set GITHUB_TOKEN env var)"
     )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="Write precompressed .gz/.br files next to large text assets"
+    )
+    parser.add_argument(
+        "--shard-search",
+        action="store_true",
+        help="Split each version's search index into shards fetched per query"
+    )
+    parser.add_argument(
+        "--linkcheck",
+        action="store_true",
+        help="Check internal and external links of the built site (cached, see build.linkcheck)"
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Hardlink files that are identical across versions"
+    )
+    parser.add_argument(
+        "--shared-assets",
+        action="store_true",
+        help="Serve assets identical across versions from /_shared/<hash> (implies --dedup)"
+    )
+    parser.add_argument(
+        "--previous-manifest",
+        help=f"Path or URL of the deployed {DEPLOY_MANIFEST}; writes a delta bundle of changed files"
+    )
+    parser.add_argument(
+        "--delta-dir",
+        type=Path,
+        help="Output directory for the delta bundle (default: _build/deploy_delta)"
+    )
+    parser.add_argument(
+        "--isolated-envs",
+        action="store_true",
+        help="Install each uclchem commit into its own cached virtual environment"
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Overlap stages of different versions (writes _build/logs/build_trace.json)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue a failed build, skipping stages recorded in _build/checkpoints.json"
+    )
+    parser.add_argument(
+        "--watch",
+        metavar="VERSION",
+        help="Build one version, serve it and rebuild incrementally on docs changes"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="Port for the --watch server (default: 8000)"
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Echo pip and Sphinx output to the console (always written to _build/logs/)"
+    )
     parser.add_argument(
         "--ci",
         action="store_true",
@@ -499,9 +1671,25 @@ def main():
         builder = MultiVersionBuilder(
             config_path=args.config,
             uclchem_repo=args.uclchem_repo,
-            github_token=args.github_token
+            github_token=args.github_token,
+            compress=args.compress,
+            dedup=args.dedup,
+            share_assets=args.shared_assets,
+            previous_manifest=args.previous_manifest,
+            delta_dir=args.delta_dir,
+            isolated_envs=args.isolated_envs,
+            parallel=args.parallel,
+            resume=args.resume,
+            verbose=args.verbose,
+            shard_search=args.shard_search,
+            linkcheck=args.linkcheck,
+            mirror=args.mirror,
+            offline=args.offline
         )
-        exit_code = builder.build_all()
+        if args.watch:
+            exit_code = builder.watch_version(args.watch, port=args.port)
+        else:
+            exit_code = builder.build_all()
         sys.exit(exit_code)
         
     except BuildError as e:
@@ -4,18 +4,30 @@ Utility functions for multi-version documentation builds.
 Provides reusable operations for git, package management, and Sphinx builds.
 """
 
+import datetime
+import hashlib
+import json
 import os
+import re
 import shutil
 import subprocess
 import sys
+import threading
 import time
 import requests
 import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from enum import Enum
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 
+# Base URL for GitHub API calls against the UCLCHEM repository. Override with
+# UCLCHEM_GITHUB_API to point the build at a mirror or a local stand-in.
+GITHUB_API = os.environ.get('UCLCHEM_GITHUB_API', 'https://api.github.com/repos/uclchem/UCLCHEM')
+
+
 class LogLevel(Enum):
     """Log levels for build output."""
     INFO = "INFO"
@@ -51,12 +63,127 @@ def log(message: str, level: LogLevel = LogLevel.INFO) -> None:
     print(f"{color}{symbol} {message}{reset}", flush=True)
 
 
+# Lines of child output kept in memory for error reports when output is
+# streamed to a log file
+LOG_TAIL_LINES = 200
+# Longest line kept in memory; the rest of a longer line is only in the log file
+LOG_LINE_BYTES = 4 * 1024
+# Line breaks, including bare carriage returns from progress bars
+_LINE_BREAK_RE = re.compile(rb"\r\n|\r|\n")
+# Read size for child output and write buffer size for log files
+_PUMP_CHUNK_SIZE = 64 * 1024
+_LOG_BUFFER_SIZE = 1024 * 1024
+# Serializes console tee output so lines from concurrent children don't interleave
+_TEE_LOCK = threading.Lock()
+
+
+class LogPump:
+    """
+    Stream a child process's output to a log file with bounded memory.
+    
+    Output is read in chunks and written to the log file through a large
+    buffer. Only the last `tail_lines` lines, each cut to LOG_LINE_BYTES,
+    are kept in memory, for error reports; a carriage return ends a line,
+    so progress bars don't accumulate. Complete lines can optionally be
+    echoed to the console with a
+    prefix. Each child gets its own pump, so several can run concurrently
+    from threads (pump) or an asyncio event loop (pump_async).
+    """
+    
+    def __init__(
+        self,
+        log_file: Path,
+        tail_lines: int = LOG_TAIL_LINES,
+        tee: bool = False,
+        prefix: str = ""
+    ):
+        """
+        Initialize pump.
+        
+        Args:
+            log_file: File the complete output is written to
+            tail_lines: Number of trailing lines kept in memory
+            tee: Also echo output to stdout
+            prefix: Prepended to every echoed line
+        """
+        self.log_file = log_file
+        self.tee = tee
+        self.prefix = prefix
+        self.tail: deque = deque(maxlen=max(1, tail_lines))
+        self._partial = b""
+        self._pending_cr = False
+    
+    def _feed(self, chunk: bytes) -> None:
+        """Update the tail and echo the complete lines of a chunk."""
+        # A \r\n split across two chunks is a single line break
+        if self._pending_cr and chunk.startswith(b"\n"):
+            chunk = chunk[1:]
+        self._pending_cr = chunk.endswith(b"\r")
+        lines = _LINE_BREAK_RE.split(self._partial + chunk)
+        # Bounded even when the child never writes a line break
+        self._partial = lines.pop()[:LOG_LINE_BYTES]
+        if not lines:
+            return
+        self.tail.extend(line[:LOG_LINE_BYTES] for line in lines[-self.tail.maxlen:])
+        if self.tee:
+            text = "".join(
+                f"{self.prefix}{line.decode(errors='replace')}\n" for line in lines
+            )
+            with _TEE_LOCK:
+                sys.stdout.write(text)
+                sys.stdout.flush()
+    
+    def _finish(self) -> None:
+        """Flush a final line without trailing newline."""
+        if self._partial:
+            self._feed(b"\n")
+    
+    def pump(self, stream) -> None:
+        """
+        Copy a binary stream to the log file until EOF.
+        
+        Args:
+            stream: Binary file object (e.g. Popen.stdout)
+        """
+        read = getattr(stream, 'read1', stream.read)
+        with open(self.log_file, 'wb', buffering=_LOG_BUFFER_SIZE) as f:
+            while True:
+                chunk = read(_PUMP_CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+                self._feed(chunk)
+        self._finish()
+    
+    async def pump_async(self, stream) -> None:
+        """
+        Copy an asyncio stream to the log file until EOF.
+        
+        Args:
+            stream: asyncio.StreamReader (e.g. Process.stdout)
+        """
+        with open(self.log_file, 'wb', buffering=_LOG_BUFFER_SIZE) as f:
+            while True:
+                chunk = await stream.read(_PUMP_CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+                self._feed(chunk)
+        self._finish()
+    
+    def tail_text(self) -> str:
+        """Return the retained trailing lines."""
+        return "".join(f"{line.decode(errors='replace')}\n" for line in self.tail)
+
+
 def run_command(
     cmd: List[str],
     cwd: Optional[Path] = None,
     env: Optional[Dict[str, str]] = None,
     capture_output: bool = False,
-    log_file: Optional[Path] = None
+    log_file: Optional[Path] = None,
+    tee: bool = False,
+    tail_lines: int = LOG_TAIL_LINES
 ) -> Tuple[int, str, str]:
     """
     Run a shell command with optional logging.
@@ -67,9 +194,12 @@ def run_command(
         env: Environment variables (merged with current env)
         capture_output: If True, return stdout/stderr
         log_file: If provided, write output to this file
+        tee: With log_file, also echo output to the console
+        tail_lines: With log_file, number of trailing output lines returned
         
     Returns:
-        Tuple of (return_code, stdout, stderr)
+        Tuple of (return_code, stdout, stderr). With log_file, stdout holds
+        only the last tail_lines lines of the combined output.
     """
     # Merge environment variables
     full_env = os.environ.copy()
@@ -78,25 +208,20 @@ def run_command(
     
     # Run command
     if log_file:
-        with open(log_file, 'w') as f:
-            process = subprocess.Popen(
-                cmd,
-                cwd=cwd,
-                env=full_env,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True
-            )
-            
-            output_lines = []
-            for line in process.stdout:
-                f.write(line)
-                f.flush()
-                output_lines.append(line)
-            
+        process = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            env=full_env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT
+        )
+        pump = LogPump(log_file, tail_lines=tail_lines, tee=tee, prefix=f"[{log_file.stem}] ")
+        try:
+            pump.pump(process.stdout)
+        finally:
+            process.stdout.close()
             process.wait()
-            stdout = ''.join(output_lines)
-            return process.returncode, stdout, ""
+        return process.returncode, pump.tail_text(), ""
     else:
         result = subprocess.run(
             cmd,
@@ -170,20 +295,134 @@ def git_extract(
     return file_count
 
 
+def git_resolve_commit(repo_path: Path, git_ref: str) -> Optional[str]:
+    """
+    Resolve a git ref to its full commit SHA.
+    
+    Args:
+        repo_path: Path to git repository
+        git_ref: Git ref (branch, tag, commit)
+        
+    Returns:
+        Commit SHA, or None if the ref cannot be resolved
+    """
+    returncode, stdout, _ = run_command(
+        ["git", "rev-parse", "--verify", "--quiet", f"{git_ref}^{{commit}}"],
+        cwd=repo_path,
+        capture_output=True
+    )
+    return stdout.strip() if returncode == 0 else None
+
+
+def _is_commit_sha(git_ref: str) -> bool:
+    """Check whether a ref is spelled as a full commit SHA."""
+    return len(git_ref) == 40 and all(c in "0123456789abcdef" for c in git_ref.lower())
+
+
+def sync_mirror(mirror_path: Path, remote: str, git_refs: List[str], fetch: bool = True) -> Dict[str, int]:
+    """
+    Create or update a persistent bare mirror holding only the refs a build needs.
+    
+    The mirror is created on first use. Afterwards `git ls-remote` (one
+    round trip) compares the remote's refs with the mirror's, and only refs
+    that moved are fetched, so a warm mirror costs seconds and transfers
+    only new objects. Branches and tags are stored under their own names, so
+    git_extract and git_resolve_commit work on the mirror as on a clone.
+    
+    Args:
+        mirror_path: Bare repository directory (created if missing)
+        remote: URL or path of the upstream repository
+        git_refs: Branch, tag or full commit SHA names from versions.yaml
+        fetch: Contact the remote; False uses the mirror as it is (offline)
+        
+    Returns:
+        Dict with the number of refs fetched and already up to date
+        
+    Raises:
+        BuildError if the mirror cannot be created, or is missing refs offline
+    """
+    if not (mirror_path / "HEAD").exists():
+        if not fetch:
+            raise BuildError(f"Mirror not found and fetching disabled: {mirror_path}")
+        log(f"Creating UCLCHEM mirror in {mirror_path}...")
+        mirror_path.mkdir(parents=True, exist_ok=True)
+        returncode, _, stderr = run_command(["git", "init", "--bare", "--quiet"], cwd=mirror_path, capture_output=True)
+        if returncode != 0:
+            raise BuildError(f"Failed to create mirror: {stderr.strip()}")
+    
+    names = [ref for ref in dict.fromkeys(git_refs) if not _is_commit_sha(ref)]
+    shas = [ref for ref in dict.fromkeys(git_refs) if _is_commit_sha(ref)]
+    
+    if not fetch:
+        missing = [ref for ref in git_refs if not git_resolve_commit(mirror_path, ref)]
+        if missing:
+            raise BuildError(f"Refs missing from offline mirror {mirror_path}: {', '.join(missing)}")
+        return {"fetched": 0, "current": len(git_refs)}
+    
+    # What the remote has for the configured names (heads and tags)
+    returncode, stdout, stderr = run_command(
+        ["git", "ls-remote", "--heads", "--tags", "--refs", remote] + names,
+        capture_output=True
+    )
+    if returncode != 0:
+        raise BuildError(f"Failed to list refs of {remote}: {stderr.strip()}")
+    remote_refs = {}
+    for line in stdout.splitlines():
+        sha, _, ref = line.partition("\t")
+        remote_refs[ref] = sha
+    
+    refspecs = []
+    current = 0
+    for name in names:
+        ref = next((r for r in (f"refs/tags/{name}", f"refs/heads/{name}") if r in remote_refs), None)
+        if ref is None:
+            log(f"Ref '{name}' not found in {remote}", LogLevel.WARNING)
+            continue
+        returncode, local_sha, _ = run_command(
+            ["git", "rev-parse", "--verify", "--quiet", ref],
+            cwd=mirror_path,
+            capture_output=True
+        )
+        if returncode == 0 and local_sha.strip() == remote_refs[ref]:
+            current += 1
+        else:
+            refspecs.append(f"+{ref}:{ref}")
+    for sha in shas:
+        if git_resolve_commit(mirror_path, sha):
+            current += 1
+        else:
+            # Pinned under a ref so the commit survives gc in the mirror
+            refspecs.append(f"{sha}:refs/pinned/{sha}")
+    
+    if refspecs:
+        log(f"Fetching {len(refspecs)} refs into the mirror...")
+        returncode, _, stderr = run_command(
+            ["git", "fetch", "--no-tags", "--quiet", remote] + refspecs,
+            cwd=mirror_path,
+            capture_output=True
+        )
+        if returncode != 0:
+            raise BuildError(f"Failed to fetch into mirror: {stderr.strip()}")
+    
+    return {"fetched": len(refspecs), "current": current}
+
+
 def install_package(
     package_path: Path,
-    python_path: Path,
     pip_path: Path,
-    log_file: Optional[Path] = None
+    log_file: Optional[Path] = None,
+    tee: bool = False
 ) -> bool:
     """
     Install a Python package using pip.
     
+    Whether the package imports is checked separately by probe_installation.
+    
     Args:
         package_path: Path to package directory (with pyproject.toml or setup.py)
-        python_path: Path to Python executable
         pip_path: Path to pip executable
         log_file: Optional path to save installation log
+        tee: Also echo pip output to the console while logging it
         
     Returns:
         True if installation succeeded
@@ -200,69 +439,213 @@ def install_package(
         [str(pip_path), "install", "."],
         cwd=package_path,
         log_file=log_file,
-        capture_output=True
+        capture_output=True,
+        tee=tee
     )
     
     if returncode != 0:
         log(f"Installation failed: {stderr}", LogLevel.ERROR)
-        return False
-    
-    # Verify package installed
-    returncode, stdout, _ = run_command(
-        [str(python_path), "-c", "import uclchem"],
-        capture_output=True
-    )
-    
-    if returncode != 0:
-        log("Failed to import uclchem after installation", LogLevel.ERROR)
+        if log_file and not tee:
+            log(f"Last lines of {log_file}:\n{stdout}", LogLevel.ERROR)
         return False
     
     return True
 
 
-def check_fortran_available(python_path: Path) -> bool:
+# Run by probe_installation in the target environment. Prints one JSON object.
+_PROBE_SCRIPT = """
+import importlib.metadata, json, sys, time
+result = {"python": sys.version.split()[0], "uclchem": False, "version": None, "fortran": False,
+          "modules": [], "errors": {}, "import_seconds": {}}
+start = time.perf_counter()
+try:
+    import uclchem
+    result["uclchem"] = True
+except Exception as e:
+    result["errors"]["uclchem"] = f"{type(e).__name__}: {e}"
+result["import_seconds"]["uclchem"] = round(time.perf_counter() - start, 3)
+try:
+    result["version"] = importlib.metadata.version("uclchem")
+except importlib.metadata.PackageNotFoundError:
+    result["version"] = getattr(sys.modules.get("uclchem"), "__version__", None)
+start = time.perf_counter()
+try:
+    import uclchemwrap
+    result["fortran"] = True
+    result["modules"] = sorted(
+        name for name in dir(uclchemwrap)
+        if not name.startswith("_") and type(getattr(uclchemwrap, name)).__name__ == "fortran"
+    )
+except Exception as e:
+    result["errors"]["uclchemwrap"] = f"{type(e).__name__}: {e}"
+result["import_seconds"]["uclchemwrap"] = round(time.perf_counter() - start, 3)
+print(json.dumps(result))
+"""
+
+
+def probe_installation(python_path: Path) -> Dict:
     """
-    Check if uclchemwrap (Fortran extension) is available.
+    Inspect the uclchem installation of an environment in one subprocess.
+    
+    A single interpreter imports uclchem and then uclchemwrap (which is
+    cheap once NumPy and the extension are loaded by uclchem) and reports
+    everything the build needs.
     
     Args:
         python_path: Path to Python executable
         
     Returns:
-        True if uclchemwrap can be imported
+        Dict with 'uclchem' and 'fortran' (importable), 'version', Fortran
+        'modules', per-import 'import_seconds', 'errors' and the Python version
     """
-    returncode, _, _ = run_command(
-        [str(python_path), "-c", "import uclchemwrap"],
+    returncode, stdout, stderr = run_command(
+        [str(python_path), "-c", _PROBE_SCRIPT],
         capture_output=True
     )
-    return returncode == 0
+    try:
+        return json.loads(stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        return {
+            "python": None, "uclchem": False, "version": None, "fortran": False, "modules": [],
+            "errors": {"probe": stderr.strip() or f"probe exited with {returncode}"},
+            "import_seconds": {},
+        }
 
 
-def convert_jupytext_notebooks(notebooks_dir: Path) -> int:
-    """Convert Jupytext .py notebooks to .ipynb format.
+def _convert_jupytext_file(py_file: Path) -> bool:
+    """Convert one Jupytext file in-process.
 
-    Skips .py files that don't contain a jupytext header.
-    Returns the number of files successfully converted.
+    Returns True if the .ipynb was written, False if it was already up to date.
     """
-    converted = 0
+    import jupytext
+
+    ipynb_file = py_file.with_suffix(".ipynb")
+    content = jupytext.writes(jupytext.read(py_file), fmt="ipynb")
+
+    if (ipynb_file.exists()
+            and ipynb_file.stat().st_mtime >= py_file.stat().st_mtime
+            and ipynb_file.read_text(encoding="utf-8") == content):
+        return False
+
+    ipynb_file.write_text(content, encoding="utf-8")
+    return True
+
+
+def jupytext_sources(notebooks_dir: Path) -> List[Path]:
+    """Return the .py files in a directory that carry a jupytext header."""
+    py_files = []
     for py_file in sorted(notebooks_dir.glob("*.py")):
         try:
             header = py_file.read_text(errors="ignore")[:300]
         except OSError:
             continue
-        if "jupytext" not in header:
+        if "jupytext" in header:
+            py_files.append(py_file)
+    return py_files
+
+
+def convert_jupytext_notebooks(notebooks_dir: Path, max_workers: Optional[int] = None) -> int:
+    """Convert Jupytext .py notebooks to .ipynb format.
+
+    Conversion runs in-process through the jupytext API on a thread pool, so
+    jupytext is imported once rather than once per notebook. Files whose
+    .ipynb is newer than the source and already holds the same content are
+    left untouched. Falls back to the jupytext CLI if the module is missing.
+
+    Skips .py files that don't contain a jupytext header.
+    Returns the number of files successfully converted (including up-to-date ones).
+    """
+    py_files = jupytext_sources(notebooks_dir)
+    if not py_files:
+        return 0
+
+    try:
+        import jupytext  # noqa: F401
+    except ImportError:
+        log("jupytext module not importable, falling back to the jupytext CLI", LogLevel.WARNING)
+        converted = 0
+        for py_file in py_files:
+            returncode, _, stderr = run_command(
+                ["jupytext", "--to", "notebook", str(py_file)],
+                cwd=notebooks_dir,
+                capture_output=True,
+            )
+            if returncode == 0:
+                converted += 1
+            else:
+                log(f"Jupytext conversion failed for {py_file.name}: {stderr}", LogLevel.WARNING)
+        return converted
+
+    converted = 0
+    up_to_date = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_convert_jupytext_file, py_file): py_file for py_file in py_files}
+        for future in as_completed(futures):
+            py_file = futures[future]
+            try:
+                if future.result():
+                    converted += 1
+                else:
+                    up_to_date += 1
+            except Exception as e:
+                log(f"Jupytext conversion failed for {py_file.name}: {e}", LogLevel.WARNING)
+
+    if up_to_date:
+        log(f"{up_to_date} Jupytext notebooks already up to date")
+
+    return converted + up_to_date
+
+
+def notebook_source_digests(notebooks_dir: Path) -> Dict[str, str]:
+    """
+    Hash the source of every .ipynb notebook in a directory.
+    
+    Only cell types and sources are hashed, so an executed notebook hashes
+    the same as the unexecuted notebook it was run from: outputs, execution
+    counts and metadata are ignored.
+    
+    Args:
+        notebooks_dir: Directory holding .ipynb files
+        
+    Returns:
+        Notebook file name -> SHA-256 of its cell sources
+    """
+    digests = {}
+    for notebook in sorted(notebooks_dir.glob("*.ipynb")):
+        try:
+            with open(notebook, encoding="utf-8") as f:
+                cells = json.load(f).get("cells", [])
+        except (OSError, ValueError) as e:
+            log(f"Cannot read {notebook.name}: {e}", LogLevel.WARNING)
             continue
+        sources = [
+            [cell.get("cell_type"), "".join(cell.get("source", [])) if isinstance(cell.get("source"), list)
+             else cell.get("source", "")]
+            for cell in cells
+        ]
+        digests[notebook.name] = hashlib.sha256(
+            json.dumps(sources, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+    return digests
 
-        returncode, _, stderr = run_command(
-            ["jupytext", "--to", "notebook", str(py_file)],
-            cwd=notebooks_dir,
-            capture_output=True,
-        )
-        if returncode == 0:
-            converted += 1
-        else:
-            log(f"Jupytext conversion failed for {py_file.name}: {stderr}", LogLevel.WARNING)
 
-    return converted
+def compare_notebook_sources(candidate_dir: Path, reference_dir: Path) -> List[str]:
+    """
+    Find notebooks whose sources differ between two directories.
+    
+    Args:
+        candidate_dir: Notebooks to check (e.g. an extracted artifact)
+        reference_dir: Notebooks they must match (e.g. extracted from the git ref)
+        
+    Returns:
+        Names of reference notebooks that are missing from candidate_dir,
+        have different sources or cannot be read; empty if all match
+    """
+    candidate = notebook_source_digests(candidate_dir)
+    reference = notebook_source_digests(reference_dir)
+    # An unreadable reference notebook cannot vouch for the candidate
+    names = {notebook.name for notebook in reference_dir.glob("*.ipynb")}
+    return sorted(name for name in names if name not in reference or candidate.get(name) != reference[name])
 
 
 def run_sphinx_build(
@@ -270,7 +653,9 @@ def run_sphinx_build(
     build_dir: Path,
     sphinx_build_path: Path,
     env_vars: Optional[Dict[str, str]] = None,
-    log_file: Optional[Path] = None
+    log_file: Optional[Path] = None,
+    tee: bool = False,
+    config_dir: Optional[Path] = None
 ) -> bool:
     """
     Run Sphinx build command.
@@ -281,6 +666,8 @@ def run_sphinx_build(
         sphinx_build_path: Path to sphinx-build executable
         env_vars: Additional environment variables
         log_file: Optional path to save build log
+        tee: Also echo Sphinx output to the console while logging it
+        config_dir: Directory with conf.py, if not source_dir
         
     Returns:
         True if build succeeded
@@ -288,11 +675,14 @@ def run_sphinx_build(
     if not source_dir.exists():
         raise BuildError(f"Source directory not found: {source_dir}")
     
-    if not (source_dir / "conf.py").exists():
-        raise BuildError(f"No conf.py found in {source_dir}")
+    config_dir = config_dir or source_dir
+    if not (config_dir / "conf.py").exists():
+        raise BuildError(f"No conf.py found in {config_dir}")
     
     # Create build directory
     build_dir.mkdir(parents=True, exist_ok=True)
+    if log_file:
+        log_file.parent.mkdir(parents=True, exist_ok=True)
     
     log(f"Building Sphinx documentation...")
     log(f"  Source: {source_dir}")
@@ -304,15 +694,20 @@ def run_sphinx_build(
         str(source_dir),
         str(build_dir)
     ]
+    if config_dir != source_dir:
+        cmd[1:1] = ["-c", str(config_dir)]
     
     returncode, stdout, stderr = run_command(
         cmd,
         env=env_vars,
-        log_file=log_file
+        log_file=log_file,
+        tee=tee
     )
     
     if returncode != 0:
         log(f"Sphinx build failed with return code {returncode}", LogLevel.ERROR)
+        if log_file and not tee:
+            log(f"Last lines of {log_file}:\n{stdout}", LogLevel.ERROR)
         return False
     
     # Check if index.html was created
@@ -407,6 +802,227 @@ def get_python_paths() -> Tuple[Path, Path, Path]:
     return python_path, pip_path, sphinx_build_path
 
 
+# =============================================================================
+# Checkpoint Journal
+# =============================================================================
+
+class CheckpointJournal:
+    """
+    Record of completed build stages, used to resume a failed build.
+    
+    Each entry stores a hash of the stage's inputs; a stage can be skipped on
+    resume only if its recorded inputs match and its outputs still exist.
+    The journal is rewritten atomically after every change and is safe to
+    update from several threads.
+    """
+    
+    def __init__(self, path: Path):
+        """
+        Initialize journal.
+        
+        Args:
+            path: JSON file the journal is stored in (e.g. _build/checkpoints.json)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.data: Dict = {"stages": {}, "environments": {}}
+        
+        if path.exists():
+            try:
+                with open(path) as f:
+                    self.data = json.load(f)
+            except (OSError, ValueError) as e:
+                log(f"Ignoring unreadable checkpoint journal {path}: {e}", LogLevel.WARNING)
+    
+    def reset(self) -> None:
+        """Forget all recorded stages."""
+        with self._lock:
+            self.data = {"stages": {}, "environments": {}}
+            self._save()
+    
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+    
+    def is_complete(self, version: str, stage: str, inputs: str) -> bool:
+        """Check whether a stage completed with the same inputs."""
+        with self._lock:
+            entry = self.data["stages"].get(version, {}).get(stage)
+        return bool(entry) and entry.get("inputs") == inputs
+    
+    def record(self, version: str, stage: str, inputs: str) -> None:
+        """Record that a stage completed with the given inputs."""
+        with self._lock:
+            self.data["stages"].setdefault(version, {})[stage] = {
+                "inputs": inputs,
+                "completed": time.time(),
+            }
+            self._save()
+    
+    def installed_commit(self, python_path: Path) -> Optional[str]:
+        """Return the uclchem commit last installed into an environment."""
+        with self._lock:
+            return self.data["environments"].get(str(python_path))
+    
+    def record_install(self, python_path: Path, commit: str) -> None:
+        """Record the uclchem commit installed into an environment."""
+        with self._lock:
+            self.data["environments"][str(python_path)] = commit
+            self._save()
+    
+    def forget_install(self, python_path: Path) -> None:
+        """Forget the install recorded for an environment, so it is reinstalled."""
+        with self._lock:
+            if self.data["environments"].pop(str(python_path), None) is not None:
+                self._save()
+
+
+# =============================================================================
+# Per-version Virtual Environments
+# =============================================================================
+
+VENV_READY_MARKER = ".uclchem-docs-venv.json"
+
+_SPHINX_BUILD_LAUNCHER = """#!{python}
+import sys
+from sphinx.cmd.build import main
+sys.exit(main())
+"""
+
+
+def get_venv_paths(venv_dir: Path) -> Tuple[Path, Path, Path]:
+    """
+    Get paths to Python, pip, and sphinx-build inside a virtual environment.
+    
+    Args:
+        venv_dir: Virtual environment directory
+        
+    Returns:
+        Tuple of (python_path, pip_path, sphinx_build_path)
+    """
+    bin_dir = venv_dir / ('Scripts' if os.name == 'nt' else 'bin')
+    return bin_dir / 'python', bin_dir / 'pip', bin_dir / 'sphinx-build'
+
+
+def venv_cache_key(commit: str, requirements_file: Path, base_python: Path) -> str:
+    """
+    Compute the cache key for a per-version environment.
+    
+    The key covers the uclchem commit (whose pyproject.toml pins its own
+    dependencies), the docs requirements that make up the shared base
+    environment, and the base interpreter.
+    
+    Args:
+        commit: Resolved uclchem commit SHA
+        requirements_file: Docs requirements.txt
+        base_python: Interpreter the venv is seeded from
+        
+    Returns:
+        Short hex key
+    """
+    digest = hashlib.sha256()
+    digest.update(commit.encode())
+    if requirements_file.exists():
+        digest.update(requirements_file.read_bytes())
+    digest.update(str(base_python.resolve()).encode())
+    return digest.hexdigest()[:16]
+
+
+def ensure_version_venv(venv_dir: Path, base_python: Path) -> bool:
+    """
+    Create a virtual environment layered on the base environment.
+    
+    The venv uses --system-site-packages, so the Sphinx stack installed in
+    the base environment from requirements.txt is visible without copying,
+    while uclchem and anything it pins are installed into the venv only.
+    
+    Args:
+        venv_dir: Virtual environment directory
+        base_python: Interpreter of the base environment
+        
+    Returns:
+        True if a cached venv with uclchem already installed was reused
+    """
+    if (venv_dir / VENV_READY_MARKER).exists():
+        # Touch the marker so cache eviction treats this venv as recently used
+        (venv_dir / VENV_READY_MARKER).touch()
+        return True
+    
+    if venv_dir.exists():
+        shutil.rmtree(venv_dir)
+    
+    log(f"Creating virtual environment {venv_dir.name}...")
+    returncode, _, stderr = run_command(
+        [str(base_python), "-m", "venv", "--system-site-packages", str(venv_dir)],
+        capture_output=True
+    )
+    if returncode != 0:
+        raise BuildError(f"Failed to create virtual environment: {stderr}")
+    
+    python_path, _, sphinx_build_path = get_venv_paths(venv_dir)
+    sphinx_build_path.write_text(_SPHINX_BUILD_LAUNCHER.format(python=python_path))
+    sphinx_build_path.chmod(0o755)
+    return False
+
+
+def mark_venv_ready(venv_dir: Path, commit: str) -> None:
+    """Record that uclchem at `commit` was installed successfully into a venv."""
+    with open(venv_dir / VENV_READY_MARKER, 'w') as f:
+        json.dump({'commit': commit, 'created': time.time()}, f)
+
+
+def clear_venv_ready(venv_dir: Path) -> None:
+    """Drop a venv's ready marker, so the next build recreates it."""
+    (venv_dir / VENV_READY_MARKER).unlink(missing_ok=True)
+
+
+def _dir_size(path: Path) -> int:
+    """Return the total size of regular files under path."""
+    return sum(p.stat().st_size for p in path.rglob('*') if p.is_file() and not p.is_symlink())
+
+
+def evict_venv_cache(cache_dir: Path, max_bytes: int, keep: Optional[List[str]] = None) -> int:
+    """
+    Remove least recently used venvs until the cache fits in max_bytes.
+    
+    Args:
+        cache_dir: Directory holding one venv per cache key
+        max_bytes: Size budget for the whole cache
+        keep: Cache keys that must not be evicted (in use by this run)
+        
+    Returns:
+        Number of venvs removed
+    """
+    if not cache_dir.exists():
+        return 0
+    
+    keep = set(keep or [])
+    entries = []
+    for venv_dir in cache_dir.iterdir():
+        if not venv_dir.is_dir():
+            continue
+        marker = venv_dir / VENV_READY_MARKER
+        last_used = marker.stat().st_mtime if marker.exists() else 0.0
+        entries.append((last_used, venv_dir, _dir_size(venv_dir)))
+    
+    total = sum(size for _, _, size in entries)
+    removed = 0
+    for _, venv_dir, size in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        if venv_dir.name in keep:
+            continue
+        log(f"Evicting cached environment {venv_dir.name} ({size / 1024 / 1024:.0f} MB)")
+        shutil.rmtree(venv_dir, ignore_errors=True)
+        total -= size
+        removed += 1
+    
+    return removed
+
+
 def validate_prerequisites(uclchem_repo: Path, docs_repo: Path) -> None:
     """
     Validate that all prerequisites are met before building.
@@ -423,7 +1039,7 @@ def validate_prerequisites(uclchem_repo: Path, docs_repo: Path) -> None:
     # Check UCLCHEM repo
     if not uclchem_repo.exists():
         errors.append(f"UCLCHEM repository not found: {uclchem_repo}")
-    elif not (uclchem_repo / ".git").exists():
+    elif not (uclchem_repo / ".git").exists() and not (uclchem_repo / "HEAD").exists():
         errors.append(f"Not a git repository: {uclchem_repo}")
     
     # Check docs repo
@@ -492,12 +1108,124 @@ def _parse_artifact_name(artifact_name: str) -> Dict[str, str]:
         return {'version': 'unknown', 'commit': 'unknown', 'date': 'unknown'}
 
 
-def check_release_artifacts(git_ref: str, github_token: Optional[str] = None) -> Optional[Dict]:
+class ArtifactRecord:
+    """A notebook artifact (Actions artifact or release asset) with its name parsed once."""
+    
+    __slots__ = ("name", "version", "commit", "date", "artifact")
+    
+    def __init__(self, artifact: Dict):
+        """
+        Initialize record.
+        
+        Args:
+            artifact: Artifact dict from the GitHub API; gains 'parsed_info'
+        """
+        self.artifact = artifact
+        self.name = artifact.get('name', '')
+        parsed = _parse_artifact_name(self.name)
+        artifact['parsed_info'] = parsed
+        self.version: Optional[str] = None if parsed['version'] == 'unknown' else parsed['version']
+        self.commit: Optional[str] = None if parsed['commit'] == 'unknown' else parsed['commit'].lower()
+        self.date: Optional[datetime.date] = None
+        if parsed['date'] != 'unknown':
+            date = parsed['date']
+            try:
+                self.date = datetime.date(int(date[:4]), int(date[4:6]), int(date[6:]))
+            except ValueError:
+                pass
+    
+    def sort_key(self) -> Tuple:
+        """Order by date (undated first), then name, so ties break deterministically."""
+        return (self.date or datetime.date.min, self.name)
+
+
+class ArtifactCatalog:
+    """
+    Notebook artifacts indexed by version and commit.
+    
+    Names are parsed once when the catalog is built. Each index keeps its
+    records sorted oldest to newest, so the newest artifact of a version or
+    commit is a dictionary lookup away.
+    """
+    
+    def __init__(self, artifacts: List[Dict]):
+        """
+        Initialize catalog.
+        
+        Args:
+            artifacts: Artifact dicts from the GitHub API
+        """
+        self.records = sorted((ArtifactRecord(a) for a in artifacts), key=ArtifactRecord.sort_key)
+        self.by_version: Dict[str, List[ArtifactRecord]] = {}
+        self.by_commit: Dict[str, List[ArtifactRecord]] = {}
+        for record in self.records:
+            if record.version:
+                self.by_version.setdefault(record.version, []).append(record)
+            if record.commit:
+                self.by_commit.setdefault(record.commit, []).append(record)
+        # Names embed abbreviated SHAs; these are the abbreviation lengths in use
+        self._commit_lengths = sorted({len(c) for c in self.by_commit})
+    
+    def for_commit(self, commit: str) -> List[ArtifactRecord]:
+        """Artifacts built from a commit (full or abbreviated SHA), oldest first."""
+        commit = commit.lower()
+        matches = []
+        for length in self._commit_lengths:
+            if length <= len(commit):
+                matches.extend(self.by_commit.get(commit[:length], []))
+        return sorted(matches, key=ArtifactRecord.sort_key)
+    
+    def newest(self, version: str) -> Optional[ArtifactRecord]:
+        """Newest artifact of a version, if any."""
+        records = self.by_version.get(version)
+        return records[-1] if records else None
+    
+    def select(self, version: str, commit: Optional[str] = None) -> Tuple[Optional[ArtifactRecord], Optional[str]]:
+        """
+        Pick the artifact for a version.
+        
+        An artifact built from the exact commit wins (preferring one named
+        after the version). Otherwise the newest artifact of the version is
+        used, and failing that the newest whose version contains, or is
+        contained in, the requested one.
+        
+        Args:
+            version: Version or git ref the notebooks are for
+            commit: Commit SHA the version resolves to, if known
+            
+        Returns:
+            (record, match) with match 'commit', 'version' or 'partial', or (None, None)
+        """
+        if commit:
+            matches = self.for_commit(commit)
+            if matches:
+                named = [r for r in matches if r.version == version]
+                return (named or matches)[-1], 'commit'
+        
+        record = self.newest(version)
+        if record:
+            return record, 'version'
+        
+        partial = [
+            records[-1] for name, records in self.by_version.items()
+            if version in name or name in version
+        ]
+        if partial:
+            return max(partial, key=ArtifactRecord.sort_key), 'partial'
+        return None, None
+
+
+def check_release_artifacts(
+    git_ref: str,
+    github_token: Optional[str] = None,
+    commit: Optional[str] = None
+) -> Optional[Dict]:
     """Check for pre-executed notebooks in GitHub releases.
     
     Args:
         git_ref: Git reference to look for
         github_token: Optional GitHub token for private repos
+        commit: Commit SHA git_ref resolves to, preferred when ranking assets
         
     Returns:
         Dict with artifact info or None if not found
@@ -510,7 +1238,7 @@ def check_release_artifacts(git_ref: str, github_token: Optional[str] = None) ->
     
     try:
         # Check for release matching the git_ref
-        url = f"https://api.github.com/repos/uclchem/UCLCHEM/releases/tags/{git_ref}"
+        url = f"{GITHUB_API}/releases/tags/{git_ref}"
         response = requests.get(url, headers=headers, timeout=30)
         
         if response.status_code == 200:
@@ -518,21 +1246,26 @@ def check_release_artifacts(git_ref: str, github_token: Optional[str] = None) ->
             assets = release.get('assets', [])
             
             # Look for notebook artifacts in release assets
-            notebook_assets = []
-            for asset in assets:
-                name = asset.get('name', '')
-                if ('executed_notebooks' in name.lower() or 
-                    'executed-notebooks' in name.lower() or
-                    'notebook' in name.lower()):
-                    
-                    # Parse asset name if it has version info
-                    version_info = _parse_artifact_name(name)
-                    asset['parsed_info'] = version_info
-                    asset['score'] = 100  # Release assets get high priority
-                    asset['source'] = 'release'
-                    notebook_assets.append(asset)
+            notebook_assets = [
+                asset for asset in assets
+                if 'notebook' in asset.get('name', '').lower()
+            ]
             
             if notebook_assets:
+                # Best asset first: built from the commit, else the newest
+                catalog = ArtifactCatalog(notebook_assets)
+                best, match = catalog.select(git_ref, commit)
+                ordered = [r.artifact for r in reversed(catalog.records)]
+                if best:
+                    ordered.remove(best.artifact)
+                    ordered.insert(0, best.artifact)
+                for asset in ordered:
+                    asset['source'] = 'release'
+                    asset['match'] = 'release'
+                if best:
+                    best.artifact['match'] = match
+                notebook_assets = ordered
+
                 log(f"Found {len(notebook_assets)} release artifacts", LogLevel.SUCCESS)
                 return {
                     'release_tag': git_ref,
@@ -542,46 +1275,45 @@ def check_release_artifacts(git_ref: str, github_token: Optional[str] = None) ->
                 }
         
         # If no exact match, check all releases for partial matches
-        url = "https://api.github.com/repos/uclchem/UCLCHEM/releases"
+        url = f"{GITHUB_API}/releases"
         response = requests.get(url, headers=headers, params={'per_page': 20}, timeout=30)
         response.raise_for_status()
         
+        # Index the notebook assets of all recent releases at once
         releases = response.json()
+        asset_releases = {}
         for release in releases:
-            # Check if this release might contain artifacts for our git_ref
-            tag_name = release.get('tag_name', '')
-            assets = release.get('assets', [])
-            
-            for asset in assets:
-                name = asset.get('name', '')
-                if ('executed_notebooks' in name.lower() or 
-                    'executed-notebooks' in name.lower()):
-                    
-                    # Parse asset name to see if it matches our git_ref
-                    version_info = _parse_artifact_name(name)
-                    parsed_version = version_info.get('version', '')
-                    
-                    # Score based on match quality
-                    score = 0
-                    if parsed_version == git_ref:
-                        score = 100  # Exact match
-                    elif git_ref in parsed_version or parsed_version in git_ref:
-                        score = 75   # Partial match
-                    elif 'main' in parsed_version and git_ref.startswith('v'):
-                        score = 50   # Main branch for version tag
-                    
-                    if score > 0:
-                        asset['parsed_info'] = version_info
-                        asset['score'] = score
-                        asset['source'] = 'release'
-                        
-                        log(f"Found matching release asset: {name} (score: {score})", LogLevel.SUCCESS)
-                        return {
-                            'release_tag': tag_name,
-                            'artifacts': [asset],
-                            'created_at': release['published_at'],
-                            'source': 'release'
-                        }
+            for asset in release.get('assets', []):
+                name = asset.get('name', '').lower()
+                if 'executed_notebooks' in name or 'executed-notebooks' in name:
+                    asset_releases[id(asset)] = release
+        catalog = ArtifactCatalog([
+            asset for release in releases for asset in release.get('assets', [])
+            if id(asset) in asset_releases
+        ])
+        
+        best, match = catalog.select(git_ref, commit)
+        if best is None and git_ref.startswith('v'):
+            # Main branch notebooks for a version tag
+            best = max(
+                (r for r in catalog.records if r.version and 'main' in r.version),
+                key=ArtifactRecord.sort_key,
+                default=None
+            )
+            match = 'main'
+        
+        if best:
+            asset = best.artifact
+            release = asset_releases[id(asset)]
+            asset['source'] = 'release'
+            asset['match'] = match
+            log(f"Found matching release asset: {best.name} ({match} match)", LogLevel.SUCCESS)
+            return {
+                'release_tag': release.get('tag_name', ''),
+                'artifacts': [asset],
+                'created_at': release['published_at'],
+                'source': 'release'
+            }
         
         log(f"No release artifacts found for {git_ref}", LogLevel.INFO)
         return None
@@ -591,20 +1323,30 @@ def check_release_artifacts(git_ref: str, github_token: Optional[str] = None) ->
         return None
 
 
-def check_notebook_artifacts(git_ref: str, github_token: Optional[str] = None) -> Optional[Dict]:
+def check_notebook_artifacts(
+    git_ref: str,
+    github_token: Optional[str] = None,
+    commit: Optional[str] = None
+) -> Optional[Dict]:
     """Check for pre-executed notebooks from both GitHub releases and Actions.
     
+    Candidates are ranked through an ArtifactCatalog: an artifact built from
+    the exact commit first, then the newest artifact of the version by the
+    date in its name.
+    
     Args:
         git_ref: Git reference (branch, tag, commit)
         github_token: GitHub API token (optional, for higher rate limits)
+        commit: Commit SHA git_ref resolves to, if known
         
     Returns:
-        Dict with artifact info if found, None otherwise
+        Dict with artifact info if found, None otherwise. The selected
+        artifact is first in 'artifacts' and carries its 'match' kind.
     """
     log(f"Checking for notebook artifacts for {git_ref}...")
     
     # First try GitHub releases (often more reliable for tags)
-    release_artifacts = check_release_artifacts(git_ref, github_token)
+    release_artifacts = check_release_artifacts(git_ref, github_token, commit)
     if release_artifacts:
         return release_artifacts
     
@@ -615,7 +1357,7 @@ def check_notebook_artifacts(git_ref: str, github_token: Optional[str] = None) -
     
     try:
         # Get recent workflow runs for the git ref
-        url = f"https://api.github.com/repos/uclchem/UCLCHEM/actions/runs"
+        url = f"{GITHUB_API}/actions/runs"
         params = {
             'branch': git_ref,
             'status': 'completed',
@@ -633,49 +1375,32 @@ def check_notebook_artifacts(git_ref: str, github_token: Optional[str] = None) -
                 'notebook' in run.get('name', '').lower()):
                 
                 # Check for artifacts
-                artifacts_url = f"https://api.github.com/repos/uclchem/UCLCHEM/actions/runs/{run['id']}/artifacts"
+                artifacts_url = f"{GITHUB_API}/actions/runs/{run['id']}/artifacts"
                 artifacts_response = requests.get(artifacts_url, headers=headers, timeout=30)
                 artifacts_response.raise_for_status()
                 
                 artifacts = artifacts_response.json().get('artifacts', [])
                 # Look for executed_notebooks-* artifacts specifically
-                notebook_artifacts = []
-                for a in artifacts:
-                    name = a.get('name', '').lower()
-                    if (name.startswith('executed_notebooks') or 
-                        'executed-notebooks' in name or
-                        'notebook' in name):
-                        # Parse artifact name to extract version info
-                        artifact_name = a.get('name', '')
-                        version_info = _parse_artifact_name(artifact_name)
-                        a['parsed_info'] = version_info
-                        notebook_artifacts.append(a)
+                catalog = ArtifactCatalog([
+                    a for a in artifacts
+                    if 'notebook' in a.get('name', '').lower()
+                ])
+                best, match = catalog.select(git_ref, commit)
                 
-                if notebook_artifacts:
-                    # Sort by relevance: prefer artifacts matching git_ref, then by name
-                    def artifact_score(a):
-                        parsed = a.get('parsed_info', {})
-                        version = parsed.get('version', '')
-                        
-                        # Higher score = better match
-                        score = 0
-                        if version == git_ref:
-                            score += 100  # Exact match
-                        elif git_ref in version or version in git_ref:
-                            score += 50   # Partial match
-                        
-                        # Prefer more recent (reverse alphabetical by name as proxy)
-                        score += ord('z') - ord(a.get('name', 'z')[0].lower())
-                        
-                        # Store score in the artifact for debugging
-                        a['score'] = score
-                        return score
-                    
-                    notebook_artifacts.sort(key=artifact_score, reverse=True)
-                    best_artifact = notebook_artifacts[0]
-                    parsed = best_artifact['parsed_info']
+                if catalog.records:
+                    # Selected artifact first, the rest newest first
+                    notebook_artifacts = [r.artifact for r in reversed(catalog.records)]
+                    if best:
+                        notebook_artifacts.remove(best.artifact)
+                        notebook_artifacts.insert(0, best.artifact)
+                        best.artifact['match'] = match
+                    else:
+                        notebook_artifacts[0]['match'] = 'newest'
+                    selected = notebook_artifacts[0]
+                    parsed = selected['parsed_info']
                     
-                    log(f"Selected artifact: {best_artifact['name']} (version: {parsed['version']}, commit: {parsed['commit']})", LogLevel.SUCCESS)
+                    log(f"Selected artifact: {selected['name']} (version: {parsed['version']}, commit: {parsed['commit']}, "
+                        f"{selected['match']} match)", LogLevel.SUCCESS)
                     return {
                         'run_id': run['id'],
                         'artifacts': notebook_artifacts,
@@ -792,7 +1517,7 @@ def trigger_notebook_action(git_ref: str, github_token: str, wait_for_completion
     
     try:
         # Trigger workflow dispatch
-        url = "https://api.github.com/repos/uclchem/UCLCHEM/actions/workflows/notebooks.yml/dispatches"
+        url = f"{GITHUB_API}/actions/workflows/notebooks.yml/dispatches"
         data = {
             'ref': git_ref,
             'inputs': {
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Link checker for the built multi-version site.
+Validates internal links (including cross-version ones) offline against the
+built trees, and checks external URLs once per site with per-host
+concurrency limits and a result cache.
+
+Usage:
+    python scripts/check_links.py _build/html
+    python scripts/check_links.py _build/html --offline
+    UCLCHEM_LINKCHECK_STAND_IN=http://127.0.0.1:8001 python scripts/check_links.py _build/html
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import unquote, urlsplit
+
+import requests
+
+from build_utils import LogLevel, log
+
+# Send every external check to this server instead, as <stand-in>/<host><path>,
+# so the checker can be exercised against a local HTTP stand-in
+LINKCHECK_STAND_IN = os.environ.get('UCLCHEM_LINKCHECK_STAND_IN')
+
+LINKCHECK_CACHE = "linkcheck_cache.json"
+USER_AGENT = "Mozilla/5.0 (compatible; uclchem-docs-linkcheck)"
+
+# Links that are never checked
+_SKIPPED_SCHEMES = ("mailto:", "javascript:", "data:", "tel:")
+# Servers that reject HEAD with one of these get a GET instead
+_HEAD_UNSUPPORTED = {403, 405, 501}
+# Pages referencing a broken URL listed in the report
+_MAX_REPORTED_PAGES = 5
+
+
+class _LinkParser(HTMLParser):
+    """Collect link targets and anchor ids from one HTML page."""
+
+    _LINK_ATTRS = {"a": "href", "link": "href", "img": "src", "script": "src", "iframe": "src"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: List[str] = []
+        self.ids: Set[str] = set()
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if attrs.get("id"):
+            self.ids.add(attrs["id"])
+        if tag == "a" and attrs.get("name"):
+            self.ids.add(attrs["name"])
+
+        target = attrs.get(self._LINK_ATTRS.get(tag, ""))
+        if target and not target.startswith(_SKIPPED_SCHEMES):
+            self.links.append(target.strip())
+
+
+def _scan_page(path: str) -> Tuple[str, List[str], Set[str]]:
+    """Parse one page; runs in a worker process."""
+    parser = _LinkParser()
+    with open(path, encoding="utf-8", errors="replace") as f:
+        parser.feed(f.read())
+    return path, parser.links, parser.ids
+
+
+def scan_site(root: Path, max_workers: Optional[int] = None) -> Tuple[Dict[str, List[str]], Dict[str, Set[str]]]:
+    """
+    Parse every HTML page under the build output.
+
+    Args:
+        root: Build output directory (e.g. _build/html)
+        max_workers: Worker processes used for parsing
+
+    Returns:
+        Tuple of (links per page, anchor ids per page), keyed by page path
+    """
+    pages = [str(path) for path in root.rglob("*.html") if path.is_file()]
+    links, ids = {}, {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for path, page_links, page_ids in executor.map(_scan_page, pages, chunksize=64):
+            links[path] = page_links
+            ids[path] = page_ids
+    return links, ids
+
+
+def _resolve_internal(root: Path, page: str, href: str, site_url: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    Map a link to the file it points at in the build output.
+
+    Returns:
+        Tuple of (target file path, fragment), or None for external links
+    """
+    if site_url and href.startswith(site_url):
+        href = "/" + href[len(site_url):].lstrip("/")
+
+    parts = urlsplit(href)
+    if parts.scheme or parts.netloc:
+        return None
+
+    path = unquote(parts.path)
+    if not path:
+        target = page
+    elif path.startswith("/"):
+        target = os.path.join(str(root), path.lstrip("/"))
+    else:
+        target = os.path.join(os.path.dirname(page), path)
+
+    target = os.path.normpath(target)
+    if path.endswith("/") or os.path.isdir(target):
+        target = os.path.join(target, "index.html")
+    return target, parts.fragment
+
+
+def check_internal_links(
+    root: Path,
+    links: Dict[str, List[str]],
+    ids: Dict[str, Set[str]],
+    site_url: Optional[str] = None
+) -> Tuple[List[Dict], List[Dict], Dict[str, Set[str]]]:
+    """
+    Validate links within the site offline against the built trees.
+
+    Relative links, root-relative links (e.g. /v3.5.5/... from another
+    version) and absolute links under site_url must point at an existing
+    file. Fragments pointing at HTML pages must match an element id there.
+
+    Args:
+        root: Build output directory
+        links: Links per page from scan_site
+        ids: Anchor ids per page from scan_site
+        site_url: Public URL of the site root, e.g. https://uclchem.github.io/
+
+    Returns:
+        Tuple of (broken links, missing anchors, external URL -> referencing pages)
+    """
+    root_str = os.path.normpath(str(root))
+    broken, missing_anchors = [], []
+    external: Dict[str, Set[str]] = defaultdict(set)
+    exists_cache: Dict[str, bool] = {}
+
+    for page, page_links in links.items():
+        rel_page = os.path.relpath(page, root_str)
+        for href in page_links:
+            resolved = _resolve_internal(root, page, href, site_url)
+            if resolved is None:
+                if href.startswith(("http://", "https://")):
+                    external[href.split("#", 1)[0]].add(rel_page)
+                continue
+
+            target, fragment = resolved
+            if target not in exists_cache:
+                exists_cache[target] = (
+                    target.startswith(root_str + os.sep) and os.path.isfile(target)
+                )
+            if not exists_cache[target]:
+                broken.append({"page": rel_page, "href": href})
+            elif fragment and target in ids and fragment not in ids[target]:
+                missing_anchors.append({"page": rel_page, "href": href})
+
+    return broken, missing_anchors, external
+
+
+class LinkCache:
+    """External link results persisted between runs."""
+
+    def __init__(self, path: Path, ttl_hours: float):
+        """
+        Initialize cache.
+
+        Args:
+            path: JSON file the results are stored in
+            ttl_hours: How long a successful result is trusted; failures are
+                always rechecked
+        """
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.entries: Dict[str, Dict] = {}
+        if path.exists():
+            try:
+                with open(path) as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                log(f"Ignoring unreadable link cache {path}", LogLevel.WARNING)
+
+    def fresh(self, url: str) -> bool:
+        """Check whether a URL has a successful result within the TTL."""
+        entry = self.entries.get(url)
+        return bool(entry) and entry["status"] == "ok" and time.time() - entry["checked"] < self.ttl
+
+    def save(self) -> None:
+        """Write the cache, dropping expired entries."""
+        now = time.time()
+        entries = {url: e for url, e in self.entries.items() if now - e["checked"] < self.ttl}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+_thread_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """Return a per-thread session so connections are reused per worker."""
+    if not hasattr(_thread_local, "session"):
+        _thread_local.session = requests.Session()
+        _thread_local.session.headers["User-Agent"] = USER_AGENT
+    return _thread_local.session
+
+
+def check_url(url: str, timeout: float = 15, stand_in: Optional[str] = None) -> Dict:
+    """
+    Check one external URL with HEAD, falling back to GET.
+
+    Args:
+        url: URL to check
+        timeout: Request timeout in seconds
+        stand_in: Base URL of a local stand-in server to send the request to
+
+    Returns:
+        Dict with status ('ok', 'broken', 'rate_limited' or 'error'), HTTP
+        code, error message and check time
+    """
+    request_url = url
+    if stand_in:
+        parts = urlsplit(url)
+        request_url = f"{stand_in.rstrip('/')}/{parts.netloc}{parts.path or '/'}"
+        if parts.query:
+            request_url += f"?{parts.query}"
+
+    result = {"status": "error", "code": None, "error": None, "checked": time.time()}
+    session = _session()
+    try:
+        response = session.head(request_url, allow_redirects=True, timeout=timeout)
+        if response.status_code in _HEAD_UNSUPPORTED:
+            response = session.get(request_url, allow_redirects=True, timeout=timeout, stream=True)
+            response.close()
+        result["code"] = response.status_code
+        if response.status_code == 429:
+            result["status"] = "rate_limited"
+        elif response.status_code < 400:
+            result["status"] = "ok"
+        else:
+            result["status"] = "broken"
+    except requests.RequestException as e:
+        result["error"] = str(e)
+    return result
+
+
+def _interleave_by_host(urls: List[str]) -> List[str]:
+    """Order URLs round-robin across hosts so workers don't queue on one host."""
+    by_host: Dict[str, List[str]] = defaultdict(list)
+    for url in sorted(urls):
+        by_host[urlsplit(url).netloc].append(url)
+    queues = list(by_host.values())
+    ordered = []
+    for i in range(max((len(q) for q in queues), default=0)):
+        ordered.extend(q[i] for q in queues if i < len(q))
+    return ordered
+
+
+def check_external_links(
+    urls: List[str],
+    cache: LinkCache,
+    max_workers: int = 16,
+    per_host: int = 2,
+    timeout: float = 15,
+    stand_in: Optional[str] = None
+) -> Dict[str, Dict]:
+    """
+    Check external URLs concurrently, reusing cached successes.
+
+    Args:
+        urls: Unique URLs to check
+        cache: Result cache; updated in place
+        max_workers: Total concurrent requests
+        per_host: Concurrent requests per host
+        timeout: Request timeout in seconds
+        stand_in: Base URL of a local stand-in server
+
+    Returns:
+        Dict mapping each URL to its result
+    """
+    results = {url: cache.entries[url] for url in urls if cache.fresh(url)}
+    pending = _interleave_by_host([url for url in urls if url not in results])
+    host_limits = {urlsplit(url).netloc: threading.BoundedSemaphore(per_host) for url in pending}
+
+    def check(url: str) -> Tuple[str, Dict]:
+        with host_limits[urlsplit(url).netloc]:
+            return url, check_url(url, timeout=timeout, stand_in=stand_in)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for url, result in executor.map(check, pending):
+            results[url] = result
+            if result["status"] == "ok":
+                cache.entries[url] = result
+            else:
+                cache.entries.pop(url, None)
+
+    return results
+
+
+def check_site_links(
+    root: Path,
+    cache_path: Path,
+    site_url: Optional[str] = None,
+    ignore: Tuple[str, ...] = (),
+    offline: bool = False,
+    max_workers: int = 16,
+    per_host: int = 2,
+    ttl_hours: float = 168,
+    timeout: float = 15,
+    stand_in: Optional[str] = LINKCHECK_STAND_IN
+) -> Dict:
+    """
+    Check internal and external links of the whole multi-version site.
+
+    External URLs repeated across versions and pages are checked once.
+
+    Args:
+        root: Build output directory (e.g. _build/html)
+        cache_path: JSON file caching successful external checks
+        site_url: Public URL of the site root; links under it are checked offline
+        ignore: Regular expressions of external URLs not to check
+        offline: Only validate internal links
+        max_workers: Total concurrent external requests
+        per_host: Concurrent external requests per host
+        ttl_hours: How long successful external results are cached
+        timeout: Request timeout in seconds
+        stand_in: Base URL of a local stand-in server for external checks
+
+    Returns:
+        Report dict with internal and external results
+    """
+    links, ids = scan_site(root)
+    broken, missing_anchors, external = check_internal_links(root, links, ids, site_url)
+    report = {
+        "pages": len(links),
+        "internal": {"broken": broken, "missing_anchors": missing_anchors},
+        "external": {"urls": len(external), "checked": 0, "cached": 0, "broken": [], "rate_limited": []},
+    }
+    if offline:
+        return report
+
+    patterns = [re.compile(pattern) for pattern in ignore]
+    urls = [url for url in external if not any(p.search(url) for p in patterns)]
+
+    cache = LinkCache(cache_path, ttl_hours)
+    cached = sum(1 for url in urls if cache.fresh(url))
+    results = check_external_links(urls, cache, max_workers, per_host, timeout, stand_in)
+    cache.save()
+
+    report["external"]["checked"] = len(urls) - cached
+    report["external"]["cached"] = cached
+    for url, result in sorted(results.items()):
+        if result["status"] in ("broken", "error", "rate_limited"):
+            key = "rate_limited" if result["status"] == "rate_limited" else "broken"
+            report["external"][key].append({
+                "url": url,
+                "code": result["code"],
+                "error": result["error"],
+                "pages": sorted(external[url])[:_MAX_REPORTED_PAGES],
+            })
+    return report
+
+
+def log_report(report: Dict) -> None:
+    """Log a summary of a link check report."""
+    internal, external = report["internal"], report["external"]
+    log(f"Checked {report['pages']} pages: {len(internal['broken'])} broken internal links, "
+        f"{len(internal['missing_anchors'])} missing anchors")
+    log(f"External: {external['urls']} unique URLs, {external['checked']} checked, "
+        f"{external['cached']} cached, {len(external['broken'])} broken, "
+        f"{len(external['rate_limited'])} rate limited")
+
+    for entry in internal["broken"][:20]:
+        log(f"  {entry['page']}: {entry['href']}", LogLevel.WARNING)
+    for entry in external["broken"][:20]:
+        reason = entry["code"] or entry["error"]
+        log(f"  {entry['url']} ({reason}) in {', '.join(entry['pages'])}", LogLevel.WARNING)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Check links of the built multi-version site")
+    parser.add_argument("root", type=Path, help="Build output directory (e.g. _build/html)")
+    parser.add_argument("--cache", type=Path, help=f"Result cache (default: <root>/../{LINKCHECK_CACHE})")
+    parser.add_argument("--report", type=Path, help="Write the JSON report to this file")
+    parser.add_argument("--site-url", help="Public site URL; links under it are checked offline")
+    parser.add_argument("--ignore", nargs="*", default=[], help="Regular expressions of URLs to skip")
+    parser.add_argument("--offline", action="store_true", help="Only validate internal links")
+    parser.add_argument("--workers", type=int, default=16, help="Concurrent external requests")
+    parser.add_argument("--per-host", type=int, default=2, help="Concurrent requests per host")
+    parser.add_argument("--ttl-hours", type=float, default=168, help="Cache lifetime of successful checks")
+    parser.add_argument("--timeout", type=float, default=15, help="Request timeout in seconds")
+    parser.add_argument("--stand-in", default=LINKCHECK_STAND_IN,
+                        help="Send external checks to this local server as <stand-in>/<host><path>")
+
+    args = parser.parse_args()
+    root = args.root.resolve()
+
+    report = check_site_links(
+        root,
+        args.cache or root.parent / LINKCHECK_CACHE,
+        site_url=args.site_url,
+        ignore=tuple(args.ignore),
+        offline=args.offline,
+        max_workers=args.workers,
+        per_host=args.per_host,
+        ttl_hours=args.ttl_hours,
+        timeout=args.timeout,
+        stand_in=args.stand_in
+    )
+    log_report(report)
+
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+    sys.exit(1 if report["internal"]["broken"] or report["external"]["broken"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,119 @@
 #!/usr/bin/env python3
 """Collect recent UCLCHEM tags and print a JSON matrix for Actions.
 
-Usage: python scripts/collect_uclchem_versions.py [--count N]
+Tags are listed with `git ls-remote --tags`, so nothing is cloned. Pass
+--mirror to list them from a local clone or mirror instead (works offline).
+The ref list is cached for --cache-ttl minutes, and a stale cache is used
+when the remote cannot be reached.
+
+Usage: python scripts/collect_uclchem_versions.py [--count N] [--mirror PATH]
 Outputs JSON array suitable for `matrix` input, e.g.: [{"ref":"develop","name":"latest"},{"ref":"v4.1.3","name":"4.1.3"},...]
 """
 import argparse
 import json
 import os
-import shutil
 import subprocess
 import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from versions_manifest import version_sort_key
+
+UCLCHEM_REMOTE = "https://github.com/uclchem/UCLCHEM.git"
+TAG_CACHE = Path(os.path.expanduser("~/.cache/uclchem-docs/uclchem-tags.json"))
+
+
+def list_remote_tags(source: str, timeout: float = 30) -> List[str]:
+    """
+    List the tag names of a repository without cloning it.
+
+    Args:
+        source: Remote URL or path of a local clone/mirror
+        timeout: Seconds to wait for git
+
+    Returns:
+        Tag names
+
+    Raises:
+        subprocess.CalledProcessError or subprocess.TimeoutExpired if git fails
+    """
+    output = subprocess.check_output(
+        ["git", "ls-remote", "--tags", "--refs", source],
+        stderr=subprocess.DEVNULL,
+        timeout=timeout,
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+    ).decode()
+    tags = set()
+    for line in output.splitlines():
+        _, _, ref = line.partition("\t")
+        if ref.startswith("refs/tags/"):
+            tags.add(ref[len("refs/tags/"):])
+    return sorted(tags)
+
+
+def cached_tags(source: str, cache_path: Path, ttl_minutes: float) -> Optional[List[str]]:
+    """Return the cached tag list of source, or None if missing or too old."""
+    try:
+        with open(cache_path) as f:
+            entry = json.load(f).get(source)
+    except (OSError, ValueError):
+        return None
+    if entry and time.time() - entry["fetched"] < ttl_minutes * 60:
+        return entry["tags"]
+    return None
+
+
+def store_tags(source: str, tags: List[str], cache_path: Path) -> None:
+    """Save the tag list of source in the cache."""
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    cache[source] = {"fetched": time.time(), "tags": tags}
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, cache_path)
+
+
+def release_tags(tags: List[str], prefix: str = "v") -> List[str]:
+    """Release tags starting with prefix, newest first by version key."""
+    releases = [t for t in tags if t.startswith(prefix) and version_sort_key(t)[0] == 0]
+    return sorted(releases, key=version_sort_key, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=5, help="How many recent tags to include")
+    parser.add_argument("--latest-branch", type=str, default="main", help="Branch to use for the 'latest' snapshot (default: main)")
+    parser.add_argument("--remote", type=str, default=UCLCHEM_REMOTE, help="Repository to list tags from")
+    parser.add_argument("--mirror", type=Path, help="Local clone or mirror to list tags from instead of the remote")
+    parser.add_argument("--cache", type=Path, default=TAG_CACHE, help="Tag list cache file")
+    parser.add_argument("--cache-ttl", type=float, default=60, help="Minutes a cached tag list is used (0 to refresh)")
+    args = parser.parse_args()
+
+    source = str(args.mirror.resolve()) if args.mirror else args.remote
+    tags = cached_tags(source, args.cache, args.cache_ttl)
+    if tags is None:
+        try:
+            tags = list_remote_tags(source)
+            store_tags(source, tags, args.cache)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
+            # Offline: an outdated list is better than an empty matrix
+            tags = cached_tags(source, args.cache, float("inf")) or []
+            print(f"Could not list tags from {source} ({e}); using {len(tags)} cached tags", file=sys.stderr)
+
+    # Build matrix entries: latest always first (use provided latest branch)
+    matrix = [{"ref": args.latest_branch, "name": "latest"}]
+    for t in release_tags(tags)[: args.count]:
+        matrix.append({"ref": t, "name": t.lstrip("v")})
+
+    # Print compact JSON to stdout (one-line)
+    print(json.dumps(matrix, separators=(',', ':')))
+
 
-parser = argparse.ArgumentParser()
-parser.add_argument("--count", type=int, default=5, help="How many recent tags to include")
-parser.add_argument("--latest-branch", type=str, default="main", help="Branch to use for the 'latest' snapshot (default: main)")
-args = parser.parse_args()
-
-TMP_DIR = "/tmp/uclchem_repo_temp"
-if os.path.exists(TMP_DIR):
-    shutil.rmtree(TMP_DIR)
-
-# Clone shallow and list tags
-try:
-    subprocess.check_call(["git", "clone", "--depth", "1", "https://github.com/uclchem/UCLCHEM.git", TMP_DIR], stdout=subprocess.DEVNULL)
-    tags_out = subprocess.check_output(["git", "-C", TMP_DIR, "tag", "--list", "v*", "--sort=-v:refname"]).decode().splitlines()
-    tags = tags_out
-except subprocess.CalledProcessError:
-    tags = []
-
-# Build matrix entries: latest always first (use provided latest branch)
-matrix = [{"ref": args.latest_branch, "name": "latest"}]
-for t in tags[: args.count]:
-    name = t.lstrip("v")
-    matrix.append({"ref": t, "name": name})
-
-# Print compact JSON to stdout (one-line)
-print(json.dumps(matrix, separators=(',', ':')))
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,21 @@
 #!/usr/bin/env python3
 """Generate versions.json for the deployed site from built version directories.
 Usage: python scripts/generate_versions_json.py <built_root> > versions.json
+
+Writes the canonical manifest shape from versions_manifest.py. Prefer the
+manifest written by build_docs.py, which also carries display names. The
+unversioned site sections (blog, parameter changes) are not versions.
 """
-import json
 import os
 import sys
 
+from versions_manifest import SITE_SECTIONS, build_versions_manifest, manifest_bytes
+
 root = sys.argv[1] if len(sys.argv) > 1 else "_build/html/versions"
 versions = []
 if os.path.isdir(root):
     for name in sorted(os.listdir(root)):
         path = os.path.join(root, name)
-        if os.path.isdir(path):
-            versions.append({"name": name, "url": f"/{name}/"})
-print(json.dumps({"versions": versions}, indent=2))
+        if os.path.isdir(path) and not name.startswith("_") and name not in SITE_SECTIONS:
+            versions.append({"version_name": name, "url_path": f"/{name}/"})
+print(manifest_bytes(build_versions_manifest(versions)).decode("utf-8"))
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Shared offline cache of intersphinx inventories.
+build_docs.py fills the cache once per run and every version build reads the
+inventories from it, so objects.inv files are downloaded at most once per run
+(and not at all while the cache is fresh). conf.py builds its
+intersphinx_mapping from the same targets, listing the cached file first and
+the remote inventory as a fallback.
+
+Usage:
+    python scripts/intersphinx_cache.py
+    python scripts/intersphinx_cache.py --ttl-hours 0
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import requests
+
+from build_utils import LogLevel, log
+
+# Projects cross-referenced from the docs: name -> documentation base URL
+INTERSPHINX_TARGETS = {
+    'python': 'https://docs.python.org/3/',
+    'numpy': 'https://numpy.org/doc/stable/',
+    'pandas': 'https://pandas.pydata.org/docs/',
+    'matplotlib': 'https://matplotlib.org/stable/',
+}
+
+# Overridden by build_docs.py so all version builds share one cache
+INTERSPHINX_CACHE_ENV = 'DOCS_INTERSPHINX_CACHE'
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / "_build" / "intersphinx"
+
+USER_AGENT = "uclchem-docs-intersphinx"
+
+
+def inventory_path(cache_dir: Path, name: str) -> Path:
+    """Return where a project's inventory is cached."""
+    return cache_dir / f"{name}.inv"
+
+
+def intersphinx_mapping(
+    cache_dir: Optional[Path] = None,
+    targets: Optional[Dict[str, str]] = None
+) -> Dict[str, Tuple[str, Tuple[Optional[str], ...]]]:
+    """
+    Build the intersphinx_mapping for conf.py.
+
+    Sphinx tries the inventory locations of each project in order, so a
+    cached inventory is used without touching the network and the remote
+    objects.inv is only fetched when the cache has no copy.
+
+    Args:
+        cache_dir: Inventory cache (default: $DOCS_INTERSPHINX_CACHE or _build/intersphinx)
+        targets: Project name -> documentation URL (default: INTERSPHINX_TARGETS)
+
+    Returns:
+        Mapping suitable for intersphinx_mapping
+    """
+    cache_dir = Path(cache_dir or os.environ.get(INTERSPHINX_CACHE_ENV, DEFAULT_CACHE_DIR))
+    mapping = {}
+    for name, url in (targets or INTERSPHINX_TARGETS).items():
+        cached = inventory_path(cache_dir, name)
+        locations = (str(cached), None) if cached.exists() else (None,)
+        mapping[name] = (url, locations)
+    return mapping
+
+
+def _fetch_inventory(url: str, destination: Path, timeout: float) -> None:
+    """Download one objects.inv to destination, replacing it atomically."""
+    response = requests.get(
+        url.rstrip('/') + '/objects.inv',
+        headers={"User-Agent": USER_AGENT},
+        timeout=timeout
+    )
+    response.raise_for_status()
+    # Every Sphinx inventory starts with this header; anything else is an error page
+    if not response.content.startswith(b"# Sphinx inventory version"):
+        raise ValueError("response is not a Sphinx inventory")
+    tmp_path = destination.with_suffix(".tmp")
+    tmp_path.write_bytes(response.content)
+    os.replace(tmp_path, destination)
+
+
+def _refresh_inventory(
+    name: str,
+    url: str,
+    cache_dir: Path,
+    ttl_hours: float,
+    timeout: float,
+    fallback: Optional[Path]
+) -> Dict:
+    """Bring one cached inventory up to date; see fill_inventory_cache."""
+    cached = inventory_path(cache_dir, name)
+    start = time.time()
+    result = {"name": name, "status": "cached", "seconds": 0.0, "error": None}
+
+    if cached.exists() and time.time() - cached.stat().st_mtime < ttl_hours * 3600:
+        return result
+
+    try:
+        _fetch_inventory(url, cached, timeout)
+        result["status"] = "fetched"
+    except (requests.RequestException, OSError, ValueError) as e:
+        result["error"] = str(e)
+        if cached.exists():
+            # Offline or remote down: an expired inventory beats none
+            result["status"] = "stale"
+        elif fallback and fallback.exists():
+            cached.write_bytes(fallback.read_bytes())
+            result["status"] = "fallback"
+        else:
+            result["status"] = "missing"
+    result["seconds"] = round(time.time() - start, 3)
+    return result
+
+
+def fill_inventory_cache(
+    cache_dir: Path,
+    targets: Optional[Dict[str, str]] = None,
+    ttl_hours: float = 24,
+    timeout: float = 15,
+    fallbacks: Optional[Dict[str, Path]] = None
+) -> Dict[str, Dict]:
+    """
+    Make sure every inventory is in the cache, downloading in parallel.
+
+    Inventories younger than ttl_hours are kept. Expired or missing ones are
+    downloaded; when that fails, an expired copy is kept, or the local
+    fallback file is copied in, so builds still work offline.
+
+    Args:
+        cache_dir: Inventory cache directory
+        targets: Project name -> documentation URL (default: INTERSPHINX_TARGETS)
+        ttl_hours: How long a cached inventory is used without refetching
+        timeout: Download timeout in seconds
+        fallbacks: Project name -> local objects.inv used when no copy can be fetched
+
+    Returns:
+        Per-project result dicts with status ('cached', 'fetched', 'stale',
+        'fallback' or 'missing'), fetch time in seconds and error message
+    """
+    targets = targets or INTERSPHINX_TARGETS
+    fallbacks = fallbacks or {}
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=len(targets) or 1) as pool:
+        futures = [
+            pool.submit(_refresh_inventory, name, url, cache_dir, ttl_hours, timeout, fallbacks.get(name))
+            for name, url in targets.items()
+        ]
+        results = [future.result() for future in futures]
+    return {result["name"]: result for result in results}
+
+
+def log_inventory_report(results: Dict[str, Dict], seconds: float) -> None:
+    """Log the outcome of fill_inventory_cache and the total fetch time."""
+    for result in results.values():
+        if result["status"] in ("cached", "fetched"):
+            level = LogLevel.INFO
+        else:
+            level = LogLevel.WARNING
+        detail = f" ({result['error']})" if result["error"] else ""
+        log(f"  {result['name']}: {result['status']} in {result['seconds']:.2f}s{detail}", level)
+
+    fetched = sum(1 for r in results.values() if r["status"] == "fetched")
+    cached = sum(1 for r in results.values() if r["status"] == "cached")
+    log(f"Intersphinx inventories ready in {seconds:.2f}s ({fetched} fetched, {cached} cached)",
+        LogLevel.SUCCESS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill the shared intersphinx inventory cache")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR, help="Inventory cache directory")
+    parser.add_argument("--ttl-hours", type=float, default=24, help="Refetch inventories older than this")
+    parser.add_argument("--timeout", type=float, default=15, help="Download timeout in seconds")
+    args = parser.parse_args()
+
+    start = time.time()
+    results = fill_inventory_cache(args.cache_dir, ttl_hours=args.ttl_hours, timeout=args.timeout)
+    log_inventory_report(results, time.time() - start)
+    return 1 if any(r["status"] == "missing" for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,972 @@
+#!/usr/bin/env python3
+"""
+Post-build processing for the multi-version documentation output.
+Operates on the finished `_build/html` tree before it is uploaded.
+"""
+
+import gzip
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+import tarfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from build_utils import LogLevel, log
+from versions_manifest import version_sort_key
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Text assets worth precompressing. Images, fonts and objects.inv are already
+# compressed and gain nothing.
+COMPRESSIBLE_SUFFIXES = {
+    ".html", ".htm", ".js", ".mjs", ".css", ".json", ".svg",
+    ".txt", ".xml", ".map", ".ipynb", ".md", ".py",
+}
+
+
+def _compress_file(path: Path, formats: Tuple[str, ...]) -> Dict[str, int]:
+    """
+    Write compressed siblings for a single file.
+
+    Siblings are only written when missing or older than the source, and only
+    kept when they are actually smaller than the original.
+
+    Args:
+        path: File to compress
+        formats: Any of 'gzip' and 'brotli'
+
+    Returns:
+        Dict mapping format to bytes saved (0 when skipped or not smaller)
+    """
+    source_stat = path.stat()
+    data = None
+    saved = {}
+
+    for fmt in formats:
+        sibling = path.with_name(path.name + (".gz" if fmt == "gzip" else ".br"))
+        if sibling.exists() and sibling.stat().st_mtime >= source_stat.st_mtime:
+            saved[fmt] = max(0, source_stat.st_size - sibling.stat().st_size)
+            continue
+
+        if data is None:
+            data = path.read_bytes()
+
+        if fmt == "gzip":
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        else:
+            compressed = brotli.compress(data, quality=11)
+
+        if len(compressed) >= len(data):
+            if sibling.exists():
+                sibling.unlink()
+            saved[fmt] = 0
+            continue
+
+        sibling.write_bytes(compressed)
+        os.utime(sibling, (source_stat.st_atime, source_stat.st_mtime))
+        saved[fmt] = len(data) - len(compressed)
+
+    return saved
+
+
+def find_compressible_files(root: Path, min_size: int = 1024) -> List[Path]:
+    """
+    List text assets under root that are large enough to precompress.
+
+    Args:
+        root: Build output directory
+        min_size: Minimum file size in bytes
+
+    Returns:
+        Sorted list of file paths
+    """
+    files = []
+    for path in root.rglob("*"):
+        if path.suffix.lower() in COMPRESSIBLE_SUFFIXES and not path.is_symlink() and path.is_file():
+            if path.stat().st_size >= min_size:
+                files.append(path)
+    return sorted(files)
+
+
+def precompress_output(
+    root: Path,
+    min_size: int = 1024,
+    formats: Tuple[str, ...] = ("gzip", "brotli"),
+    max_workers: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Write .gz and .br siblings for text assets in a build output tree.
+
+    Compression runs in parallel across processes. Files whose compressed
+    sibling is newer than the source are not recompressed.
+
+    Args:
+        root: Build output directory (e.g. _build/html)
+        min_size: Minimum file size in bytes to compress
+        formats: Compression formats to produce ('gzip', 'brotli')
+        max_workers: Number of worker processes (default: CPU count)
+
+    Returns:
+        Dict with the number of files processed and bytes saved per format
+    """
+    if "brotli" in formats and brotli is None:
+        log("brotli module not installed - writing .gz only", LogLevel.WARNING)
+        formats = tuple(f for f in formats if f != "brotli")
+
+    files = find_compressible_files(root, min_size)
+    summary = {"files": len(files), "original_bytes": sum(f.stat().st_size for f in files)}
+    for fmt in formats:
+        summary[f"{fmt}_saved"] = 0
+
+    if not files or not formats:
+        return summary
+
+    log(f"Precompressing {len(files)} files ({', '.join(formats)})...")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_compress_file, files, [formats] * len(files), chunksize=32)
+        for saved in results:
+            for fmt, n_bytes in saved.items():
+                summary[f"{fmt}_saved"] += n_bytes
+
+    return summary
+
+
+# =============================================================================
+# Cross-version Deduplication
+# =============================================================================
+
+# Directories Sphinx fills with theme and content assets, safe to serve from a
+# shared location because HTML references them statically.
+SHAREABLE_DIRS = {"_static", "_images"}
+
+SHARED_DIR = "_shared"
+
+_URL_ATTR_RE = re.compile(r'''\b(href|src)=(["'])([^"'#?]+)([?#][^"']*)?\2''')
+_CSS_RELATIVE_URL_RE = re.compile(r'''url\(\s*["']?(?!data:|https?:|/)''')
+
+
+def _hash_file(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _version_dirs(root: Path) -> List[Path]:
+    """Return the per-version output directories (and the shared blog) under root."""
+    return sorted(
+        d for d in root.iterdir()
+        if d.is_dir() and not d.is_symlink() and not d.name.startswith("_")
+    )
+
+
+def group_identical_files(files: List[Path], max_workers: Optional[int] = None) -> Dict[str, List[Path]]:
+    """
+    Group files with identical content.
+
+    Files are bucketed by size first so only size collisions get hashed.
+
+    Args:
+        files: Files to compare
+        max_workers: Threads used for hashing
+
+    Returns:
+        Dict mapping content hash to the sorted list of files with that content,
+        only for hashes shared by two or more files
+    """
+    by_size: Dict[int, List[Path]] = {}
+    for path in files:
+        size = path.stat().st_size
+        if size > 0:
+            by_size.setdefault(size, []).append(path)
+
+    candidates = [p for group in by_size.values() if len(group) > 1 for p in group]
+
+    groups: Dict[str, List[Path]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for path, digest in zip(candidates, executor.map(_hash_file, candidates)):
+            groups.setdefault(digest, []).append(path)
+
+    return {digest: sorted(paths) for digest, paths in groups.items() if len(paths) > 1}
+
+
+def _replace_with_hardlink(canonical: Path, duplicate: Path) -> bool:
+    """Atomically replace duplicate with a hardlink to canonical."""
+    canonical_stat = canonical.stat()
+    duplicate_stat = duplicate.stat()
+    if (canonical_stat.st_ino, canonical_stat.st_dev) == (duplicate_stat.st_ino, duplicate_stat.st_dev):
+        return False
+
+    tmp_path = duplicate.with_name(f".{duplicate.name}.dedup")
+    os.link(canonical, tmp_path)
+    os.replace(tmp_path, duplicate)
+    return True
+
+
+def hardlink_identical_files(root: Path) -> Dict[str, int]:
+    """
+    Replace identical files across the build output with hardlinks.
+
+    Hardlinks are preserved by tar, so this shrinks both local disk use and
+    the uploaded Pages artifact.
+
+    Args:
+        root: Build output directory (e.g. _build/html)
+
+    Returns:
+        Dict with the number of files linked and bytes saved
+    """
+    files = [p for p in root.rglob("*") if p.is_file() and not p.is_symlink()]
+    groups = group_identical_files(files)
+
+    linked = 0
+    saved = 0
+    for paths in groups.values():
+        canonical = paths[0]
+        for duplicate in paths[1:]:
+            if _replace_with_hardlink(canonical, duplicate):
+                linked += 1
+                saved += duplicate.stat().st_size
+
+    return {"files": linked, "bytes_saved": saved}
+
+
+def break_hardlinks(root: Path) -> int:
+    """
+    Give every hardlinked file under root its own copy again.
+
+    Sphinx and the post-build steps write through existing files, so a tree
+    deduplicated by hardlink_identical_files must be unlinked before anything
+    is rebuilt in place; otherwise the change also lands in every other
+    version sharing the inode.
+
+    Args:
+        root: Directory to unlink (e.g. _build/html or one version in it)
+
+    Returns:
+        Number of files copied
+    """
+    if not root.exists():
+        return 0
+
+    copied = 0
+    for path in root.rglob("*"):
+        if path.is_file() and not path.is_symlink() and path.stat().st_nlink > 1:
+            tmp_path = path.with_name(f".{path.name}.unlink")
+            shutil.copy2(path, tmp_path)
+            os.replace(tmp_path, path)
+            copied += 1
+    return copied
+
+
+def _is_shareable(path: Path, version_dir: Path) -> bool:
+    """Check whether an asset can be served from the shared directory."""
+    rel_parts = path.relative_to(version_dir).parts
+    if not SHAREABLE_DIRS.intersection(rel_parts[:-1]):
+        return False
+    if path.suffix in (".html", ".gz", ".br"):
+        return False
+    if path.suffix == ".css":
+        # Relative url() references would break once the file moves
+        return not _CSS_RELATIVE_URL_RE.search(path.read_text(errors="ignore"))
+    return True
+
+
+def _rewrite_references(page: Path, shared_urls: Dict[str, str]) -> int:
+    """
+    Point static href/src references in a page at shared assets.
+
+    Args:
+        page: HTML file to rewrite
+        shared_urls: Map of absolute asset path to its shared URL
+
+    Returns:
+        Number of references rewritten
+    """
+    text = page.read_text(encoding="utf-8", errors="surrogateescape")
+    page_dir = str(page.parent)
+    count = 0
+
+    def replace(match):
+        nonlocal count
+        attr, quote, url, suffix = match.group(1), match.group(2), match.group(3), match.group(4) or ""
+        if url.startswith(("/", "data:")) or "://" in url:
+            return match.group(0)
+        shared = shared_urls.get(os.path.normpath(os.path.join(page_dir, url)))
+        if not shared:
+            return match.group(0)
+        count += 1
+        return f"{attr}={quote}{shared}{suffix}{quote}"
+
+    new_text = _URL_ATTR_RE.sub(replace, text)
+    if count:
+        # Write via a new inode so hardlinked copies elsewhere are unaffected
+        tmp_path = page.with_name(f".{page.name}.rewrite")
+        tmp_path.write_text(new_text, encoding="utf-8", errors="surrogateescape")
+        os.replace(tmp_path, page)
+    return count
+
+
+def share_identical_assets(root: Path, url_prefix: str = f"/{SHARED_DIR}/") -> Dict[str, int]:
+    """
+    Serve assets identical across versions from a shared content-hashed path.
+
+    Static assets under `_static/` and `_images/` that are byte-identical in
+    two or more versions are copied once to `<root>/_shared/<hash><suffix>`,
+    and static `href`/`src` references in every version's HTML are rewritten
+    to that URL so browsers reuse the cached copy when switching versions.
+    Per-version copies stay in place for assets loaded dynamically by JS.
+
+    Args:
+        root: Build output directory (e.g. _build/html)
+        url_prefix: Public URL of the shared directory
+
+    Returns:
+        Dict with the number of shared assets and rewritten references
+    """
+    shared_dir = root / SHARED_DIR
+    candidates = []
+    for version_dir in _version_dirs(root):
+        for path in version_dir.rglob("*"):
+            if path.is_file() and not path.is_symlink() and _is_shareable(path, version_dir):
+                candidates.append(path)
+
+    groups = group_identical_files(candidates)
+    if not groups:
+        return {"assets": 0, "references": 0}
+
+    shared_dir.mkdir(parents=True, exist_ok=True)
+    shared_urls: Dict[str, str] = {}
+    for digest, paths in groups.items():
+        shared_name = f"{digest[:16]}{paths[0].suffix}"
+        shared_path = shared_dir / shared_name
+        if not shared_path.exists():
+            shutil.copy2(paths[0], shared_path)
+        for path in paths:
+            shared_urls[os.path.normpath(str(path))] = f"{url_prefix}{shared_name}"
+
+    references = 0
+    for version_dir in _version_dirs(root):
+        for page in version_dir.rglob("*.html"):
+            references += _rewrite_references(page, shared_urls)
+
+    return {"assets": len(groups), "references": references}
+
+
+# =============================================================================
+# Incremental Deploy
+# =============================================================================
+
+DEPLOY_MANIFEST = "deploy-manifest.json"
+
+
+def build_deploy_manifest(root: Path, max_workers: Optional[int] = None) -> Dict:
+    """
+    Hash every file in the build output.
+
+    Args:
+        root: Build output directory (e.g. _build/html)
+        max_workers: Threads used for hashing
+
+    Returns:
+        Manifest dict with a `files` map of relative path to sha256 and size
+    """
+    files = sorted(
+        p for p in root.rglob("*")
+        if p.is_file() and p.name != DEPLOY_MANIFEST
+    )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        digests = list(executor.map(_hash_file, files))
+
+    return {
+        "format": 1,
+        "files": {
+            path.relative_to(root).as_posix(): {"sha256": digest, "size": path.stat().st_size}
+            for path, digest in zip(files, digests)
+        },
+    }
+
+
+def load_deploy_manifest(source: str) -> Optional[Dict]:
+    """
+    Load a previously deployed manifest from a file path or URL.
+
+    Args:
+        source: Local path, or http(s) URL of the deployed manifest
+
+    Returns:
+        Manifest dict, or None if it could not be loaded
+    """
+    try:
+        if "://" in source:
+            import requests
+            response = requests.get(source, timeout=30)
+            response.raise_for_status()
+            return response.json()
+        with open(source) as f:
+            return json.load(f)
+    except Exception as e:
+        log(f"Could not load previous manifest from {source}: {e}", LogLevel.WARNING)
+        return None
+
+
+def diff_deploy_manifests(old: Optional[Dict], new: Dict) -> Dict[str, List[str]]:
+    """
+    Compare two deploy manifests.
+
+    Args:
+        old: Previously deployed manifest (None means nothing deployed)
+        new: Manifest of the current build
+
+    Returns:
+        Dict with sorted `added`, `changed`, `removed` and `unchanged` path lists
+    """
+    old_files = old.get("files", {}) if old else {}
+    new_files = new["files"]
+
+    diff = {"added": [], "changed": [], "removed": [], "unchanged": []}
+    for path, entry in new_files.items():
+        if path not in old_files:
+            diff["added"].append(path)
+        elif old_files[path]["sha256"] != entry["sha256"]:
+            diff["changed"].append(path)
+        else:
+            diff["unchanged"].append(path)
+    diff["removed"] = sorted(set(old_files) - set(new_files))
+
+    return diff
+
+
+def write_delta_bundle(root: Path, manifest: Dict, diff: Dict[str, List[str]], output_dir: Path) -> Dict[str, int]:
+    """
+    Write the files needed to bring a deployed copy up to date.
+
+    The bundle consists of:
+        delta.tar.gz   - added and changed files plus the new manifest
+        deletions.txt  - one relative path per line to remove from the target
+        delta.json     - summary of the diff
+
+    Args:
+        root: Build output directory the manifest was built from
+        manifest: Manifest of the current build
+        diff: Result of diff_deploy_manifests
+        output_dir: Directory to write the bundle to
+
+    Returns:
+        Dict with file counts and bytes to upload
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    upload = diff["added"] + diff["changed"]
+
+    with tarfile.open(output_dir / "delta.tar.gz", "w:gz") as tar:
+        for rel_path in upload:
+            tar.add(root / rel_path, arcname=rel_path)
+        tar.add(root / DEPLOY_MANIFEST, arcname=DEPLOY_MANIFEST)
+
+    (output_dir / "deletions.txt").write_text("".join(f"{p}\n" for p in diff["removed"]))
+
+    summary = {
+        "uploaded": len(upload),
+        "removed": len(diff["removed"]),
+        "unchanged": len(diff["unchanged"]),
+        "upload_bytes": sum(manifest["files"][p]["size"] for p in upload),
+        "total_bytes": sum(entry["size"] for entry in manifest["files"].values()),
+    }
+    with open(output_dir / "delta.json", "w") as f:
+        json.dump({**summary, "added": diff["added"], "changed": diff["changed"], "removed": diff["removed"]}, f, indent=2)
+
+    return summary
+
+
+def apply_delta_bundle(bundle_dir: Path, target_dir: Path) -> None:
+    """
+    Apply a delta bundle to a local mirror directory.
+
+    Equivalent to extracting delta.tar.gz over the target and removing every
+    path listed in deletions.txt.
+
+    Args:
+        bundle_dir: Directory written by write_delta_bundle
+        target_dir: Deployed copy to update
+    """
+    target_dir.mkdir(parents=True, exist_ok=True)
+    with tarfile.open(bundle_dir / "delta.tar.gz", "r:gz") as tar:
+        tar.extractall(target_dir, filter="data")
+
+    target_root = target_dir.resolve()
+    for rel_path in (bundle_dir / "deletions.txt").read_text().splitlines():
+        path = target_dir / rel_path
+        if target_root not in path.resolve().parents:
+            log(f"Refusing to delete path outside target: {rel_path}", LogLevel.WARNING)
+            continue
+        if path.is_file() or path.is_symlink():
+            path.unlink()
+
+
+# =============================================================================
+# Alias Versions
+# =============================================================================
+
+def _short_version(release: str) -> str:
+    """Mirror conf.py's derivation of `version` from `release`."""
+    return '.'.join(release.split('.')[:2]) if '.' in release else release
+
+
+def _alias_substitutions(source_version: str, alias_version: str) -> List[Tuple[re.Pattern, str]]:
+    """Build the regex substitutions that retarget a page to another version."""
+    src = re.escape(source_version)
+    src_short = re.escape(_short_version(source_version))
+    return [
+        # <title>, logo title and search link: "UCLCHEM <release> documentation"
+        (re.compile(rf" {src} documentation"), f" {alias_version} documentation"),
+        # pydata-sphinx-theme version switcher
+        (re.compile(rf"(theme_switcher_version_match\s*=\s*['\"]){src}(['\"])"), rf"\g<1>{alias_version}\g<2>"),
+        # _static/documentation_options.js
+        (re.compile(rf"(\bVERSION:\s*['\"]){src}(['\"])"), rf"\g<1>{alias_version}\g<2>"),
+        (re.compile(rf'(name="docsearch:version" content="){src_short}(")'),
+         rf"\g<1>{_short_version(alias_version)}\g<2>"),
+        # Canonical and Open Graph URLs
+        (re.compile(rf'((?:rel="canonical" href|property="og:url" content)="[^"]*/){src}/'), rf"\g<1>{alias_version}/"),
+        # footer_versions.html
+        (re.compile(rf'(class="site-version">Version: ){src}\b'), rf"\g<1>{alias_version}"),
+    ]
+
+
+def create_alias_output(source_dir: Path, alias_dir: Path, source_version: str, alias_version: str) -> int:
+    """
+    Produce an alias version's output from an already built version.
+
+    Files are hardlinked from the source build. Only pages carrying
+    version-specific strings (title, switcher `version_match`,
+    `DOCUMENTATION_OPTIONS.VERSION`, canonical URLs, footer) are rewritten,
+    each to a new inode so the source build is left untouched.
+
+    Args:
+        source_dir: Output directory of the built version
+        alias_dir: Output directory for the alias
+        source_version: DOCS_VERSION the source was built with
+        alias_version: DOCS_VERSION of the alias
+
+    Returns:
+        Number of files rewritten
+    """
+    if alias_dir.exists():
+        shutil.rmtree(alias_dir)
+
+    def link_or_copy(src, dst):
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+    shutil.copytree(source_dir, alias_dir, copy_function=link_or_copy, symlinks=True)
+
+    substitutions = _alias_substitutions(source_version, alias_version)
+    rewritten = 0
+    for path in alias_dir.rglob("*"):
+        if path.suffix not in (".html", ".js") or not path.is_file() or path.is_symlink():
+            continue
+        if path.suffix == ".js" and path.name != "documentation_options.js":
+            continue
+
+        text = path.read_text(encoding="utf-8", errors="surrogateescape")
+        new_text = text
+        for pattern, replacement in substitutions:
+            new_text = pattern.sub(replacement, new_text)
+
+        if new_text != text:
+            tmp_path = path.with_name(f".{path.name}.alias")
+            tmp_path.write_text(new_text, encoding="utf-8", errors="surrogateescape")
+            os.replace(tmp_path, path)
+            rewritten += 1
+
+    return rewritten
+
+
+# =============================================================================
+# Search Index Sharding
+# =============================================================================
+
+SEARCH_INDEX = "searchindex.js"
+SEARCH_SHARD_DIR = "_search"
+SEARCH_LOADER = "_static/search_shards.js"
+
+_SEARCH_INDEX_PREFIX = "Search.setIndex("
+_SEARCH_INDEX_SUFFIX = ")"
+
+# Stub that replaces searchindex.js. It loads the shard loader if the page
+# doesn't include it and registers the manifest with it.
+_SEARCH_STUB = """/* Sharded search index, see {loader} */
+(function (manifest) {{
+  var indexUrl = document.currentScript.src;
+  function install() {{ SearchShards.install(manifest, indexUrl); }}
+  if (window.SearchShards) {{ install(); return; }}
+  var loader = document.createElement("script");
+  loader.src = new URL("{loader}", indexUrl).href;
+  loader.onload = install;
+  document.head.appendChild(loader);
+}})({manifest});
+"""
+
+
+def _write_json_shard(shard_dir: Path, kind: str, data: Dict) -> str:
+    """Write a shard under a content-hashed name and return that name."""
+    payload = json.dumps(data, separators=(",", ":"), sort_keys=True).encode()
+    name = f"{kind}.{hashlib.sha256(payload).hexdigest()[:16]}.json"
+    path = shard_dir / name
+    if not path.exists():
+        path.write_bytes(payload)
+    return name
+
+
+def shard_search_index(
+    version_dir: Path,
+    prefix_length: int = 2,
+    target_shard_bytes: int = 64 * 1024,
+    backup_path: Optional[Path] = None
+) -> Optional[Dict[str, int]]:
+    """
+    Split a version's Sphinx search index into prefix shards.
+
+    The `terms` and `titleterms` maps, which grow with the API reference,
+    are grouped by the first `prefix_length` characters of each term, and
+    consecutive prefix groups are packed into `_search/terms.<hash>.json`
+    shards of about `target_shard_bytes`. Everything else (document names,
+    titles, objects) goes into one base shard. searchindex.js is replaced by
+    a stub carrying the manifest (first prefix of each shard), and
+    `_static/search_shards.js` fetches only the shards a query's words need.
+    Partial-word matches are limited to the shards of the query's words.
+
+    Sphinx cannot load the stub as its index, so an incremental build into
+    the same directory would start from an empty index and ship one covering
+    only the rebuilt documents. Pass backup_path to keep the full index, and
+    put it back with restore_search_index before rebuilding.
+
+    Args:
+        version_dir: Output directory of one version
+        prefix_length: Number of leading characters used as shard key
+        target_shard_bytes: Approximate uncompressed size of a term shard
+        backup_path: Where to keep Sphinx's full index (outside the deployed tree)
+
+    Returns:
+        Dict with the shard count and sizes in bytes, or None if the version
+        has no Sphinx index (missing, already sharded, or no loader)
+    """
+    index_path = version_dir / SEARCH_INDEX
+    if not index_path.exists() or not (version_dir / SEARCH_LOADER).exists():
+        return None
+
+    text = index_path.read_text(encoding="utf-8")
+    if not (text.startswith(_SEARCH_INDEX_PREFIX) and text.endswith(_SEARCH_INDEX_SUFFIX)):
+        return None
+    index = json.loads(text[len(_SEARCH_INDEX_PREFIX):-len(_SEARCH_INDEX_SUFFIX)])
+
+    groups: Dict[str, Dict[str, Dict]] = {}
+    for kind in ("terms", "titleterms"):
+        for term, files in index.pop(kind, {}).items():
+            prefix = term[:prefix_length]
+            groups.setdefault(prefix, {"terms": {}, "titleterms": {}})[kind][term] = files
+
+    # Pack consecutive prefix groups into shards; a shard is named by its
+    # first prefix and covers every prefix up to the next shard's
+    shards: List[Tuple[str, Dict[str, Dict]]] = []
+    shard_bytes = 0
+    for prefix in sorted(groups):
+        group = groups[prefix]
+        size = len(json.dumps(group, separators=(",", ":")))
+        if not shards or shard_bytes + size > target_shard_bytes:
+            shards.append((prefix, {"terms": {}, "titleterms": {}}))
+            shard_bytes = 0
+        shards[-1][1]["terms"].update(group["terms"])
+        shards[-1][1]["titleterms"].update(group["titleterms"])
+        shard_bytes += size
+
+    shard_dir = version_dir / SEARCH_SHARD_DIR
+    if shard_dir.exists():
+        shutil.rmtree(shard_dir)
+    shard_dir.mkdir()
+
+    manifest = {
+        "prefix_length": prefix_length,
+        "base": f"{SEARCH_SHARD_DIR}/{_write_json_shard(shard_dir, 'base', index)}",
+        "shards": [
+            [prefix, f"{SEARCH_SHARD_DIR}/{_write_json_shard(shard_dir, 'terms', data)}"]
+            for prefix, data in shards
+        ],
+    }
+
+    if backup_path:
+        backup_path.parent.mkdir(parents=True, exist_ok=True)
+        backup_path.write_text(text, encoding="utf-8")
+
+    # Replace rather than rewrite: alias versions may hardlink this file
+    stub = _SEARCH_STUB.format(
+        loader=SEARCH_LOADER,
+        manifest=json.dumps(manifest, separators=(",", ":"), ensure_ascii=False),
+    )
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    tmp_path.write_text(stub, encoding="utf-8")
+    os.replace(tmp_path, index_path)
+
+    shard_sizes = [path.stat().st_size for path in shard_dir.glob("terms.*.json")]
+    return {
+        "shards": len(shard_sizes),
+        "original_bytes": len(text.encode("utf-8")),
+        "base_bytes": (version_dir / manifest["base"]).stat().st_size,
+        "stub_bytes": len(stub.encode("utf-8")),
+        "largest_shard_bytes": max(shard_sizes, default=0),
+    }
+
+
+def restore_search_index(version_dir: Path, backup_path: Path) -> bool:
+    """
+    Put back the full Sphinx index saved by shard_search_index.
+
+    Args:
+        version_dir: Output directory of one version
+        backup_path: backup_path given to shard_search_index
+
+    Returns:
+        True if an index was restored
+    """
+    if not backup_path.exists() or not version_dir.exists():
+        return False
+    # Replace rather than rewrite: the stub may be hardlinked by --dedup
+    tmp_path = version_dir / (SEARCH_INDEX + ".tmp")
+    shutil.copyfile(backup_path, tmp_path)
+    os.replace(tmp_path, version_dir / SEARCH_INDEX)
+    backup_path.unlink()
+    return True
+
+
+# =============================================================================
+# Cross-Version Page Index
+# =============================================================================
+
+PAGE_INDEX = "page-index.json"
+
+# Top-level directories of a version that hold no switchable pages
+_NON_PAGE_DIRS = {"_static", "_sources", "_images", "_downloads", SEARCH_SHARD_DIR}
+
+
+def list_version_pages(version_dir: Path) -> List[str]:
+    """
+    List the pages of one version as sorted docnames.
+
+    Args:
+        version_dir: Output directory of one version
+
+    Returns:
+        Sorted page paths relative to the version root, without '.html'
+        (e.g. 'index', 'tutorials/first_model')
+    """
+    pages = []
+    for path in version_dir.rglob("*.html"):
+        rel = path.relative_to(version_dir)
+        if rel.parts[0] in _NON_PAGE_DIRS or not path.is_file():
+            continue
+        pages.append(rel.with_suffix("").as_posix())
+    return sorted(pages)
+
+
+def _front_code(names: List[str]) -> List[List]:
+    """Encode a sorted list as [shared prefix length, suffix] pairs."""
+    encoded, previous = [], ""
+    for name in names:
+        shared = len(os.path.commonprefix([previous, name]))
+        encoded.append([shared, name[shared:]])
+        previous = name
+    return encoded
+
+
+def write_page_index(root: Path, versions: List[str], renames: Optional[List[Dict]] = None) -> Dict[str, int]:
+    """
+    Write the page index used by the version switcher to avoid 404s.
+
+    For every version the sorted page list is front-coded (each entry stores
+    the length of the prefix shared with the previous one and the rest).
+    Versions with identical page lists (e.g. aliases) share one list. The
+    rename map lists pages that moved between releases, so the switcher can
+    follow them in either direction before falling back to a parent page.
+
+    Args:
+        root: Build output directory (e.g. _build/html)
+        versions: Version directory names to index
+        renames: Entries of the form {'from': old_docname, 'to': new_docname}
+
+    Returns:
+        Dict with the number of indexed versions, distinct lists and bytes
+    """
+    lists: List[List[str]] = []
+    version_lists: Dict[str, int] = {}
+    for version in versions:
+        version_dir = root / version
+        if not version_dir.is_dir():
+            continue
+        pages = list_version_pages(version_dir)
+        if pages not in lists:
+            lists.append(pages)
+        version_lists[version] = lists.index(pages)
+
+    index = {
+        "versions": version_lists,
+        "lists": [_front_code(pages) for pages in lists],
+        "renames": [[entry["from"], entry["to"]] for entry in renames or []],
+    }
+    payload = json.dumps(index, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    (root / PAGE_INDEX).write_bytes(payload)
+
+    return {"versions": len(version_lists), "lists": len(lists), "bytes": len(payload)}
+
+
+# =============================================================================
+# Parameter Changes Between Versions
+# =============================================================================
+
+_PARAM_CHANGES_INTRO = """# Parameter Changes Between Versions
+
+Module settings added, removed or changed (default value, type or shape) between
+consecutive documented versions, from the compiled Fortran modules each version was
+built against. Internal solver variables are not compared.
+"""
+
+
+def load_param_snapshots(snapshot_dir: Path, versions: List[str]) -> List[Tuple[str, Dict]]:
+    """
+    Load the parameter snapshots written by fortran_params_doc.
+
+    Args:
+        snapshot_dir: Directory holding one <version>.json per built version
+        versions: Version names to load; versions without a snapshot are skipped
+
+    Returns:
+        (version, snapshot) pairs ordered from oldest to newest release
+    """
+    snapshots = []
+    for version in sorted(versions, key=version_sort_key):
+        path = snapshot_dir / f"{version}.json"
+        if path.exists():
+            with open(path) as f:
+                snapshots.append((version, json.load(f)))
+    return snapshots
+
+
+def diff_param_snapshots(snapshots: List[Tuple[str, Dict]]) -> List[Dict]:
+    """
+    Diff the settings of consecutive versions in a single pass.
+
+    Each distinct (dtype, shape, default) description is interned once, so
+    every setting becomes a row of value ids with one column per version.
+    Comparing neighbouring columns of all rows then yields the changes of
+    every version pair in O(settings x versions), without comparing the
+    values themselves again.
+
+    Args:
+        snapshots: (version, snapshot) pairs as returned by load_param_snapshots
+
+    Returns:
+        One dict per consecutive version pair with 'from', 'to' and the
+        'added', 'removed' and 'changed' settings ({module, name, old, new})
+    """
+    ids: Dict[str, int] = {}
+    records: List[Dict] = []
+    rows: Dict[Tuple[str, str], List[Optional[int]]] = {}
+
+    for column, (_, snapshot) in enumerate(snapshots):
+        for module, settings in snapshot["modules"].items():
+            for name, record in settings.items():
+                if record["is_internal"]:
+                    continue
+                key = json.dumps([record["dtype"], record["shape"], record["default"]])
+                value_id = ids.setdefault(key, len(ids))
+                if value_id == len(records):
+                    records.append(record)
+                rows.setdefault((module, name), [None] * len(snapshots))[column] = value_id
+
+    changes = [
+        {"from": snapshots[i][0], "to": snapshots[i + 1][0], "added": [], "removed": [], "changed": []}
+        for i in range(len(snapshots) - 1)
+    ]
+    for (module, name), row in sorted(rows.items()):
+        for i, (old, new) in enumerate(zip(row, row[1:])):
+            if old == new:
+                continue
+            kind = "added" if old is None else "removed" if new is None else "changed"
+            changes[i][kind].append({
+                "module": module,
+                "name": name,
+                "old": None if old is None else records[old],
+                "new": None if new is None else records[new],
+            })
+    return changes
+
+
+def _describe_setting(record: Optional[Dict]) -> str:
+    """Render a setting's default and type for the changes page."""
+    if record is None:
+        return ""
+    shape = f"[{html.escape(str(record['shape']))}]" if record["shape"] else ""
+    default = html.escape(json.dumps(record["default"]))
+    return f"<code>{default}</code> ({html.escape(record['dtype'])}{shape})"
+
+
+def write_param_changes_source(source_dir: Path, changes: List[Dict]) -> Dict[str, int]:
+    """
+    Write the "parameter changes between versions" page as MyST source.
+
+    Headings are Markdown, so the page gets the theme's navigation and
+    table of contents; the tables are raw HTML to keep values verbatim.
+
+    Args:
+        source_dir: Sphinx source directory to write index.md into
+        changes: Result of diff_param_snapshots (empty with fewer than two snapshots)
+
+    Returns:
+        Dict with the number of version pairs and changed settings
+    """
+    parts = [_PARAM_CHANGES_INTRO]
+    if not changes:
+        parts.append("No changes to show yet: at least two built versions must provide the "
+                     "Fortran parameter documentation.\n")
+    # Newest pair first, which is what most readers upgrade across
+    for pair in reversed(changes):
+        parts.append(f"## {pair['from']} \u2192 {pair['to']}\n")
+        if not (pair["added"] or pair["removed"] or pair["changed"]):
+            parts.append("No parameter changes.\n")
+        for kind in ("added", "removed", "changed"):
+            if not pair[kind]:
+                continue
+            rows = [
+                f"<tr><td>{html.escape(entry['module'])}</td><td><code>{html.escape(entry['name'])}</code></td>"
+                f"<td>{_describe_setting(entry['old'])}</td><td>{_describe_setting(entry['new'])}</td></tr>"
+                for entry in pair[kind]
+            ]
+            parts.append(
+                f"### {kind.capitalize()} ({len(pair[kind])})\n\n"
+                "```{raw} html\n"
+                "<table class=\"table\"><tr><th>Module</th><th>Setting</th>"
+                f"<th>{html.escape(pair['from'])}</th><th>{html.escape(pair['to'])}</th></tr>\n"
+                + "\n".join(rows)
+                + "\n</table>\n```\n"
+            )
+
+    source_dir.mkdir(parents=True, exist_ok=True)
+    (source_dir / "index.md").write_text("\n".join(parts), encoding="utf-8")
+
+    return {
+        "pairs": len(changes),
+        "changes": sum(len(p["added"]) + len(p["removed"]) + len(p["changed"]) for p in changes),
+    }
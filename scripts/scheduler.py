@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Dependency-aware task scheduler for the multi-version build pipeline.
+Runs a DAG of build stages with per-resource concurrency limits and records
+a timeline that can be exported as a Chrome trace.
+"""
+
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from build_utils import BuildError, LogLevel, log
+
+
+class Resource(Enum):
+    """Resource class a task mainly consumes."""
+    NETWORK = "network"
+    CPU = "cpu"
+    DISK = "disk"
+
+
+class TaskStatus(Enum):
+    """Lifecycle state of a scheduled task."""
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCESS = "success"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+
+class Task:
+    """A single pipeline stage in the build graph."""
+
+    def __init__(
+        self,
+        name: str,
+        resource: Resource,
+        func: Callable[[], Any],
+        deps: Optional[List[str]] = None,
+        locks: Tuple[str, ...] = (),
+        group: Optional[str] = None,
+        after: Optional[List[str]] = None
+    ):
+        """
+        Initialize task.
+
+        Args:
+            name: Unique task name (e.g. 'develop:sphinx')
+            resource: Resource class used for concurrency limiting
+            func: Callable run by the scheduler; raising marks the task failed
+            deps: Names of tasks that must succeed before this one starts
+            locks: Named exclusive locks held while running (e.g. a shared source dir)
+            group: Label used to group tasks in reports (e.g. the version name)
+            after: Names of tasks that must have finished, successfully or not,
+                before this one starts (ordering only)
+        """
+        self.name = name
+        self.resource = resource
+        self.func = func
+        self.deps = list(deps or [])
+        self.after = list(after or [])
+        self.locks = tuple(locks)
+        self.group = group or name.split(':', 1)[0]
+
+        self.status = TaskStatus.PENDING
+        self.error: Optional[BaseException] = None
+        self.start: Optional[float] = None
+        self.end: Optional[float] = None
+        self.slot: Optional[int] = None
+
+
+class TaskGraph:
+    """Directed acyclic graph of build tasks."""
+
+    def __init__(self):
+        self.tasks: Dict[str, Task] = {}
+
+    def add(self, task: Task) -> Task:
+        """Add a task; its dependencies may be added later."""
+        if task.name in self.tasks:
+            raise BuildError(f"Duplicate task: {task.name}")
+        self.tasks[task.name] = task
+        return task
+
+    def validate(self) -> None:
+        """
+        Check that every dependency exists and that the graph has no cycles.
+
+        Raises:
+            BuildError if the graph is invalid
+        """
+        for task in self.tasks.values():
+            for dep in task.deps + task.after:
+                if dep not in self.tasks:
+                    raise BuildError(f"Task {task.name} depends on unknown task {dep}")
+
+        visiting, done = set(), set()
+
+        def visit(name: str, path: List[str]) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise BuildError(f"Dependency cycle: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dep in self.tasks[name].deps + self.tasks[name].after:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.tasks:
+            visit(name, [])
+
+
+class Scheduler:
+    """Run a TaskGraph with per-resource concurrency limits."""
+
+    def __init__(self, limits: Dict[Resource, int]):
+        """
+        Initialize scheduler.
+
+        Args:
+            limits: Maximum concurrently running tasks per resource class
+        """
+        self.limits = {resource: max(1, limits.get(resource, 1)) for resource in Resource}
+        self.graph: Optional[TaskGraph] = None
+        self._origin = 0.0
+
+    def _ready(self, task: Task, tasks: Dict[str, Task]) -> bool:
+        """A pending task is ready once its dependencies succeeded and its `after` tasks finished."""
+        finished = (TaskStatus.SUCCESS, TaskStatus.FAILED, TaskStatus.SKIPPED)
+        return (all(tasks[dep].status == TaskStatus.SUCCESS for dep in task.deps)
+                and all(tasks[name].status in finished for name in task.after))
+
+    def _skip_dependents(self, tasks: Dict[str, Task]) -> None:
+        """Mark pending tasks whose dependencies failed or were skipped."""
+        changed = True
+        while changed:
+            changed = False
+            for task in tasks.values():
+                if task.status != TaskStatus.PENDING:
+                    continue
+                if any(tasks[dep].status in (TaskStatus.FAILED, TaskStatus.SKIPPED) for dep in task.deps):
+                    task.status = TaskStatus.SKIPPED
+                    log(f"Skipping {task.name} (dependency failed)", LogLevel.WARNING)
+                    changed = True
+
+    def _run_task(self, task: Task) -> None:
+        """Execute a task and record its timing."""
+        task.start = time.perf_counter()
+        try:
+            task.func()
+        finally:
+            task.end = time.perf_counter()
+
+    def run(self, graph: TaskGraph) -> Dict[str, TaskStatus]:
+        """
+        Run every task in the graph.
+
+        Tasks start as soon as their dependencies have succeeded, a slot of
+        their resource class is free and their locks are available. A failing
+        task causes all tasks depending on it to be skipped; independent
+        tasks keep running.
+
+        Args:
+            graph: Task graph to execute
+
+        Returns:
+            Dict mapping task name to its final status
+        """
+        graph.validate()
+        self.graph = graph
+        tasks = graph.tasks
+        self._origin = time.perf_counter()
+
+        free_slots = {resource: list(range(limit)) for resource, limit in self.limits.items()}
+        held_locks = set()
+        running: Dict[Future, Task] = {}
+
+        with ThreadPoolExecutor(max_workers=sum(self.limits.values())) as executor:
+            while True:
+                # Start every task that can run now, in graph insertion order
+                for task in tasks.values():
+                    if task.status != TaskStatus.PENDING or not self._ready(task, tasks):
+                        continue
+                    if not free_slots[task.resource] or held_locks.intersection(task.locks):
+                        continue
+
+                    task.slot = free_slots[task.resource].pop(0)
+                    held_locks.update(task.locks)
+                    task.status = TaskStatus.RUNNING
+                    log(f"▶ {task.name} [{task.resource.value}]")
+                    running[executor.submit(self._run_task, task)] = task
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = running.pop(future)
+                    free_slots[task.resource].append(task.slot)
+                    free_slots[task.resource].sort()
+                    held_locks.difference_update(task.locks)
+
+                    error = future.exception()
+                    if error is None:
+                        task.status = TaskStatus.SUCCESS
+                        log(f"■ {task.name} ({task.end - task.start:.1f}s)", LogLevel.SUCCESS)
+                    else:
+                        task.status = TaskStatus.FAILED
+                        task.error = error
+                        log(f"■ {task.name} failed: {error}", LogLevel.ERROR)
+
+                self._skip_dependents(tasks)
+
+        # Anything still pending could never become ready
+        for task in tasks.values():
+            if task.status == TaskStatus.PENDING:
+                task.status = TaskStatus.SKIPPED
+
+        return {name: task.status for name, task in tasks.items()}
+
+    def write_chrome_trace(self, path: Path) -> None:
+        """
+        Export the task timeline in Chrome trace event format.
+
+        Open the file in chrome://tracing or https://ui.perfetto.dev. Each
+        resource slot is shown as its own track.
+
+        Args:
+            path: Output JSON file
+        """
+        if self.graph is None:
+            raise BuildError("Scheduler has not run")
+
+        resources = list(Resource)
+        events = []
+        for index, resource in enumerate(resources):
+            for slot in range(self.limits[resource]):
+                events.append({
+                    "name": "thread_name", "ph": "M", "pid": 1,
+                    "tid": index * 100 + slot,
+                    "args": {"name": f"{resource.value} #{slot}"},
+                })
+
+        for task in self.graph.tasks.values():
+            if task.start is None or task.end is None:
+                continue
+            events.append({
+                "name": task.name,
+                "cat": task.resource.value,
+                "ph": "X",
+                "pid": 1,
+                "tid": resources.index(task.resource) * 100 + task.slot,
+                "ts": (task.start - self._origin) * 1e6,
+                "dur": (task.end - task.start) * 1e6,
+                "args": {
+                    "group": task.group,
+                    "status": task.status.value,
+                    "deps": task.deps,
+                    "error": str(task.error) if task.error else None,
+                },
+            })
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
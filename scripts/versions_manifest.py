@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Canonical versions manifest for the version switchers.
+Shared by build_docs.py (which writes the manifest files) and conf.py (which
+inlines the manifest into every page and points the pydata-sphinx-theme
+switcher at its content-hashed URL). Only depends on PyYAML so conf.py can
+import it cheaply.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+VERSIONS_CONFIG = Path(__file__).resolve().parent / "versions.yaml"
+
+# Stable URL kept for external consumers; pages use the hashed copy
+VERSIONS_MANIFEST = "versions.json"
+
+# Unversioned sections build_docs.py publishes next to the version directories
+BLOG_DIR = "blog"
+PARAM_CHANGES_DIR = "parameter-changes"
+SITE_SECTIONS = (BLOG_DIR, PARAM_CHANGES_DIR)
+
+# Release names such as v4.0.0, 3.5, v4.1.0rc1 or v4.1.0-beta.2
+_RELEASE_RE = re.compile(r"^v?(\d+(?:\.\d+)*)(?:[-.]?(dev|a|alpha|b|beta|rc)\.?(\d*))?$", re.IGNORECASE)
+_PRE_RELEASE_RANK = {"dev": 0, "a": 1, "alpha": 1, "b": 2, "beta": 2, "rc": 3}
+
+
+def build_versions_manifest(versions: List[Dict]) -> List[Dict]:
+    """
+    Build the manifest from the `versions` entries of versions.yaml.
+
+    The shape is the one pydata-sphinx-theme's switcher expects: a list of
+    {name, version, url, preferred} in configuration order.
+
+    Args:
+        versions: Version entries from versions.yaml
+
+    Returns:
+        Manifest list
+    """
+    return [
+        {
+            "name": v.get('display_name', v['version_name']),
+            "version": v['version_name'],
+            "url": v.get('url_path', f"/{v['version_name']}/"),
+            "preferred": bool(v.get('preferred', False)),
+        }
+        for v in versions
+    ]
+
+
+def version_sort_key(name: str) -> Tuple:
+    """
+    Sort key ordering release names from oldest to newest.
+
+    Numeric components compare as numbers (v3.10 > v3.9, v4.0 == v4.0.0) and
+    pre-releases sort before their release (v4.1.0rc1 < v4.1.0). Names that
+    are not releases (develop, main) sort after all releases, alphabetically.
+
+    Args:
+        name: Tag or version name
+
+    Returns:
+        Tuple usable as a sort key
+    """
+    match = _RELEASE_RE.match(name)
+    if not match:
+        return (1, (), 0, 0, name)
+    release = [int(part) for part in match.group(1).split(".")]
+    while len(release) > 1 and release[-1] == 0:
+        release.pop()
+    pre = match.group(2)
+    rank = _PRE_RELEASE_RANK[pre.lower()] if pre else len(_PRE_RELEASE_RANK)
+    return (0, tuple(release), rank, int(match.group(3) or 0), name)
+
+
+def load_versions_manifest(config_path: Optional[Path] = None) -> Optional[List[Dict]]:
+    """
+    Build the manifest from a versions.yaml file.
+
+    Args:
+        config_path: Configuration file (default: $DOCS_VERSIONS_CONFIG or
+            scripts/versions.yaml)
+
+    Returns:
+        Manifest list, or None if the configuration is missing or invalid
+    """
+    config_path = config_path or Path(os.environ.get('DOCS_VERSIONS_CONFIG', VERSIONS_CONFIG))
+    try:
+        with open(config_path) as f:
+            config = yaml.safe_load(f)
+        return build_versions_manifest(config['versions'])
+    except (OSError, KeyError, TypeError, yaml.YAMLError):
+        return None
+
+
+def manifest_bytes(manifest: List[Dict]) -> bytes:
+    """Serialize a manifest compactly."""
+    return json.dumps(manifest, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def hashed_manifest_name(manifest: List[Dict]) -> str:
+    """Return the content-hashed file name the manifest is served under."""
+    digest = hashlib.sha256(manifest_bytes(manifest)).hexdigest()[:12]
+    return f"versions.{digest}.json"